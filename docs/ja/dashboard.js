@@ -5,24 +5,26 @@ document.addEventListener("DOMContentLoaded", function() {
 // 캐시 방지용 타임스탬프
 const ts = new Date().getTime();
 
+// 전략 차트에 표시할 최근 일수
+const RECENT_DAYS = 90;
+
 async function initDashboard() {
     try {
         // 병렬로 데이터 로드 (속도 향상)
-        const [statusRes, summaryRes, historyRes] = await Promise.all([
-            fetch(`data/status.json?t=${ts}`),
-            fetch(`data/summary.json?t=${ts}`),
-            fetch(`data/history.json?t=${ts}`)
+        // 전체 기록 대신 인덱스 + 다운샘플링된 개요만 받음 (기록이 쌓여도 크기 일정)
+        const [statusData, indexData, overviewData] = await Promise.all([
+            fetchJson('data/status.json'),
+            fetchJson('data/index.json'),
+            fetchJson('data/overview.json')
         ]);
-
-        const statusData = await statusRes.json();
-        const summaryData = await summaryRes.json();
-        const historyData = await historyRes.json();
+        const summaryData = await fetchRecentSummary(indexData, RECENT_DAYS);
 
         // UI 업데이트 실행
-        renderStatus(statusData, summaryData);
-        renderCharts(summaryData);
+        renderStatus(statusData, indexData.latest ? [indexData.latest] : []);
+        renderCharts(overviewData, summaryData);
         renderHoldings(statusData);
-        renderHistory(historyData);
+        renderHistory(indexData.recent_history);
+        if (indexData.aggregates) renderAggregates(indexData.aggregates);
 
     } catch (error) {
         console.error("Failed to load dashboard data:", error);
@@ -123,22 +125,40 @@ function renderHoldings(status) {
     });
 }
 
+async function fetchJson(path) {
+    const res = await fetch(`${path}?t=${ts}`);
+    return res.json();
+}
+
+// 최근 days건을 덮는 월별 샤드만 (최신 달부터) 병렬로 로드
+async function fetchRecentSummary(index, days) {
+    const shards = [];
+    let count = 0;
+    for (const m of index.summary_months.slice().reverse()) {
+        shards.unshift(m.file);
+        count += m.count;
+        if (count >= days) break;
+    }
+    const parts = await Promise.all(shards.map(f => fetchJson(`data/${f}`)));
+    return parts.flat().slice(-days);
+}
+
 // 3. 차트 렌더링 (Performance & Strategy)
-function renderCharts(summary) {
-    // 최근 90일 데이터만 사용 (너무 많으면 느림)
-    const recentData = summary.slice(-90);
+function renderCharts(overview, summary) {
+    // 전략 차트는 최근 RECENT_DAYS일 원본 데이터 사용
+    const recentData = summary;
     const labels = recentData.map(d => d.date.substring(5)); // MM-DD
 
-    // 3-1. 메인 차트: 자산 가치 vs SPY 주가 (Dual Axis)
+    // 3-1. 메인 차트: 자산 가치 vs SPY 주가 (Dual Axis) - 전체 기간 개요 (다운샘플링)
     const ctxMain = document.getElementById('performanceChart').getContext('2d');
     new Chart(ctxMain, {
         type: 'line',
         data: {
-            labels: labels,
+            labels: overview.dates,
             datasets: [
                 {
                     label: 'My Portfolio ($)',
-                    data: recentData.map(d => d.total_value),
+                    data: overview.total_value,
                     borderColor: '#0d6efd',
                     backgroundColor: 'rgba(13, 110, 253, 0.1)',
                     yAxisID: 'y',
@@ -147,7 +167,7 @@ function renderCharts(summary) {
                 },
                 {
                     label: 'SPY Price ($)',
-                    data: recentData.map(d => d.spy_price),
+                    data: overview.spy_price,
                     borderColor: '#adb5bd',
                     borderDash: [5, 5], // 점선
                     yAxisID: 'y1',
@@ -200,6 +220,49 @@ function renderCharts(summary) {
     });
 }
 
+// 3-3. 누적 성과 (저장소가 미리 계산한 aggregates 사용 - 브라우저에서 전체 기록 재계산 없음)
+function renderAggregates(agg) {
+    const last = agg.last || {};
+    const year = last.date ? agg.yearly[last.date.substring(0, 4)] : null;
+
+    setPercent('ytd-return', year ? year.return : null);
+    setPercent('relative-return', last.relative_return);
+    setPercent('current-drawdown', last.drawdown);
+    setPercent('max-drawdown', agg.max_drawdown);
+
+    const regime = agg.regimes[agg.regimes.length - 1];
+    document.getElementById('regime-since').innerText = regime ? `${regime.start} (${regime.days}d)` : '-';
+
+    // 최근 24개월 월별 수익률
+    const months = Object.keys(agg.monthly).slice(-24);
+    const returns = months.map(m => agg.monthly[m].return * 100);
+    const ctx = document.getElementById('monthlyChart').getContext('2d');
+    new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: months,
+            datasets: [{
+                label: 'Monthly Return (%)',
+                data: returns,
+                backgroundColor: returns.map(r => r >= 0 ? '#198754' : '#dc3545')
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { display: false } }
+        }
+    });
+}
+
+function setPercent(id, value) {
+    const el = document.getElementById(id);
+    if (value === null || value === undefined) {
+        el.innerText = '-';
+        return;
+    }
+    el.innerText = `${value >= 0 ? '+' : ''}${(value * 100).toFixed(2)}%`;
+}
+
 // 4. 매매 기록 (History Table)
 function renderHistory(history) {
     // 최신순 정렬 후 10개만
@@ -1,12 +1,16 @@
 # src/backtest/components.py
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.core.interfaces import IDataProvider, IBrokerAdapter
 from src.core.models import Portfolio, Order, TradeExecution
 from src.infra.broker import MockBroker # 기능 재사용
+from src.backtest.fetcher import compact_price_frame
 
 class BacktestDataLoader(IDataProvider):
-    def __init__(self, full_df: pd.DataFrame, full_vix: pd.DataFrame):
+    def __init__(self, full_df: pd.DataFrame, full_vix: pd.DataFrame, dtype: Optional[str] = None):
+        # dtype 지정 시 필요한 컬럼만 남긴 연속 2D 블록으로 재구성 (예: 'float32')
+        if dtype:
+            full_df = compact_price_frame(full_df, dtype=dtype)
         self.full_df = full_df
         self.full_vix = full_vix
         self.current_date = None # 시뮬레이션 상의 '오늘'
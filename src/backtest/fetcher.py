@@ -1,26 +1,70 @@
 # src/backtest/fetcher.py
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+from src.utils.calculator import IndicatorCalculator
 
-def download_historical_data(tickers: list, start_date: str, end_date: str):
+# 지표 계산용 종목 (IndicatorCalculator는 SPY 기준으로 계산)
+INDICATOR_TICKERS = ("SPY",)
+
+def download_historical_data(tickers: list, start_date: str, end_date: str, dtype: Optional[str] = None):
     """
     백테스팅용 대량 데이터 다운로드
     :param start_date: '2014-01-01'
     :param end_date: '2024-01-01'
+    :param dtype: 'float32' 지정 시 메모리 절반으로 저장 (기본: float64 유지)
     """
-    print(f"📥 Downloading Data for {tickers} ({start_date} ~ {end_date})...")
-    
+    all_tickers = list(dict.fromkeys(list(tickers) + list(INDICATOR_TICKERS)))
+    print(f"📥 Downloading Data for {all_tickers} ({start_date} ~ {end_date})...")
+
     # 지표 계산을 위해 start_date보다 400일 전 데이터부터 필요함 (MA180, Mom12M 등)
     real_start = datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=500)
-    
+
     # 1. 주가 데이터 (수정주가 반영)
-    df = yf.download(tickers, start=real_start, end=end_date, auto_adjust=True, progress=True)
-    
-    # MultiIndex 정리 (Close만 추출하지 않고 전체 유지, Loader에서 처리)
-    
-    # 2. VIX 데이터
+    df = yf.download(all_tickers, start=real_start, end=end_date, auto_adjust=True, progress=True)
+
+    # 전략이 쓰는 컬럼만 유지 (전 종목 Close + 지표 계산용 컬럼)
+    df = compact_price_frame(df, tickers, dtype=dtype)
+
+    # 2. VIX 데이터 (Close만 유지)
     vix = yf.download("^VIX", start=real_start, end=end_date, progress=False)
-    
+    vix = compact_vix_frame(vix, dtype=dtype)
+
     print("✅ Download Complete.")
-    return df, vix
\ No newline at end of file
+    return df, vix
+
+def compact_price_frame(df: pd.DataFrame,
+                        tickers: Optional[Sequence[str]] = None,
+                        indicator_tickers: Sequence[str] = INDICATOR_TICKERS,
+                        indicator_fields: Sequence[str] = IndicatorCalculator.REQUIRED_FIELDS,
+                        dtype: Optional[str] = None) -> pd.DataFrame:
+    """
+    yfinance MultiIndex (Price, Ticker) 프레임에서 필요한 컬럼만 남기고
+    하나의 연속된 2D 블록(C-contiguous ndarray)으로 재구성
+    - tickers: Close를 유지할 종목 (None이면 전 종목)
+    - indicator_tickers/fields: 지표 계산에 필요한 추가 컬럼 (예: SPY의 Close)
+    """
+    if not isinstance(df.columns, pd.MultiIndex):
+        # 단일 종목 프레임은 구조 유지, 타입만 변환
+        return df.astype(dtype) if dtype else df
+
+    available = set(df.columns)
+    if tickers is None:
+        tickers = [t for f, t in df.columns if f == 'Close']
+
+    wanted: List[tuple] = [('Close', t) for t in tickers]
+    wanted += [(f, t) for t in indicator_tickers for f in indicator_fields]
+    columns = [c for c in dict.fromkeys(wanted) if c in available]
+
+    # to_numpy(dtype=...)가 이미 새 배열을 만들므로 DataFrame 생성 시에는 다시 복사하지 않음 (copy=False)
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=dtype or np.float64))
+    return pd.DataFrame(values, index=df.index, columns=pd.MultiIndex.from_tuples(columns), copy=False)
+
+def compact_vix_frame(vix: pd.DataFrame, dtype: Optional[str] = None) -> pd.DataFrame:
+    """VIX 프레임을 단일 'Close' 컬럼으로 정리"""
+    close = vix['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.astype(dtype or np.float64).to_frame('Close')
@@ -1,13 +1,15 @@
 # src/backtest/runner.py
 import pandas as pd
+from typing import Optional
 import matplotlib.pyplot as plt
 from src.config import Config
 from src.core.logic import RegimeAnalyzer, VolatilityTargeter, Rebalancer
 from src.utils.calculator import IndicatorCalculator
+from src.utils.cleaner import DataCleaner
 from src.backtest.fetcher import download_historical_data
 from src.backtest.components import BacktestDataLoader, BacktestBroker
 
-def run_backtest(start_date: str, end_date: str, initial_cash: float = 10000.0):
+def run_backtest(start_date: str, end_date: str, initial_cash: float = 10000.0, dtype: Optional[str] = None):
     # 1. 설정 로드
     config = Config()
     tickers = []
@@ -17,7 +19,14 @@ def run_backtest(start_date: str, end_date: str, initial_cash: float = 10000.0):
 
     # 2. 데이터 준비 (10년치 한방에 로딩)
     print("--- Preparing Data ---")
-    full_df, full_vix = download_historical_data(tickers, start_date, end_date)
+    # 전략에 필요한 컬럼만 유지 (dtype='float32' 지정 시 메모리 절반)
+    full_df, full_vix = download_historical_data(tickers, start_date, end_date, dtype=dtype)
+
+    # 데이터 정제 (전체 기간에 대해 1회만 수행, 매일 반복하지 않음)
+    cleaner = DataCleaner()
+    full_df, report = cleaner.clean(full_df)
+    full_vix = cleaner.align(full_vix, full_df.index)
+    print(f"🧹 Cleaning Report: {report.summary()}")
     
     # 3. 컴포넌트 조립
     loader = BacktestDataLoader(full_df, full_vix)
@@ -35,6 +44,10 @@ def run_backtest(start_date: str, end_date: str, initial_cash: float = 10000.0):
     # 사용자가 요청한 구간으로 필터링
     sim_days = [d for d in trading_days if start_date <= d.strftime("%Y-%m-%d") <= end_date]
     
+    # 지표/벤치마크용으로만 받은 종목(SPY 등)은 가격 주입에서 제외 (전략 자산만 평가/매매 대상)
+    close_df = full_df['Close']
+    asset_close = close_df[[t for t in close_df.columns if t in tickers]]
+
     history = []
     print(f"--- Starting Backtest ({len(sim_days)} trading days) ---")
 
@@ -55,9 +68,10 @@ def run_backtest(start_date: str, end_date: str, initial_cash: float = 10000.0):
                 # full_df['Close'].loc[today] 사용
                 pass
             
-            # 가장 확실한 방법: full_df['Close']에서 추출
-            close_prices = full_df['Close'].loc[today]
-            current_prices = close_prices.to_dict()
+            # 가장 확실한 방법: Close 컬럼(전략 자산)에서 추출
+            close_prices = asset_close.loc[today]
+            # float32 저장 시에도 브로커/포트폴리오에는 파이썬 float로 전달
+            current_prices = {t: float(p) for t, p in close_prices.items()}
             
         except Exception as e:
             # 데이터 누락 시 건너뜀
@@ -0,0 +1,113 @@
+# src/bench/broker_bench.py
+import logging
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from src.bench.fake_kis import FakeKisServer
+from src.core.models import Order
+from src.infra.broker import KisBroker, ExecutionPolicy
+from src.utils.ratelimit import TokenBucket
+
+@dataclass
+class BenchResult:
+    """execute_orders 벤치마크 결과"""
+    name: str
+    wall_times: List[float]                      # 반복별 실행 시간(초)
+    calls: Counter = field(default_factory=Counter)  # 1회 실행당 엔드포인트별 호출 수 (마지막 반복 기준)
+    throttled: int = 0
+    filled: int = 0
+    orders: int = 0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.wall_times)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def summary(self) -> str:
+        top = ", ".join(f"{path.rsplit('/', 1)[-1]}={n}" for path, n in self.calls.most_common())
+        return (f"{self.name:<24} median {self.median:6.2f}s | calls {self.total_calls:3d} "
+                f"(throttled {self.throttled}) | filled {self.filled}/{self.orders} | {top}")
+
+def default_scenario():
+    """전 종목 리밸런싱: 보유 3종목 매도 + 3종목 매수"""
+    prices = {"SSO": 50.0, "QLD": 80.0, "GLD": 180.0, "IEF": 95.0, "PDBC": 14.0, "SHV": 110.0}
+    holdings = {"SSO": 40, "QLD": 30, "GLD": 10}
+    orders = [
+        Order("SSO", "SELL", 40, 50.0),
+        Order("QLD", "SELL", 30, 80.0),
+        Order("GLD", "SELL", 10, 180.0),
+        Order("IEF", "BUY", 20, 95.0),
+        Order("PDBC", "BUY", 100, 14.0),
+        Order("SHV", "BUY", 10, 110.0),
+    ]
+    return prices, holdings, orders
+
+def bench_execute_orders(name: str,
+                         orders: List[Order],
+                         prices: Dict[str, float],
+                         holdings: Dict[str, int],
+                         cash: float = 0.0,
+                         repeat: int = 3,
+                         rate: float = KisBroker.RATE_LIMIT_REAL,
+                         poll_interval: float = KisBroker.POLL_INTERVAL,
+                         execution_policy: Optional[ExecutionPolicy] = None,
+                         **server_kwargs) -> BenchResult:
+    """
+    로컬 스탠드인 서버에 대해 KisBroker.execute_orders 종단 간 시간과 API 호출 수 측정
+    - 반복마다 서버/브로커를 새로 만들어 동일한 초기 잔고에서 시작
+    - server_kwargs: FakeKisServer 옵션 (latency, max_rps, fill_delay, fill_chunk, spread, reject_tickers)
+    """
+    # 브로커 로그는 측정 결과만 보이도록 숨김
+    logger = logging.getLogger("bench.broker")
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    result = BenchResult(name=name, wall_times=[], orders=len(orders))
+    for _ in range(repeat):
+        server = FakeKisServer(prices, cash=cash, holdings=holdings, **server_kwargs)
+        try:
+            broker = KisBroker("bench_key", "bench_secret", "1234567801", logger, is_real=True,
+                               base_url=server.url, rate_limiter=TokenBucket(rate),
+                               execution_policy=execution_policy)
+            broker.POLL_INTERVAL = poll_interval
+            # 실제 실행 흐름과 동일하게 주문 전 잔고를 먼저 조회 (측정 제외)
+            broker.get_portfolio()
+            server.reset_calls()
+
+            batch = [Order(o.ticker, o.action, o.quantity, o.price) for o in orders]
+            start = time.perf_counter()
+            executions = broker.execute_orders(batch)
+            result.wall_times.append(time.perf_counter() - start)
+
+            result.calls = server.call_counts()
+            result.throttled = server.throttled
+            result.filled = sum(1 for e in executions if e.status == "FILLED")
+            broker.close()
+        finally:
+            server.close()
+    return result
+
+def run_broker_benchmark(repeat: int = 3) -> List[BenchResult]:
+    """대표 시나리오 벤치마크 실행 및 결과 출력"""
+    prices, holdings, orders = default_scenario()
+    scenarios = [
+        ("baseline (50ms)", dict(latency=0.05)),
+        ("throttled (10 rps)", dict(latency=0.05, max_rps=10)),
+        ("partial + delayed", dict(latency=0.05, fill_delay=0.5, fill_chunk=5)),
+        ("rejects", dict(latency=0.05, reject_tickers={"PDBC"})),
+    ]
+    results = []
+    print("--- Broker Benchmark (execute_orders) ---")
+    for name, server_kwargs in scenarios:
+        res = bench_execute_orders(name, orders, prices, holdings, repeat=repeat, **server_kwargs)
+        print(res.summary())
+        results.append(res)
+    return results
+
+if __name__ == "__main__":
+    run_broker_benchmark()
@@ -0,0 +1,216 @@
+# src/bench/fake_kis.py
+import json
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class FakeKisServer:
+    """
+    로컬 KIS REST API 스탠드인 (토큰, 해시키, 시세, 잔고, 주문, 정정/취소, 미체결, 체결내역)
+    실서버(모의투자) 없이 KisBroker 경로의 테스트/성능 측정용
+    - 지정가 주문은 호가에 닿아야 체결 (매도: 가격 <= bid, 매수: 가격 >= ask)
+    - fill_delay: 접수 후 체결 시작까지 지연(초)
+    - fill_chunk: 한 번에 체결되는 최대 수량 (부분 체결 흉내), None이면 전량
+    - latency: 요청마다 추가되는 응답 지연(초, 네트워크 왕복 흉내)
+    - max_rps: 초당 허용 요청 수, 초과 시 EGW00201(호출 제한) 응답. None이면 무제한
+    - reject_tickers: 주문을 거부할 종목
+    - exchanges: 상품기본정보(search-info) 조회에 쓰는 종목별 거래소 코드
+    체결은 요청이 들어올 때마다 진행됨 (브로커의 폴링이 곧 시간 경과)
+    """
+    THROTTLE_ERROR_CODE = "EGW00201"
+
+    def __init__(self, prices: dict, spread: float = 0.0, fill_delay: float = 0.0,
+                 fill_chunk: int = None, cash: float = 10000.0, holdings: dict = None,
+                 latency: float = 0.0, max_rps: float = None, reject_tickers=(), exchanges: dict = None):
+        self.prices = dict(prices)
+        self.spread = spread
+        self.fill_delay = fill_delay
+        self.fill_chunk = fill_chunk
+        self.cash = cash
+        self.holdings = dict(holdings or {})
+        self.latency = latency
+        self.max_rps = max_rps
+        self.reject_tickers = set(reject_tickers)
+        self.exchanges = dict(exchanges or {})
+        self.throttled = 0
+        self._recent = deque()  # 최근 1초간 요청 시각
+        self.orders = {}    # {주문번호: 주문 상태}
+        self.calls = []     # [(method, path)]
+        self._seq = 0
+        self._lock = threading.RLock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+                self._reply(server.handle("GET", url.path, params, self.headers))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._reply(server.handle("POST", urlparse(self.path).path, body, self.headers))
+
+            def _reply(self, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ------------------------------------------
+    # 시장 / 체결 시뮬레이션
+    # ------------------------------------------
+    def quote(self, ticker: str):
+        """(bid, ask)"""
+        price = self.prices[ticker]
+        return price * (1 - self.spread / 2), price * (1 + self.spread / 2)
+
+    def open_orders(self):
+        with self._lock:
+            return [o for o in self.orders.values() if o["status"] == "OPEN"]
+
+    def _match(self):
+        now = time.time()
+        for o in self.open_orders():
+            if now - o["created"] < self.fill_delay:
+                continue
+            bid, ask = self.quote(o["ticker"])
+            marketable = o["price"] <= bid if o["action"] == "SELL" else o["price"] >= ask
+            if not marketable:
+                continue
+            qty = o["qty"] - o["filled"]
+            if self.fill_chunk:
+                qty = min(qty, self.fill_chunk)
+            o["filled"] += qty
+            amount = qty * o["price"]
+            if o["action"] == "SELL":
+                self.cash += amount
+                self.holdings[o["ticker"]] = self.holdings.get(o["ticker"], 0) - qty
+            else:
+                self.cash -= amount
+                self.holdings[o["ticker"]] = self.holdings.get(o["ticker"], 0) + qty
+            if o["filled"] >= o["qty"]:
+                o["status"] = "FILLED"
+
+    def _new_order(self, ticker, action, qty, price, exch):
+        self._seq += 1
+        odno = f"{self._seq:010d}"
+        self.orders[odno] = {
+            "odno": odno, "ticker": ticker, "action": action, "qty": qty, "filled": 0,
+            "price": price, "exch": exch, "created": time.time(), "status": "OPEN"
+        }
+        return odno
+
+    # ------------------------------------------
+    # API 라우팅
+    # ------------------------------------------
+    def call_counts(self) -> Counter:
+        """엔드포인트별 호출 수 (호출 제한으로 거부된 요청 포함)"""
+        with self._lock:
+            return Counter(path for _, path in self.calls)
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled = 0
+
+    def _throttle(self) -> bool:
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_rps:
+            self.throttled += 1
+            return True
+        self._recent.append(now)
+        return False
+
+    def handle(self, method: str, path: str, data: dict, headers=None) -> dict:
+        if self.latency:
+            time.sleep(self.latency)  # 락 밖에서 대기 (동시 요청은 병렬로 지연)
+        with self._lock:
+            self.calls.append((method, path))
+            if path != "/oauth2/tokenP" and self._throttle():
+                return {"rt_cd": "1", "msg_cd": self.THROTTLE_ERROR_CODE, "msg1": "초당 거래건수를 초과하였습니다."}
+            self._match()
+
+            if path == "/oauth2/tokenP":
+                return {"access_token": "FAKE_TOKEN", "expires_in": 86400}
+            if path == "/uapi/hashkey":
+                return {"HASH": f"HASH-{data.get('PDNO', '')}"}
+            if path.endswith("/quotations/search-info"):
+                codes = {"512": "NAS", "513": "NYS", "529": "AMS"}
+                if self.exchanges.get(data["PDNO"]) != codes.get(data["PRDT_TYPE_CD"]):
+                    return {"rt_cd": "0", "output": {}}
+                return {"rt_cd": "0", "output": {"std_pdno": data["PDNO"], "prdt_eng_name": data["PDNO"]}}
+            if path.endswith("/quotations/price"):
+                return {"rt_cd": "0", "output": {"last": str(self.prices[data["SYMB"]])}}
+            if path.endswith("/trading/inquire-balance"):
+                # 거래소 구분 없이 전체 보유 종목 반환 (브로커는 종목별로 병합)
+                output1 = [
+                    {"ovrs_pdno": t, "ovrs_cblc_qty": str(q), "now_pric2": str(self.prices.get(t, 0))}
+                    for t, q in self.holdings.items() if q > 0
+                ]
+                return {"rt_cd": "0", "output1": output1, "output2": {"ovrs_ord_psbl_amt": str(self.cash)}}
+            if path.endswith("/trading/inquire-nccs"):
+                output = [
+                    {"odno": o["odno"], "pdno": o["ticker"], "nccs_qty": str(o["qty"] - o["filled"]),
+                     "ft_ord_unpr3": str(o["price"]), "sll_buy_dvsn_cd": "01" if o["action"] == "SELL" else "02",
+                     "ovrs_excg_cd": o["exch"]}
+                    for o in self.open_orders() if o["exch"] == data["OVRS_EXCG_CD"]
+                ]
+                return {"rt_cd": "0", "output": output}
+            if path.endswith("/trading/inquire-ccnl"):
+                # 수수료 필드 없음 (실제 API와 동일)
+                output = [
+                    {"odno": o["odno"], "pdno": o["ticker"], "sll_buy_dvsn_cd": "01" if o["action"] == "SELL" else "02",
+                     "ft_ord_qty": str(o["qty"]), "ft_ccld_qty": str(o["filled"]),
+                     "ft_ccld_unpr3": str(o["price"] if o["filled"] else 0),
+                     "nccs_qty": str(o["qty"] - o["filled"] if o["status"] == "OPEN" else 0),
+                     "prcs_stat_name": "완료" if o["status"] != "OPEN" else "접수"}
+                    for o in reversed(list(self.orders.values()))
+                ]
+                return {"rt_cd": "0", "output": output}
+            if path.endswith("/trading/order"):
+                # 매수/매도 구분은 TR_ID (매도: TTTS1006U / VTTT1006U)
+                action = "SELL" if (headers or {}).get("tr_id", "").endswith("1006U") else "BUY"
+                return self._place(data, action)
+            if path.endswith("/trading/order-rvsecncl"):
+                return self._revise(data)
+            return {"rt_cd": "1", "msg1": f"Unknown path {path}"}
+
+    def _place(self, data: dict, action: str) -> dict:
+        if data["PDNO"] in self.reject_tickers:
+            return {"rt_cd": "1", "msg_cd": "APBK0656", "msg1": "주문이 거부되었습니다."}
+        odno = self._new_order(data["PDNO"], action, int(data["ORD_QTY"]),
+                               float(data["OVRS_ORD_UNPR"]), data["OVRS_EXCG_CD"])
+        return {"rt_cd": "0", "msg1": "주문 전송 완료", "output": {"ODNO": odno}}
+
+    def _revise(self, data: dict) -> dict:
+        orig = self.orders.get(data["ORGN_ODNO"])
+        if not orig or orig["status"] != "OPEN":
+            return {"rt_cd": "1", "msg1": "정정/취소 가능한 주문이 없습니다"}
+        orig["status"] = "CANCELED"
+        if data["RVSE_CNCL_DVSN_CD"] == "02":
+            return {"rt_cd": "0", "output": {"ODNO": orig["odno"]}}
+        qty = min(int(data["ORD_QTY"]), orig["qty"] - orig["filled"])
+        odno = self._new_order(orig["ticker"], orig["action"], qty,
+                               float(data["OVRS_ORD_UNPR"]), orig["exch"])
+        return {"rt_cd": "0", "msg1": "정정 완료", "output": {"ODNO": odno}}
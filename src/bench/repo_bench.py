@@ -0,0 +1,83 @@
+# src/bench/repo_bench.py
+import gzip
+import json
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from src.utils import jsonio
+
+@dataclass
+class FormatResult:
+    """저장 형식별 크기/직렬화 시간"""
+    name: str
+    size: int           # bytes
+    gzip_size: int      # bytes (gzip -9)
+    encode_time: float  # 초 (반복 중앙값)
+
+    def summary(self, baseline: "FormatResult") -> str:
+        return (f"{self.name:<22} {self.size / 1024:9.1f} KB ({self.size / baseline.size:5.1%}) | "
+                f"gz {self.gzip_size / 1024:7.1f} KB | encode {self.encode_time * 1000:7.2f} ms "
+                f"(x{baseline.encode_time / self.encode_time:4.1f})")
+
+def sample_summary(days: int) -> List[Dict]:
+    """save_daily_summary 레코드 형식의 합성 데이터 (days일치)"""
+    rows = []
+    for i in range(days):
+        spy = 400 * (1 + 0.0003) ** i * (1 + 0.05 * math.sin(i / 30))
+        rows.append({
+            "date": f"{2000 + i // 365}-{(i % 365) // 31 + 1:02d}-{(i % 31) + 1:02d}",
+            "total_value": 10000 * (1 + 0.0004) ** i * (1 + 0.03 * math.cos(i / 17)),
+            "cash_balance": 500 + 123.456789 * math.sin(i),
+            "spy_price": spy,
+            "spy_ma180": spy * 0.97,
+            "spy_volatility": 0.15 + 0.05 * math.sin(i / 50),
+            "spy_momentum": 0.02 * math.cos(i / 40),
+            "mdd": -0.1 * abs(math.sin(i / 90)),
+            "regime": "Bull" if math.sin(i / 120) > 0 else "Bear",
+            "target_exposure": 0.5 + 0.5 * abs(math.sin(i / 60)),
+            "drawdown": -0.05 * abs(math.sin(i / 25)),
+            "portfolio_return": (1 + 0.0004) ** i - 1,
+        })
+    return rows
+
+def measure_format(name: str, encode: Callable[[object], bytes], data, repeat: int = 5) -> FormatResult:
+    times = []
+    payload = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = encode(data)
+        times.append(time.perf_counter() - start)
+    return FormatResult(name, len(payload), len(gzip.compress(payload, compresslevel=9)), statistics.median(times))
+
+def bench_formats(days: int = 365 * 5, repeat: int = 5) -> List[FormatResult]:
+    """
+    summary.json 저장 형식 비교
+    - pretty: 기존 형식 (indent=4)
+    - compact(json): 공백 제거 + 필드별 반올림 (표준 json)
+    - compact(orjson): 같은 출력, orjson 설치 시에만
+    """
+    data = sample_summary(days)
+
+    def compact_stdlib(d):
+        rounded = jsonio.round_floats(d)
+        return json.dumps(rounded, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    results = [
+        measure_format("pretty (indent=4)", lambda d: jsonio.dumps(d), data, repeat),
+        measure_format("compact (json)", compact_stdlib, data, repeat),
+    ]
+    if jsonio.orjson is not None:
+        results.append(measure_format("compact (orjson)", lambda d: jsonio.dumps(d, compact=True), data, repeat))
+    return results
+
+def run_repo_benchmark(days: int = 365 * 5):
+    print(f"--- Repository JSON Benchmark (summary, {days} days) ---")
+    results = bench_formats(days)
+    for res in results:
+        print(res.summary(results[0]))
+    return results
+
+if __name__ == "__main__":
+    run_repo_benchmark()
@@ -21,12 +21,36 @@ class Config:
         self.KIS_APP_KEY = os.getenv("KIS_APP_KEY", "")
         self.KIS_APP_SECRET = os.getenv("KIS_APP_SECRET", "")
         self.KIS_ACC_NO = os.getenv("KIS_ACC_NO", "")
+        # 접근 토큰 캐시 파일 (만료 전까지 실행 간 재사용)
+        self.KIS_TOKEN_PATH = os.getenv("KIS_TOKEN_PATH", ".cache/kis_token.json")
+        # 종목별 거래소 코드 캐시 파일 (처음 보는 종목만 조회 후 저장)
+        self.KIS_EXCHANGE_MAP_PATH = os.getenv("KIS_EXCHANGE_MAP_PATH", ".cache/kis_exchanges.json")
+        # HTS ID (설정 시 실시간 체결통보 구독, 미설정 시 미체결 조회 폴링)
+        self.KIS_HTS_ID = os.getenv("KIS_HTS_ID", "")
         
         # 텔레그램
         # self.TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "")
         # self.TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
         self.SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
+        # 알림 전송 대기 파일 (전송 실패/중단 시 다음 실행에서 재전송)
+        self.NOTIFY_OUTBOX_PATH = os.getenv("NOTIFY_OUTBOX_PATH", ".cache/notify_outbox.jsonl")
         
         # 3. 데이터 경로
         self.DATA_PATH = "docs/data"
-        self.LOG_PATH = "logs"
\ No newline at end of file
+        # 기록 저장소: json(기본, docs/data에 JSONL) / sqlite(DB_PATH, 날짜/종목 범위 조회)
+        self.STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+        self.DB_PATH = os.getenv("DB_PATH", "docs/data/trading.db")
+        # docs/data JSON 형식 (선택): compact(들여쓰기 없음 + 소수점 반올림), .gz 사본 생성 여부
+        # 기본값은 기존 형식 유지 (기존 배포의 커밋 데이터 형식이 바뀌지 않도록)
+        self.DATA_COMPACT = os.getenv("DATA_COMPACT", "False").lower() == "true"
+        self.DATA_GZIP = os.getenv("DATA_GZIP", "False").lower() == "true"
+        # summary.json/history.json 전체 배열도 매 실행 다시 쓸지 여부 (대시보드는 월별 샤드만 사용)
+        self.EXPORT_LEGACY_ARRAYS = os.getenv("EXPORT_LEGACY_ARRAYS", "False").lower() == "true"
+        # 포트폴리오 원장 (MockBroker/KisBroker 공통 형식): 체결/입출금 이벤트 + 스냅샷
+        # 모의투자는 다음 실행에서 원장 잔고로 이어서 시작
+        # 모드별로 경로를 나눔 (모드를 바꿔도 모의/실전 이벤트가 한 원장에 섞이지 않도록)
+        default_ledger = "docs/data/ledger/live" if self.IS_LIVE_TRADING else "docs/data/ledger/paper"
+        self.LEDGER_PATH = os.getenv("LEDGER_PATH", default_ledger)
+        self.LOG_PATH = "logs"
+        # 로그 파일을 JSON Lines(step/ticker/latency/order_id 필드)로 기록할지 여부
+        self.LOG_STRUCTURED = os.getenv("LOG_STRUCTURED", "False").lower() == "true"
\ No newline at end of file
@@ -16,9 +16,12 @@ class IBrokerAdapter(ABC):
     def execute_orders(self, orders: List[Order]) -> List[TradeExecution]: ...
     @abstractmethod
     def fetch_current_prices(self, tickers: List[str]) -> Dict[str, float]: ...
+    # 잔고 캐시를 쓰는 브로커만 재정의 (기본: 캐시 없음)
+    def invalidate_portfolio(self) -> None: ...
 
 class INotifier(ABC):
+    # 반환값: 전송(또는 전송 대기열 등록) 성공 여부
     @abstractmethod
-    def send_message(self, message: str) -> None: ...
+    def send_message(self, message: str) -> bool: ...
     @abstractmethod
-    def send_alert(self, message: str) -> None: ...
\ No newline at end of file
+    def send_alert(self, message: str) -> bool: ...
\ No newline at end of file
@@ -40,6 +40,10 @@ class Portfolio:
         """특정 종목 그룹의 평가액 합계"""
         return sum(self.holdings.get(t, 0) * self.current_prices.get(t, 0) for t in tickers)
 
+    def copy(self) -> "Portfolio":
+        """보유/가격 dict까지 분리된 사본 (캐시된 스냅샷 보호용)"""
+        return Portfolio(self.total_cash, dict(self.holdings), dict(self.current_prices))
+
 @dataclass
 class Order:
     ticker: str
@@ -65,4 +69,5 @@ class TradeExecution:
     fee: float    # 수수료
     date: str     # 체결 시간
     status: str   # "FILLED" (체결), "PARTIAL" (부분체결), "REJECTED" (거부)
-    reason: str = "" # 거부 사유 등
\ No newline at end of file
+    reason: str = "" # 거부 사유 등
+    order_id: str = "" # 증권사 주문번호 (체결 추적용)
\ No newline at end of file
@@ -1,18 +1,46 @@
 # src/infra/broker.py
-from typing import List, Dict
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 from src.core.interfaces import IBrokerAdapter
 from src.core.models import Portfolio, Order, TradeExecution
+from src.utils.ratelimit import TokenBucket
+from src.infra.realtime import KisFillListener
+from src.infra.ledger import PortfolioLedger
 import time
-from datetime import datetime
+import json
+import os
+import hashlib
+import threading
+import math
+import requests
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
 
 class MockBroker(IBrokerAdapter):
     """
     로컬 테스트용 가상 브로커
     실제 주문을 내지 않고 로그만 출력함
+    - logger 지정 시 TradeLogger로 기록 (미지정 시 print)
+    - ledger 지정 시 체결을 원장에 기록하고, 다음 실행에서 원장 잔고로 이어서 시작 (모의투자 상태 유지)
     """
-    def __init__(self, initial_cash: float = 10000.0, holdings: Dict[str, float] = None):
+    def __init__(self, initial_cash: float = 10000.0, holdings: Dict[str, float] = None,
+                 ledger: Optional[PortfolioLedger] = None, logger=None):
         self.cash = initial_cash
+        self.logger = logger
         self.holdings = holdings if holdings else {}
+        self.ledger = ledger
+        if ledger is not None:
+            if ledger.is_empty:
+                # 첫 실행: 초기 자금/보유분을 원장에 기록
+                ledger.record_cash(initial_cash, reason="initial")
+                for ticker, qty in self.holdings.items():
+                    ledger.record_position(ticker, qty, reason="initial")
+            else:
+                pf = ledger.current()
+                self.cash = pf.total_cash
+                self.holdings = pf.holdings
         # 현재가는 외부에서 주입받거나, API 호출 시 업데이트된다고 가정
     
     def get_portfolio(self) -> Portfolio:
@@ -38,7 +66,7 @@ class MockBroker(IBrokerAdapter):
         # Phase 1: 매도 집행 (Sell Execution)
         # ==========================================
         if sell_orders:
-            print("[Broker] Sending SELL orders...")
+            self._log("[Broker] Sending SELL orders...")
             for order in sell_orders:
                 # API로 매도 주문 전송
                 res = self._process_order_internal(order)
@@ -46,7 +74,7 @@ class MockBroker(IBrokerAdapter):
             
             # [핵심] 매도 체결 확인 루프 (Polling)
             if not self._wait_for_completion(timeout=60):
-                print("⚠️ [Warning] Sell orders timed out. Some might be partial/unfilled.")
+                self._log("⚠️ [Warning] Sell orders timed out. Some might be partial/unfilled.", warning=True)
                 # (선택사항) 미체결 주문 취소 로직 추가 가능
                 # self._cancel_all_pending_sells()
         
@@ -55,7 +83,7 @@ class MockBroker(IBrokerAdapter):
         # ==========================================
         if sell_orders:
             # 매도가 있었으면 예수금이 변했을 테니, API로 정확한 현재 잔고를 다시 가져옴
-            print("[Broker] Refreshing Cash Balance...")
+            self._log("[Broker] Refreshing Cash Balance...")
             time.sleep(1) # API 반영 딜레이 고려
             self._refresh_balance_from_api() 
         
@@ -63,7 +91,7 @@ class MockBroker(IBrokerAdapter):
         # Phase 3: 매수 집행 (Buy Execution)
         # ==========================================
         if buy_orders:
-            print("[Broker] Sending BUY orders...")
+            self._log("[Broker] Sending BUY orders...")
             for order in buy_orders:
                 # 안전 마진: 현금의 98%만 사용 (환율 변동, 수수료, 슬리피지 대비)
                 SAFE_MARGIN = 0.98
@@ -80,7 +108,8 @@ class MockBroker(IBrokerAdapter):
                 max_qty = int(budget / estimated_price)
                 
                 if max_qty < order.quantity:
-                    print(f"⚠️ [Safety] Qty Adjusted: {order.ticker} {order.quantity} -> {max_qty} (Budget: ${budget:.2f})")
+                    self._log(f"⚠️ [Safety] Qty Adjusted: {order.ticker} {order.quantity} -> {max_qty} (Budget: ${budget:.2f})",
+                              warning=True, ticker=order.ticker)
                     order.quantity = max_qty
                 
                 if order.quantity > 0:
@@ -98,20 +127,23 @@ class MockBroker(IBrokerAdapter):
         # 수수료 시뮬레이션 (0.1%)
         fee = (exec_price * order.quantity) * 0.001
         
-        print(f" > [FILLED] {order.action} {order.ticker}: {order.quantity} @ ${exec_price:.2f} (Fee: ${fee:.2f})")
+        self._log(f" > [FILLED] {order.action} {order.ticker}: {order.quantity} @ ${exec_price:.2f} (Fee: ${fee:.2f})",
+                  ticker=order.ticker)
         
         amount = exec_price * order.quantity
         
         # 잔고 반영
+        cash_delta = 0.0
         if order.action == "BUY":
-            self.cash -= (amount + fee)
+            cash_delta = -(amount + fee)
             self.holdings[order.ticker] = self.holdings.get(order.ticker, 0) + order.quantity
         elif order.action == "SELL":
-            self.cash += (amount - fee)
+            cash_delta = amount - fee
             current_qty = self.holdings.get(order.ticker, 0)
             self.holdings[order.ticker] = max(0, current_qty - order.quantity)
+        self.cash += cash_delta
             
-        return TradeExecution(
+        execution = TradeExecution(
             ticker=order.ticker,
             action=order.action,
             quantity=order.quantity,
@@ -120,6 +152,10 @@ class MockBroker(IBrokerAdapter):
             date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             status="FILLED"
         )
+        if self.ledger is not None:
+            # 반올림 전 실제 현금 변동을 기록 -> 원장 잔고와 브로커 잔고가 정확히 일치
+            self.ledger.record_execution(execution, cash_delta=cash_delta)
+        return execution
     def _wait_for_completion(self, timeout: int = 60) -> bool:
         """
         모든 주문이 체결될 때까지 대기하는 함수
@@ -131,14 +167,23 @@ class MockBroker(IBrokerAdapter):
             pending_orders = self._get_pending_orders_count()
             
             if pending_orders == 0:
-                print("[Broker] All sell orders filled!")
+                self._log("[Broker] All sell orders filled!")
                 return True
             
-            print(f"... Waiting for fills ({pending_orders} pending) ...")
+            self._log(f"... Waiting for fills ({pending_orders} pending) ...")
             time.sleep(2) # 2초 간격 polling
             
         return False
 
+    def _log(self, msg: str, warning: bool = False, **fields):
+        # extra: TradeLogger 구조화 필드 (logging.Logger를 넘겨도 동작)
+        if self.logger is None:
+            print(msg)
+        elif warning:
+            self.logger.warning(msg, extra=fields)
+        else:
+            self.logger.info(msg, extra=fields)
+
     def _get_pending_orders_count(self) -> int:
         # 실제 구현 시: KIS API '주문/체결 > 미체결내역 상세조회' 호출
         # Mock에서는 0 리턴
@@ -149,15 +194,198 @@ class MockBroker(IBrokerAdapter):
         pass
 
 
+class KisTokenCache:
+    """
+    KIS 접근 토큰 디스크 캐시
+    토큰 발급(/oauth2/tokenP)은 빈도 제한이 있으므로, 만료 전까지 여러 실행에서 재사용함
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def make_key(base_url: str, app_key: str) -> str:
+        # 실전/모의, 앱키가 바뀌면 다른 토큰으로 취급 (앱키 원문은 저장하지 않음)
+        return hashlib.sha256(f"{base_url}|{app_key}".encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if data.get("key") != key or not data.get("access_token"):
+            return None
+        return data
+
+    def save(self, key: str, access_token: str, expires_at: float):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        # 토큰 파일은 소유자만 읽기/쓰기
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"key": key, "access_token": access_token, "expires_at": expires_at}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class KisExchangeResolver:
+    """
+    종목별 거래소 코드(NAS/NYS/AMS) 조회기
+    - 처음 보는 종목만 lookup으로 1회 조회하고 결과를 로컬 파일에 저장 (다음 실행부터 재사용)
+    - 조회 실패 시 기본값(NAS)을 쓰되 저장하지 않음 (다음에 다시 조회)
+    """
+    DEFAULT = "NAS"
+
+    def __init__(self, lookup: Callable[[str], Optional[str]], path: Optional[str] = None,
+                 seed: Optional[Dict[str, str]] = None):
+        self.lookup = lookup
+        self.path = path
+        self._lock = threading.Lock()
+        self._codes: Dict[str, str] = dict(seed or {})
+        self._codes.update(self._load())
+
+    def resolve(self, ticker: str) -> str:
+        with self._lock:
+            code = self._codes.get(ticker)
+        if code:
+            return code
+        code = self.lookup(ticker)
+        if not code:
+            return self.DEFAULT
+        with self._lock:
+            self._codes[ticker] = code
+            self._save()
+        return code
+
+    def warm_up(self, tickers: Iterable[str], max_workers: int = 8) -> Dict[str, str]:
+        """유니버스 전체 선조회 (모르는 종목만 동시 조회)"""
+        tickers = list(dict.fromkeys(tickers))
+        with self._lock:
+            unknown = [t for t in tickers if t not in self._codes]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(unknown))) as pool:
+                list(pool.map(self.resolve, unknown))
+        with self._lock:
+            return {t: self._codes.get(t, self.DEFAULT) for t in tickers}
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._codes, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class ExecutionPolicy:
+    """
+    미체결 지정가 주문 재호가 정책
+    - reprice_interval초 안에 체결되지 않으면 step만큼 체결되기 쉬운 가격으로 정정 (매도는 낮게, 매수는 높게)
+    - 원래 주문가 대비 max_slippage를 넘어서 정정하지 않음
+    """
+    reprice_interval: float = 5.0
+    step: float = 0.002
+    max_slippage: float = 0.01
+    max_attempts: int = 5
+
+    def price_for(self, action: str, base_price: float, attempt: int) -> float:
+        """attempt번째 재호가 가격 (소수점 2자리, 슬리피지 한도 안쪽으로 반올림)"""
+        move = min(self.step * attempt, self.max_slippage)
+        if action == "SELL":
+            return math.ceil(round(base_price * (1 - move) * 100, 6)) / 100
+        return math.floor(round(base_price * (1 + move) * 100, 6)) / 100
+
+
 # 실전용 (뼈대 코드)
 class KisBroker(IBrokerAdapter):
     """한국투자증권 REST API 구현체"""
-    def __init__(self, app_key: str, app_secret: str, acc_no: str, logger, is_real: bool = False):
+    # 타임아웃 (연결, 응답) 초
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 10
+    # 만료 10분 전에 미리 토큰 갱신
+    TOKEN_REFRESH_MARGIN = 600
+    # 토큰 만료/무효 응답 코드 (EGW00123: 기간 만료, EGW00121: 유효하지 않은 토큰)
+    TOKEN_ERROR_CODES = ("EGW00123", "EGW00121")
+    # 초당 호출 제한 (실전 20건, 모의 2건) 및 초과 응답 코드
+    RATE_LIMIT_REAL = 20
+    RATE_LIMIT_VIRTUAL = 2
+    THROTTLE_ERROR_CODE = "EGW00201"
+    MAX_THROTTLE_RETRIES = 3
+    # 동시 요청 스레드 수 (실제 호출 속도는 rate_limiter가 제한)
+    MAX_WORKERS = 8
+    # 미국 거래소 코드 및 연속조회 최대 페이지 수
+    EXCHANGES = ("NAS", "NYS", "AMS")
+    MAX_PAGES = 20
+    # 잔고 스냅샷 재사용 시간(초) - 주문 접수/체결 시에는 즉시 무효화
+    PORTFOLIO_TTL = 10
+    # 미체결 조회 폴링 간격(초)
+    POLL_INTERVAL = 2
+    # 거래소 코드를 아는 종목 (조회 없이 사용)
+    KNOWN_EXCHANGES = {
+        'SPY': 'AMS', # AMEX (Arca)
+        'QLD': 'AMS', # ProShares는 보통 Arca
+        'SSO': 'AMS',
+        'IEF': 'NAS', # NASDAQ
+        'GLD': 'NYS', # NYSE
+        'PDBC': 'NAS',
+        'SHV': 'NAS'
+    }
+    # 상품기본정보 조회용 상품유형코드 -> 거래소 코드
+    PRODUCT_TYPES = (("512", "NAS"), ("513", "NYS"), ("529", "AMS"))
+
+    def __init__(self, app_key: str, app_secret: str, acc_no: str, logger, is_real: bool = False,
+                 session: Optional[requests.Session] = None, token_path: Optional[str] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 fill_listener: Optional[KisFillListener] = None,
+                 execution_policy: Optional[ExecutionPolicy] = None,
+                 base_url: Optional[str] = None,
+                 exchange_map_path: Optional[str] = None,
+                 ledger: Optional[PortfolioLedger] = None):
         self.app_key = app_key
         self.app_secret = app_secret
         self.acc_no = acc_no
         self.logger = logger
         self.is_real = is_real
+
+        # 모든 API 호출이 공유하는 Keep-Alive 커넥션 풀 (매 호출마다 TCP+TLS 핸드셰이크 방지)
+        self.session = session if session else self._create_session()
+        # 시세/해시키/주문/미체결 조회 등 모든 엔드포인트가 공유하는 호출 제한기
+        self.rate_limiter = rate_limiter if rate_limiter else TokenBucket(
+            self.RATE_LIMIT_REAL if is_real else self.RATE_LIMIT_VIRTUAL
+        )
+        # 실시간 체결통보 구독기 (없으면 미체결 조회 폴링으로 대체)
+        self.fill_listener = fill_listener
+        if fill_listener:
+            fill_listener.on_fill = self._on_fill
+        # 미체결 재호가 정책 (없으면 정정 없이 대기만 함)
+        self.execution_policy = execution_policy
+        # 종목별 거래소 코드 (조회 결과는 exchange_map_path에 저장)
+        self.exchange_resolver = KisExchangeResolver(self._lookup_exchange, exchange_map_path,
+                                                     seed=self.KNOWN_EXCHANGES)
+        # 체결 이벤트 원장 (MockBroker와 같은 이벤트 기록, 없으면 기록 생략)
+        self.ledger = ledger
+        # 주문 전 잔고를 못 읽어 원장을 초기화하지 못한 경우, 다음 잔고 조회 성공 시 초기화
+        self._ledger_seed_pending = False
+        # 정정 주문번호 -> 원주문번호 (체결 내역 합산용)
+        self._revised_from: Dict[str, str] = {}
+        # 잔고 스냅샷 캐시 (조회 시각, Portfolio)
+        self._portfolio_cache: Optional[Tuple[float, Portfolio]] = None
+        self._portfolio_valid_since = 0.0
+        self._portfolio_lock = threading.Lock()
         
         # 계좌번호 분리 (앞 8자리, 뒤 2자리)
         self.cano = acc_no[:8]
@@ -170,10 +398,133 @@ class KisBroker(IBrokerAdapter):
         else:
             self.base_url = "https://openapivts.koreainvestment.com:29443"
             self.logger.info("[KisBroker] Mode: PAPER TRADING (Virtual)")
-        self.access_token = self._auth()
+        # 로컬 테스트 서버 등으로 대체할 때만 지정
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+
+        # 토큰: 캐시에 유효한 토큰이 있으면 재사용, 없으면 발급
+        self.token_cache = KisTokenCache(token_path) if token_path else None
+        self._token_key = KisTokenCache.make_key(self.base_url, app_key)
+        self.token_expires_at = 0.0
+        self._auth_lock = threading.Lock()
+        self.access_token = self._load_cached_token() or self._auth()
+
+    @staticmethod
+    def _create_session(pool_size: int = 10) -> requests.Session:
+        """
+        재시도 어댑터가 장착된 세션 생성
+        - GET(조회)만 응답 오류 시 재시도, POST(주문 등)는 연결 실패 시에만 재시도 (중복 주문 방지)
+        """
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            status=2,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        공통 HTTP 호출 (세션 재사용 + 타임아웃 강제 + 호출 제한)
+        - 제한 초과 응답: 속도를 낮추고 재시도
+        - 토큰 만료 응답: 토큰을 재발급하고 1회 재시도
+        """
+        kwargs.setdefault("timeout", (self.CONNECT_TIMEOUT, self.READ_TIMEOUT))
+        res = self._send_limited(method, url, **kwargs)
+
+        headers = kwargs.get("headers")
+        if headers and "authorization" in headers and self._msg_cd(res) in self.TOKEN_ERROR_CODES:
+            with self._auth_lock:
+                # 동시 요청 중 다른 스레드가 이미 재발급했다면 그 토큰을 사용
+                if headers["authorization"] == f"Bearer {self.access_token}":
+                    self.logger.warning("[KisBroker] Access token rejected. Re-issuing token...")
+                    self.access_token = self._auth()
+            kwargs["headers"] = {**headers, "authorization": f"Bearer {self.access_token}"}
+            res = self._send_limited(method, url, **kwargs)
+        return res
+
+    def _send_limited(self, method: str, url: str, **kwargs) -> requests.Response:
+        for _ in range(self.MAX_THROTTLE_RETRIES):
+            self.rate_limiter.acquire()
+            res = self.session.request(method, url, **kwargs)
+            if self._msg_cd(res) != self.THROTTLE_ERROR_CODE:
+                self.rate_limiter.reward()
+                return res
+            self.rate_limiter.penalize()
+            self.logger.warning(f"[KisBroker] Rate limit exceeded. Slowing down to {self.rate_limiter.rate:.1f} req/s")
+        self.rate_limiter.acquire()
+        return self.session.request(method, url, **kwargs)
+
+    @staticmethod
+    def _msg_cd(res: requests.Response) -> Optional[str]:
+        try:
+            return res.json().get("msg_cd")
+        except Exception:
+            return None
+
+    def close(self):
+        """커넥션 풀 및 실시간 구독 정리"""
+        if self.fill_listener:
+            self.fill_listener.stop()
+        self.session.close()
+
+    def get_approval_key(self) -> str:
+        """웹소켓 접속키 발급 (실시간 체결통보 구독용)"""
+        url = f"{self.base_url}/oauth2/Approval"
+        payload = {
+            "grant_type": "client_credentials",
+            "appkey": self.app_key,
+            "secretkey": self.app_secret
+        }
+        data = self._request("POST", url, json=payload).json()
+        if 'approval_key' not in data:
+            raise Exception(f"Approval Key Failed: {data}")
+        return data['approval_key']
+
+    def start_fill_listener(self, hts_id: str, url: Optional[str] = None) -> bool:
+        """
+        실시간 체결통보 구독 시작
+        실패해도 예외를 던지지 않고 False 반환 (폴링 방식으로 동작)
+        """
+        try:
+            listener = KisFillListener(self.get_approval_key(), hts_id, self.logger, self.is_real, url,
+                                       on_fill=self._on_fill)
+            if not listener.start():
+                self.logger.warning("[KisBroker] Fill listener not connected. Falling back to polling.")
+                listener.stop()
+                return False
+            self.fill_listener = listener
+            return True
+        except Exception as e:
+            self.logger.warning(f"[KisBroker] Fill listener unavailable ({e}). Falling back to polling.")
+            return False
+
+    def _load_cached_token(self) -> Optional[str]:
+        if not self.token_cache:
+            return None
+        cached = self.token_cache.load(self._token_key)
+        if not cached or cached["expires_at"] - self.TOKEN_REFRESH_MARGIN <= time.time():
+            return None
+        self.token_expires_at = cached["expires_at"]
+        self.logger.info("[KisBroker] Reusing cached access token.")
+        return cached["access_token"]
+
+    def _ensure_token(self):
+        """만료 임박 시 선제적으로 토큰 갱신"""
+        with self._auth_lock:
+            if self.token_expires_at - self.TOKEN_REFRESH_MARGIN <= time.time():
+                self.access_token = self._auth()
 
     def _auth(self) -> str:
-        """접근 토큰 발급"""
+        """접근 토큰 발급 (발급 시 만료시각과 함께 캐시에 저장)"""
         url = f"{self.base_url}/oauth2/tokenP"
         payload = {
             "grant_type": "client_credentials",
@@ -181,10 +532,14 @@ class KisBroker(IBrokerAdapter):
             "appsecret": self.app_secret
         }
         try:
-            res = requests.post(url, json=payload)
+            res = self._request("POST", url, json=payload)
             data = res.json()
             if 'access_token' not in data:
                 raise Exception(f"Auth Failed: {data}")
+            # expires_in: 유효기간(초), 기본 24시간
+            self.token_expires_at = time.time() + float(data.get('expires_in', 86400))
+            if self.token_cache:
+                self.token_cache.save(self._token_key, data['access_token'], self.token_expires_at)
             return data['access_token']
         except Exception as e:
             self.logger.error(f"[KisBroker] Auth Error: {e}")
@@ -192,6 +547,7 @@ class KisBroker(IBrokerAdapter):
 
     def _get_header(self, tr_id: str, data: dict = None) -> dict:
         """API 공통 헤더 생성 (HashKey 포함)"""
+        self._ensure_token()
         headers = {
             "Content-Type": "application/json; charset=utf-8",
             "authorization": f"Bearer {self.access_token}",
@@ -208,7 +564,7 @@ class KisBroker(IBrokerAdapter):
     def _get_hashkey(self, data: dict) -> str:
         url = f"{self.base_url}/uapi/hashkey"
         try:
-            res = requests.post(url, headers={
+            res = self._request("POST", url, headers={
                 "content-type": "application/json",
                 "appkey": self.app_key,
                 "appsecret": self.app_secret
@@ -219,80 +575,120 @@ class KisBroker(IBrokerAdapter):
     
     def fetch_current_prices(self, tickers: List[str]) -> Dict[str, float]:
         """
-        해외주식 현재가 조회 (반복 호출)
+        해외주식 현재가 조회 (종목별 동시 호출, 실패 종목은 0.0)
         """
-        prices = {}
+        if not tickers:
+            return {}
         # 실전 TR_ID: HHDFS00000300, 모의: FHKST01010100
         tr_id = "HHDFS00000300" if self.is_real else "FHKST01010100"
         url = f"{self.base_url}/uapi/overseas-price/v1/quotations/price" 
-        for ticker in tickers:
-            exch = self._get_exchange_code(ticker)
-            params = {
-                "AUTH": "",
-                "EXCD": exch,
-                "SYMB": ticker
-            }
-            # GET 요청은 HashKey 불필요
-            headers = self._get_header(tr_id)
-            try:
-                # 잦은 호출 방지 (초당 제한 고려)
-                time.sleep(0.1) 
-                res = requests.get(url, headers=headers, params=params)
-                data = res.json()
-                
-                if data['rt_cd'] == '0': # 성공
-                    # last: 현재가
-                    price = float(data['output']['last'])
-                    prices[ticker] = price
-                else:
-                    self.logger.warning(f"[KisBroker] Price fetch failed for {ticker}: {data.get('msg1')}")
-                    prices[ticker] = 0.0
-            except Exception as e:
-                self.logger.error(f"[KisBroker] Price fetch error {ticker}: {e}")
-                prices[ticker] = 0.0
-                
-        return prices
+        # GET 요청은 HashKey 불필요 -> 헤더는 한 번만 생성해서 공유
+        headers = self._get_header(tr_id)
+
+        # 호출 속도는 공유 rate_limiter가 제한하므로 스레드 수만큼 동시에 대기/전송
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(tickers))) as pool:
+            results = list(pool.map(lambda t: self._fetch_price(url, headers, t), tickers))
+        return dict(zip(tickers, results))
+
+    def _fetch_price(self, url: str, headers: dict, ticker: str) -> float:
+        """단일 종목 현재가 조회"""
+        params = {
+            "AUTH": "",
+            "EXCD": self._get_exchange_code(ticker),
+            "SYMB": ticker
+        }
+        try:
+            res = self._request("GET", url, headers=headers, params=params)
+            data = res.json()
+            
+            if data['rt_cd'] == '0': # 성공
+                # last: 현재가
+                return float(data['output']['last'])
+            self.logger.warning(f"[KisBroker] Price fetch failed for {ticker}: {data.get('msg1')}")
+        except Exception as e:
+            self.logger.error(f"[KisBroker] Price fetch error {ticker}: {e}")
+        return 0.0
 
     def get_portfolio(self) -> Portfolio:
+        """
+        잔고 스냅샷 조회
+        - PORTFOLIO_TTL 이내에 조회한 스냅샷이 있으면 API 호출 없이 사본 반환
+        - 주문 접수/체결 이벤트로 무효화된 경우에만 다시 조회
+        - 조회 실패 시 빈 잔고
+        """
+        pf = self._load_portfolio()
+        return pf if pf is not None else Portfolio(0, {}, {})
+
+    def _load_portfolio(self) -> Optional[Portfolio]:
+        """잔고 스냅샷 (캐시 또는 API 조회), 조회 실패 시 None"""
+        with self._portfolio_lock:
+            cached = self._portfolio_cache
+            if cached and time.monotonic() - cached[0] < self.PORTFOLIO_TTL:
+                return cached[1].copy()
+
+        fetched_at = time.monotonic()
+        pf = self._fetch_portfolio()
+        if pf is None:
+            return None
+        with self._portfolio_lock:
+            # 조회 도중 무효화되지 않았을 때만 저장 (주문 이전 잔고를 캐시하지 않도록)
+            if self._portfolio_valid_since <= fetched_at:
+                self._portfolio_cache = (fetched_at, pf)
+        if self._ledger_seed_pending and self.ledger is not None and self.ledger.is_empty:
+            # 이전 주문의 체결까지 반영된 실제 잔고로 원장 시작
+            self._seed_ledger(pf)
+        self._ledger_seed_pending = False
+        return pf.copy()
+
+    def invalidate_portfolio(self):
+        """잔고 캐시 무효화 (주문 접수, 체결 통보 시)"""
+        with self._portfolio_lock:
+            self._portfolio_cache = None
+            self._portfolio_valid_since = time.monotonic()
+
+    def _on_fill(self, event):
+        self.invalidate_portfolio()
+
+    def _fetch_portfolio(self) -> Optional[Portfolio]:
         """
         해외주식 잔고 및 예수금 조회
+        - NAS, NYS, AMS 거래소별 잔고를 동시 조회하고 연속조회 키를 따라 전체 종목을 병합
+        - 한 거래소라도 실패하면 불완전한 잔고로 리밸런싱하지 않도록 None 반환
         """
         # 해외주식 잔고지원 TR_ID (실전: TTTS3012R, 모의: VTTS3012R)
         tr_id = "TTTS3012R" if self.is_real else "VTTS3012R"
         url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-balance"
-        # 환율구분: 000(전체), 국가: US(미국), 시장: NYSE
-        params = {
-            "CANO": self.cano,
-            "ACNT_PRDT_CD": self.acnt_prdt_cd,
-            "OVRS_EXCG_CD": "NAS", # 대표 시장
-            "TR_CRCY_CD": "USD",
-            "CTX_AREA_FK100": "",
-            "CTX_AREA_NK100": ""
-        }
-        
         headers = self._get_header(tr_id)
+
+        def fetch(exch: str):
+            params = {
+                "CANO": self.cano,
+                "ACNT_PRDT_CD": self.acnt_prdt_cd,
+                "OVRS_EXCG_CD": exch,
+                "TR_CRCY_CD": "USD"
+            }
+            return self._inquire_pages(url, headers, params, list_key='output1')
+
         try:
-            res = requests.get(url, headers=headers, params=params)
-            data = res.json()
-            
-            if data['rt_cd'] != '0':
-                self.logger.error(f"[KisBroker] Get Portfolio Failed: {data.get('msg1')}")
-                return Portfolio(0, {}, {})
-            # 1. 예수금 (주문가능 외화금액) - output2의 'frcr_dncl_amt_2' (외화예수금) 또는 'ovrs_ord_psbl_amt'(주문가능)
-            # 안전하게 주문가능금액 사용
-            cash = float(data['output2']['ovrs_ord_psbl_amt'])
-            
-            # 2. 보유 종목 (output1)
+            with ThreadPoolExecutor(max_workers=len(self.EXCHANGES)) as pool:
+                results = list(pool.map(fetch, self.EXCHANGES))
+
+            # 1. 예수금 (주문가능 외화금액) - 계좌 단위 값이므로 첫 거래소 응답 사용
+            # output2의 'frcr_dncl_amt_2' (외화예수금) 대신 안전하게 주문가능금액 사용
+            cash = float(results[0][1]['output2']['ovrs_ord_psbl_amt'])
+
+            # 2. 보유 종목 (output1) - 같은 종목이 중복 조회되어도 합산하지 않음
             holdings = {}
             current_prices = {}
-            for item in data['output1']:
-                # ccls_qty: 체결 수량 (잔고)
-                qty = int(item['ovrs_cblc_qty'])
-                if qty > 0:
-                    ticker = item['ovrs_pdno'] # 티커
-                    holdings[ticker] = qty
-                    # 잔고 조회 시 현재가도 같이 옴 (now_pric2)
-                    current_prices[ticker] = float(item['now_pric2'])
+            for rows, _ in results:
+                for item in rows:
+                    # ovrs_cblc_qty: 잔고 수량
+                    qty = int(item['ovrs_cblc_qty'])
+                    if qty > 0:
+                        ticker = item['ovrs_pdno'] # 티커
+                        holdings[ticker] = qty
+                        # 잔고 조회 시 현재가도 같이 옴 (now_pric2)
+                        current_prices[ticker] = float(item['now_pric2'])
             return Portfolio(
                 total_cash=cash,
                 holdings=holdings,
@@ -301,40 +697,64 @@ class KisBroker(IBrokerAdapter):
 
         except Exception as e:
             self.logger.error(f"[KisBroker] Error getting portfolio: {e}")
-            return Portfolio(0, {}, {})
+            return None
+
+    def _inquire_pages(self, url: str, headers: dict, params: dict, list_key: str = 'output', ctx_size: int = 100):
+        """
+        연속조회 GET 공통 처리
+        - 응답 헤더 tr_cont가 M/F면 CTX_AREA_FK/NK 키(ctx_size: 100 또는 200)와 tr_cont: N 으로 다음 페이지 요청
+        - (전체 행 목록, 마지막 페이지 응답) 반환, 실패 응답은 예외
+        """
+        rows = []
+        fk, nk = "", ""
+        for page in range(self.MAX_PAGES):
+            page_params = {**params, f"CTX_AREA_FK{ctx_size}": fk, f"CTX_AREA_NK{ctx_size}": nk}
+            page_headers = {**headers, "tr_cont": "N"} if page else headers
+            res = self._request("GET", url, headers=page_headers, params=page_params)
+            data = res.json()
+            if data['rt_cd'] != '0':
+                raise Exception(f"{params.get('OVRS_EXCG_CD', '')} {data.get('msg1')}")
+            rows.extend(data.get(list_key) or [])
+            if res.headers.get('tr_cont') not in ('M', 'F'):
+                break
+            fk = data.get(f'ctx_area_fk{ctx_size}', "").strip()
+            nk = data.get(f'ctx_area_nk{ctx_size}', "").strip()
+        return rows, data
 
     def execute_orders(self, orders: List[Order]) -> List[TradeExecution]:
         executions = []
         sell_orders = [o for o in orders if o.action == "SELL"]
         buy_orders = [o for o in orders if o.action == "BUY"]
+        # 주문 전 잔고 - 매수 수량을 정하는 기준이므로 캐시된 스냅샷이 아닌 최신 잔고로 조회
+        # (체결 내역을 반영해 이후 잔고를 계산, 조회 실패 시 None -> 원장 초기화에 쓰지 않음)
+        self.invalidate_portfolio()
+        loaded_pf = self._load_portfolio()
+        base_pf = loaded_pf if loaded_pf is not None else Portfolio(0, {}, {})
         
         # === 1. 매도 실행 ===
         if sell_orders:
             self.logger.info(f"[KisBroker] Processing {len(sell_orders)} SELL orders...")
-            for order in sell_orders:
-                res = self._send_order(order)
-                if res: executions.append(res)
-                time.sleep(0.2) # API 제한 고려
+            sell_executions = self._submit_orders(sell_orders)
             
-            # 매도 후 체결 대기 (Polling)
-            if not self._wait_for_completion(timeout=60):
+            # 매도 후 체결 대기 (실시간 체결통보, 미연결 시 Polling / 정책이 있으면 미체결 재호가)
+            if not self._work_orders(sell_executions, timeout=60):
                 self.logger.warning("[KisBroker] Sell orders timed out or pending.")
+            executions.extend(self._reconcile_executions(sell_executions))
 
         # === 2. 잔고 갱신 및 매수 재계산 ===
         if buy_orders:
-            # 매도가 있었다면 잔고가 변했을 것이므로 갱신 (API 재호출)
-            if sell_orders:
+            if sell_orders and (not self._all_filled(executions) or base_pf.total_value <= 0):
+                # 체결 내역으로 확정되지 않은 매도가 있으면 잔고를 다시 조회 (API 재호출)
                 time.sleep(2) # 정산 대기
-                pf = self.get_portfolio()
-                current_cash = pf.total_cash
+                current_cash = self.get_portfolio().total_cash
             else:
-                # 매도가 없었다면 로컬에 저장된 잔고로는 불안하므로 한번 더 조회 권장
-                pf = self.get_portfolio()
-                current_cash = pf.total_cash
+                # 매도가 없거나 전량 체결이면 주문 전 잔고 + 실제 매도 대금 (잔고 재조회 생략)
+                current_cash = self._apply_fills(base_pf, executions).total_cash
 
             self.logger.info(f"[KisBroker] Available Cash for BUY: ${current_cash:,.2f}")
 
-            # === 3. 매수 실행 ===
+            # === 3. 매수 수량 확정 (전송 전에 예산을 미리 배분) ===
+            ready = []
             for order in buy_orders:
                 # 안전 마진 (98%)
                 SAFE_MARGIN = 0.98
@@ -352,29 +772,304 @@ class KisBroker(IBrokerAdapter):
                     order.quantity = max_qty
                 
                 if order.quantity > 0:
-                    res = self._send_order(order)
-                    if res:
-                        executions.append(res)
-                        # 메모리상 잔고 차감 (다음 주문을 위해)
-                        current_cash -= (res.price * res.quantity)
-                    time.sleep(0.2)
+                    ready.append(order)
+                    # 메모리상 잔고 차감 (다음 주문을 위해, 주문 단가 기준)
+                    current_cash -= round(order.price, 2) * order.quantity
+
+            # === 4. 매수 실행 ===
+            buy_executions = self._submit_orders(ready)
+
+            # 재호가 정책이 있으면 정해진 횟수만큼 미체결 매수도 정정
+            policy = self.execution_policy
+            if policy and buy_executions:
+                if not self._work_orders(buy_executions, timeout=policy.reprice_interval * (policy.max_attempts + 1)):
+                    self.logger.warning("[KisBroker] Buy orders still pending.")
+            executions.extend(self._reconcile_executions(buy_executions))
+
+        # 모든 주문이 체결 내역으로 확정되면 주문 후 잔고를 계산해 스냅샷으로 저장 (잔고 재조회 생략)
+        if executions and self._all_filled(executions) and base_pf.total_value > 0:
+            self._store_portfolio(self._apply_fills(base_pf, executions))
+        self._record_ledger(loaded_pf, executions)
+        return executions
+
+    def _record_ledger(self, base_pf: Optional[Portfolio], executions: List[TradeExecution]):
+        """
+        체결 확인을 마친 주문을 원장에 기록
+        - 원장이 비어 있으면 주문 전 잔고를 초기 상태로 기록
+        - 주문 전 잔고 조회에 실패했으면 0 잔고 기준으로 기록하지 않고, 다음 잔고 조회 성공 시 초기화
+        - 이전 실행에서 ORDERED로 남은 주문은 체결 내역으로 확인되면 확정 기록
+        """
+        if self.ledger is None:
+            return
+        if self.ledger.is_empty:
+            if base_pf is None:
+                self.logger.warning("[KisBroker] Balance unavailable; ledger will start from the next balance fetch.")
+                self._ledger_seed_pending = True
+                return
+            self._seed_ledger(base_pf)
+        self._settle_open_orders()
+        for e in executions:
+            self.ledger.record_execution(e)
+
+    def _seed_ledger(self, pf: Portfolio):
+        self.ledger.record_cash(pf.total_cash, reason="initial")
+        for ticker, qty in pf.holdings.items():
+            if qty > 0:
+                self.ledger.record_position(ticker, qty, reason="initial")
+
+    def _settle_open_orders(self):
+        """
+        원장에 ORDERED로 남은 주문을 체결 내역으로 확인해 확정 기록 (FILLED/PARTIAL/REJECTED)
+        - 미체결 수량이 남아 있거나 조회 실패 시 그대로 두고 다음 실행에서 다시 확인
+        - 조회 범위(전일~당일)를 지났는데 내역이 없으면 만료(REJECTED)로 정리
+        """
+        open_orders = self.ledger.open_orders()
+        if not open_orders:
+            return
+        fills = self._inquire_fills()
+        if fills is None:
+            return
+        pending = [TradeExecution(ticker=o["ticker"], action=o["action"], quantity=o["quantity"],
+                                  price=o["price"], fee=0.0, date=o["date"], status="ORDERED",
+                                  order_id=o["order_id"]) for o in open_orders]
+        self._apply_fill_rows(pending, fills)
+
+        now = datetime.now()
+        horizon = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+        for e in pending:
+            row = fills.get(e.order_id)
+            if row and int(row.get('nccs_qty') or 0) > 0:
+                continue  # 아직 미체결 수량이 남아 있음 (전량 확정 후 기록)
+            if e.status == "ORDERED":
+                if row or e.date[:10] >= horizon:
+                    continue
+                e.status = "REJECTED"
+                e.reason = "No fill record (expired)"
+            # 원장 이벤트는 시간 순으로 기록 (확인 시각 기준)
+            e.date = now.strftime("%Y-%m-%d %H:%M:%S")
+            self.ledger.record_execution(e)
+
+    @staticmethod
+    def _all_filled(executions: List[TradeExecution]) -> bool:
+        return all(e.status == "FILLED" for e in executions)
 
+    @staticmethod
+    def _apply_fills(pf: Portfolio, executions: List[TradeExecution]) -> Portfolio:
+        """잔고에 체결 내역(FILLED/PARTIAL) 반영한 사본"""
+        result = pf.copy()
+        for e in executions:
+            if e.status not in ("FILLED", "PARTIAL"):
+                continue
+            amount = e.price * e.quantity
+            if e.action == "SELL":
+                result.total_cash += amount - e.fee
+                result.holdings[e.ticker] = max(0, result.holdings.get(e.ticker, 0) - e.quantity)
+            else:
+                result.total_cash -= amount + e.fee
+                result.holdings[e.ticker] = result.holdings.get(e.ticker, 0) + e.quantity
+            result.current_prices.setdefault(e.ticker, e.price)
+        return result
+
+    def _store_portfolio(self, pf: Portfolio):
+        with self._portfolio_lock:
+            self._portfolio_cache = (time.monotonic(), pf.copy())
+
+    def _reconcile_executions(self, executions: List[TradeExecution]) -> List[TradeExecution]:
+        """
+        [해외주식] 주문체결내역 1회 조회로 접수 기록(ORDERED)을 실제 체결 결과로 갱신
+        - 체결 수량/평균 체결가 반영, 정정된 주문은 원주문 체결분까지 합산
+        - 전량 체결: FILLED, 일부 체결: PARTIAL(체결 수량으로 변경), 미체결 종료: REJECTED
+        - 조회 실패 시 원래 기록을 그대로 반환
+        - 이 API는 수수료를 주지 않으므로 fee는 0.0 유지
+        """
+        targets = [e for e in executions if e.order_id]
+        if not targets:
+            return executions
+        fills = self._inquire_fills()
+        if fills is None:
+            return executions
+        self._apply_fill_rows(targets, fills)
+        self.logger.info("[KisBroker] Fills reconciled: " +
+                         ", ".join(f"{e.ticker} {e.status} {e.quantity}@{e.price}" for e in targets))
         return executions
 
-    def _send_order(self, order: Order) -> Optional[TradeExecution]:
-        """실제 주문 API 호출"""
+    def _inquire_fills(self) -> Optional[Dict[str, dict]]:
+        """주문체결내역 1회 조회 (주문번호 -> 행), 실패 시 None"""
+        # 실전: TTTS3035R, 모의: VTTS3035R
+        tr_id = "TTTS3035R" if self.is_real else "VTTS3035R"
+        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-ccnl"
+        # 미국 정규장은 한국 날짜로 자정을 넘기므로 전일~당일 조회
+        today = datetime.now()
+        params = {
+            "CANO": self.cano,
+            "ACNT_PRDT_CD": self.acnt_prdt_cd,
+            "PDNO": "%",                    # 전 종목
+            "ORD_STRT_DT": (today - timedelta(days=1)).strftime("%Y%m%d"),
+            "ORD_END_DT": today.strftime("%Y%m%d"),
+            "SLL_BUY_DVSN": "00",           # 00: 전체
+            "CCLD_NCCS_DVSN": "00",         # 00: 전체 (체결 + 미체결)
+            "OVRS_EXCG_CD": "%",            # 전 거래소
+            "SORT_SQN": "DS",
+            "ORD_DT": "",
+            "ORD_GNO_BRNO": "",
+            "ODNO": ""
+        }
+        try:
+            rows, _ = self._inquire_pages(url, self._get_header(tr_id), params, ctx_size=200)
+        except Exception as e:
+            self.logger.warning(f"[KisBroker] Fill reconciliation failed: {e}")
+            return None
+        return {row['odno']: row for row in rows}
+
+    def _apply_fill_rows(self, targets: List[TradeExecution], by_odno: Dict[str, dict]):
+        """체결 내역 행으로 접수 기록(ORDERED)의 상태/수량/체결가 갱신"""
+        for e in targets:
+            chain = [row for row in (by_odno.get(oid) for oid in self._order_chain(e.order_id)) if row]
+            latest = by_odno.get(e.order_id)
+            if not latest:
+                continue
+            filled = sum(int(row.get('ft_ccld_qty') or 0) for row in chain)
+            amount = sum(int(row.get('ft_ccld_qty') or 0) * float(row.get('ft_ccld_unpr3') or 0) for row in chain)
+            open_qty = int(latest.get('nccs_qty') or 0)
+
+            if filled > 0:
+                e.price = round(amount / filled, 4)
+            if filled >= e.quantity:
+                e.status = "FILLED"
+            elif filled > 0:
+                e.status = "PARTIAL"
+                e.quantity = filled
+            elif open_qty == 0:
+                e.status = "REJECTED"
+                e.reason = latest.get('rjct_rson_name') or latest.get('prcs_stat_name', "")
+
+    def _order_chain(self, order_id: str) -> List[str]:
+        """정정 이력을 따라 올라간 주문번호 목록 (현재 주문 -> 원주문)"""
+        chain = [order_id]
+        while chain[-1] in self._revised_from and len(chain) <= self.MAX_PAGES:
+            chain.append(self._revised_from[chain[-1]])
+        return chain
+
+    def _work_orders(self, executions: List[TradeExecution], timeout: float) -> bool:
+        """
+        접수된 주문의 체결 대기
+        - execution_policy가 있으면 reprice_interval마다 미체결 주문을 더 공격적인 가격으로 정정
+        - 정정한 주문은 executions의 order_id/price를 새 주문 기준으로 갱신
+        """
+        policy = self.execution_policy
+        deadline = time.time() + timeout
+        base_prices = [e.price for e in executions]
+        exchanges = {self._get_exchange_code(e.ticker) for e in executions}
+        attempt = 0
+        while True:
+            can_reprice = policy is not None and attempt < policy.max_attempts
+            wait = max(0.0, deadline - time.time())
+            if can_reprice:
+                wait = min(wait, policy.reprice_interval)
+
+            order_ids = [e.order_id for e in executions if e.order_id]
+            if self._wait_for_completion(timeout=wait, order_ids=order_ids, exchanges=exchanges):
+                return True
+            if not can_reprice or time.time() >= deadline:
+                return False
+
+            attempt += 1
+            self._reprice_pending(executions, base_prices, attempt, exchanges)
+
+    def _reprice_pending(self, executions: List[TradeExecution], base_prices: List[float],
+                         attempt: int, exchanges: Iterable[str]):
+        """미체결 잔량을 정책 가격으로 정정 (이미 한도 가격이면 그대로 둠)"""
+        try:
+            pending = {row['odno']: row for row in self._get_pending_orders(exchanges)}
+        except Exception as e:
+            self.logger.warning(f"[KisBroker] Reprice skipped (pending check failed): {e}")
+            return
+        targets = []
+        for execution, base in zip(executions, base_prices):
+            row = pending.get(execution.order_id)
+            if not row:
+                continue
+            remaining = int(row['nccs_qty'])
+            new_price = self.execution_policy.price_for(execution.action, base, attempt)
+            if remaining > 0 and new_price != execution.price:
+                targets.append((execution, remaining, new_price))
+
+        if not targets:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(targets))) as pool:
+            list(pool.map(lambda t: self._revise_order(*t), targets))
+
+    def _revise_order(self, execution: TradeExecution, quantity: int, price: float) -> bool:
+        """
+        [해외주식] 정정 주문 (미체결 잔량의 가격 변경)
+        취소 후 재주문과 같은 효과를 한 번의 요청으로 처리해, 취소와 재주문 사이 체결로 인한 초과 주문을 방지
+        """
+        # 실전: TTTS1004U, 모의: VTTT1004U
+        tr_id = "TTTS1004U" if self.is_real else "VTTT1004U"
+        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order-rvsecncl"
+        data = {
+            "CANO": self.cano,
+            "ACNT_PRDT_CD": self.acnt_prdt_cd,
+            "OVRS_EXCG_CD": self._get_exchange_code(execution.ticker),
+            "PDNO": execution.ticker,
+            "ORGN_ODNO": execution.order_id,
+            "RVSE_CNCL_DVSN_CD": "01", # 01: 정정, 02: 취소
+            "ORD_QTY": str(quantity),
+            "OVRS_ORD_UNPR": str(price),
+            "ORD_SVR_DVSN_CD": "0"
+        }
+        headers = self._get_header(tr_id, data)
+
+        try:
+            res = self._request("POST", url, headers=headers, json=data)
+            resp_data = res.json()
+            if resp_data['rt_cd'] != '0':
+                self.logger.warning(f"[KisBroker] Reprice Failed ({execution.ticker}): {resp_data.get('msg1')}")
+                return False
+
+            self.invalidate_portfolio()
+            old_id, old_price = execution.order_id, execution.price
+            new_id = (resp_data.get('output') or {}).get('ODNO') or old_id
+            if self.fill_listener:
+                self.fill_listener.replace(old_id, new_id, quantity)
+            if new_id != old_id:
+                self._revised_from[new_id] = old_id
+            execution.order_id = new_id
+            execution.price = price
+        except Exception as e:
+            self.logger.error(f"[KisBroker] Reprice Error ({execution.ticker}): {e}")
+            return False
+        # 정정 결과를 반영한 뒤 기록 (로거 오류가 주문 상태 갱신을 막지 않도록 try 밖에서)
+        self.logger.info(f"[KisBroker] Repriced: {execution.action} {execution.ticker} {quantity} "
+                         f"{old_price} -> {price} (No. {old_id} -> {new_id})",
+                         extra={"ticker": execution.ticker, "order_id": new_id})
+        return True
+
+    def _submit_orders(self, orders: List[Order]) -> List[TradeExecution]:
+        """
+        주문 일괄 전송 (파이프라인)
+        - 모든 주문의 HashKey를 동시에 발급한 뒤, 호출 제한이 허용하는 속도로 동시 전송
+        - 요청 본문은 주문당 1번만 만들어 HashKey 발급과 전송에 같은 본문 사용
+        - 접수 성공한 주문만 입력 순서대로 반환
+        """
+        if not orders:
+            return []
+        workers = min(self.MAX_WORKERS, len(orders))
+        payloads = [self._order_payload(o) for o in orders]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            hashkeys = list(pool.map(lambda p: self._get_hashkey(p[1]), payloads))
+            results = list(pool.map(self._send_order, orders, hashkeys, payloads))
+        return [r for r in results if r]
+
+    def _order_payload(self, order: Order) -> Tuple[str, dict]:
+        """주문 TR_ID와 요청 본문 생성"""
         # 실전: TTTS1002U(매수), TTTS1006U(매도)
         # 모의: VTTT1002U(매수), VTTT1006U(매도)
-        
-        tr_id = ""
         if self.is_real:
             tr_id = "TTTS1002U" if order.action == "BUY" else "TTTS1006U"
         else:
             tr_id = "VTTT1002U" if order.action == "BUY" else "VTTT1006U"
 
-        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order"
-        exch = self._get_exchange_code(order.ticker)
-        
         # 가격: 시장가인 경우 0 (또는 Limit 가격)
         # 미국주식은 보통 시장가(MKT)를 지원하지 않거나 조건이 까다로움.
         # 전략상 계산된 price(현재가)로 지정가 주문을 내되, 
@@ -386,107 +1081,156 @@ class KisBroker(IBrokerAdapter):
         data = {
             "CANO": self.cano,
             "ACNT_PRDT_CD": self.acnt_prdt_cd,
-            "OVRS_EXCG_CD": exch,
+            "OVRS_EXCG_CD": self._get_exchange_code(order.ticker),
             "PDNO": order.ticker,
             "ORD_QTY": str(order.quantity),
             "OVRS_ORD_UNPR": str(order_price),
             "ORD_SVR_DVSN_CD": "0",
             "ORD_DVSN": "00" # 00: 지정가 (미국은 보통 지정가 사용)
         }
-        
-        headers = self._get_header(tr_id, data)
+        return tr_id, data
+
+    def _send_order(self, order: Order, hashkey: Optional[str] = None,
+                    payload: Optional[Tuple[str, dict]] = None) -> Optional[TradeExecution]:
+        """
+        실제 주문 API 호출
+        - hashkey: 미리 발급한 HashKey (없으면 이 자리에서 발급)
+        - payload: HashKey 발급에 쓴 (tr_id, 본문) 그대로 전송 (없으면 이 자리에서 생성)
+        """
+        tr_id, data = payload if payload is not None else self._order_payload(order)
+        order_price = float(data["OVRS_ORD_UNPR"])
+        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order"
+
+        if hashkey is None:
+            headers = self._get_header(tr_id, data)
+        else:
+            headers = {**self._get_header(tr_id), "hashkey": hashkey}
         
         try:
-            res = requests.post(url, headers=headers, json=data)
+            res = self._request("POST", url, headers=headers, json=data)
             resp_data = res.json()
             
             if resp_data['rt_cd'] != '0':
                 self.logger.error(f"[KisBroker] Order Failed: {resp_data.get('msg1')}")
                 return None
             
-            self.logger.info(f"[KisBroker] Order Sent: {order.action} {order.ticker} {order.quantity} @ {order_price}")
+            # 주문이 접수되면 잔고가 바뀌므로 캐시 무효화
+            self.invalidate_portfolio()
+            order_id = (resp_data.get('output') or {}).get('ODNO', "")
+            if self.fill_listener and order_id:
+                self.fill_listener.track(order_id, order.quantity)
             
             # 체결 정보 생성 (API는 주문 접수만 알려주므로, 일단 접수된 내용으로 Execution 생성)
             # 정확히 하려면 체결조회 API를 별도로 호출해야 하지만, 여기선 주문접수=성공으로 간주하고 반환
-            return TradeExecution(
+            execution = TradeExecution(
                 ticker=order.ticker,
                 action=order.action,
                 quantity=order.quantity,
                 price=order_price,
                 fee=0.0, # 수수료는 체결 조회 전엔 모름
                 date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                status="ORDERED"
+                status="ORDERED",
+                order_id=order_id
             )
             
         except Exception as e:
             self.logger.error(f"[KisBroker] Order Error: {e}")
             return None
+        # 접수된 주문은 로거 오류와 무관하게 반환 (try 밖에서 기록)
+        self.logger.info(f"[KisBroker] Order Sent: {order.action} {order.ticker} {order.quantity} @ {order_price} (No. {order_id})",
+                         extra={"ticker": order.ticker, "order_id": order_id})
+        return execution
 
-    def _wait_for_completion(self, timeout: int = 60) -> bool:
-        """미체결 내역이 없을 때까지 대기"""
+    def _wait_for_completion(self, timeout: int = 60, order_ids: Optional[List[str]] = None,
+                             exchanges: Optional[Iterable[str]] = None) -> bool:
+        """
+        미체결 내역이 없을 때까지 대기
+        - 체결통보 구독 중이면 마지막 체결 이벤트 수신 즉시 반환
+        - 구독이 없거나 끊기면 미체결 조회 폴링으로 대체 (exchanges: 주문을 낸 거래소만 조회)
+        """
         start = time.time()
-        while (time.time() - start) < timeout:
-            count = self._get_pending_orders_count()
+        if order_ids and self.fill_listener and self.fill_listener.connected.is_set():
+            if self.fill_listener.wait_for_fills(order_ids, timeout):
+                return True
+            # 통보 누락/연결 끊김 대비: 남은 시간 동안 실제 미체결 내역으로 확인
+            self.logger.warning("[KisBroker] Fill notices incomplete. Verifying with pending-order inquiry...")
+
+        # 최소 1회는 실제 미체결 내역을 확인
+        while True:
+            count = self._get_pending_orders_count(exchanges)
             if count == 0:
                 return True
-            time.sleep(2)
-        return False
+            if (time.time() - start) >= timeout:
+                return False
+            time.sleep(self.POLL_INTERVAL)
 
-    def _get_pending_orders_count(self) -> int:
+    def _get_pending_orders_count(self, exchanges: Optional[Iterable[str]] = None) -> int:
+        """
+        미체결 주문 건수 (exchanges: 이번에 주문을 낸 거래소만 조회, None이면 NAS, NYS, AMS 전체)
+        조회에 실패하면 체결 완료로 오판하지 않도록 미체결 1건으로 간주
+        """
+        try:
+            count = len(self._get_pending_orders(exchanges))
+        except Exception as e:
+            self.logger.warning(f"[KisBroker] Pending Check Failed: {e}")
+            return 1
+        if count > 0:
+            self.logger.info(f"[KisBroker] Found {count} pending orders. Waiting...")
+        return count
+
+    def _get_pending_orders(self, exchanges: Optional[Iterable[str]] = None) -> List[dict]:
         """
         [해외주식] 미체결 내역 조회
-        NAS -> NYS -> AMS 순으로 조회하며, 미체결이 하나라도 발견되면 즉시 반환합니다.
-        (전체 개수 합산보다 존재 여부가 중요함)
+        - 거래소별 동시 조회, 연속조회 키(CTX_AREA_FK100/NK100)를 따라 전체 내역을 합침
+        - 한 거래소라도 실패하면 예외
         """
+        target_exchanges = sorted(set(exchanges)) if exchanges is not None else list(self.EXCHANGES)
+        if not target_exchanges:
+            return []
+
         tr_id = "TTTS3018R" if self.is_real else "VTTT3018R"
         url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-nccs"
-        
-        target_exchanges = ["NAS", "NYS", "AMS"]
-        
-        for exch in target_exchanges:
-            params = {
-                "CANO": self.cano,
-                "ACNT_PRDT_CD": self.acnt_prdt_cd,
-                "OVRS_EXCG_CD": exch,
-                "SORT_SQN": "DS",
-                "CTX_AREA_FK100": "",
-                "CTX_AREA_NK100": ""
-            }
-            
-            headers = self._get_header(tr_id)
-            
+        headers = self._get_header(tr_id)
+
+        with ThreadPoolExecutor(max_workers=len(target_exchanges)) as pool:
+            results = list(pool.map(lambda ex: self._pending_in(url, headers, ex), target_exchanges))
+        return [row for rows in results for row in rows]
+
+    def _pending_in(self, url: str, headers: dict, exch: str) -> List[dict]:
+        """단일 거래소 미체결 내역 (연속조회 포함)"""
+        params = {
+            "CANO": self.cano,
+            "ACNT_PRDT_CD": self.acnt_prdt_cd,
+            "OVRS_EXCG_CD": exch,
+            "SORT_SQN": "DS"
+        }
+        rows, _ = self._inquire_pages(url, headers, params)
+        return rows
+
+    def _get_exchange_code(self, ticker: str) -> str:
+        """
+        티커별 거래소 코드
+        (한투 API는 NAS, NYS, AMS를 구분해서 넣어야 함, 잘못 넣으면 시세/주문 실패)
+        """
+        return self.exchange_resolver.resolve(ticker)
+
+    def warm_up_exchanges(self, tickers: Iterable[str]) -> Dict[str, str]:
+        """운용 종목 전체의 거래소 코드를 미리 조회/저장"""
+        return self.exchange_resolver.warm_up(tickers, self.MAX_WORKERS)
+
+    def _lookup_exchange(self, ticker: str) -> Optional[str]:
+        """[해외주식] 상품기본정보 조회로 거래소 판별 (나스닥 -> 뉴욕 -> 아멕스 순)"""
+        url = f"{self.base_url}/uapi/overseas-price/v1/quotations/search-info"
+        headers = self._get_header("CTPF1702R")
+        for prdt_type, code in self.PRODUCT_TYPES:
             try:
-                time.sleep(0.2) # API 제한 고려
-                
-                res = requests.get(url, headers=headers, params=params)
+                res = self._request("GET", url, headers=headers, params={"PRDT_TYPE_CD": prdt_type, "PDNO": ticker})
                 data = res.json()
-                
-                if data['rt_cd'] == '0':
-                    count = len(data['output'])
-                    if count > 0:
-                        self.logger.info(f"[KisBroker] Found {count} pending orders in {exch}. Waiting...")
-                        return count # [핵심] 발견 즉시 리턴 (다른 거래소 조회 생략)
-                else:
-                    self.logger.warning(f"[KisBroker] Pending Check Failed ({exch}): {data.get('msg1')}")
-                    
+                if data.get('rt_cd') == '0' and (data.get('output') or {}).get('prdt_eng_name'):
+                    self.logger.info(f"[KisBroker] Exchange resolved: {ticker} -> {code}")
+                    return code
             except Exception as e:
-                self.logger.error(f"[KisBroker] Pending Check Error ({exch}): {e}")
-                
-        return 0 # 모든 거래소를 다 봤는데 미체결이 없음
-    
-    def _get_exchange_code(self, ticker: str) -> str:
-        """
-        티커별 거래소 코드 매핑
-        (한투 API는 NAS, NYS, AMS를 구분해서 넣어야 함)
-        """
-        # 주요 ETF 매핑
-        mapping = {
-            'SPY': 'AMS', # AMEX (Arca)
-            'QLD': 'AMS', # ProShares는 보통 Arca
-            'SSO': 'AMS',
-            'IEF': 'NAS', # NASDAQ
-            'GLD': 'NYS', # NYSE
-            'PDBC': 'NAS',
-            'SHV': 'NAS'
-        }
-        return mapping.get(ticker, 'NAS') # 기본값
\ No newline at end of file
+                # 한 거래소 조회 실패로 나머지 후보를 건너뛰지 않도록 다음 거래소로 진행
+                self.logger.warning(f"[KisBroker] Exchange lookup error {ticker} ({prdt_type}): {e}")
+        self.logger.warning(f"[KisBroker] Exchange not found for {ticker}. Using {KisExchangeResolver.DEFAULT}.")
+        return None
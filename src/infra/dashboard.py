@@ -0,0 +1,268 @@
+# src/infra/dashboard.py
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from src.utils.jsonio import write_json
+
+def lttb_indices(values: List[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링 (선택된 원본 인덱스 반환)
+    - 첫/마지막 점은 항상 포함, 나머지는 구간별로 면적이 가장 큰 점 1개
+    - 고점/저점 같은 시각적 특징을 유지하면서 점 개수를 threshold로 고정
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        # 다음 구간 평균점 (삼각형의 세 번째 꼭짓점)
+        next_start, next_end = end, min(int((i + 2) * bucket) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / max(next_end - next_start, 1)
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - values[a]) - (a - j) * (avg_y - values[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+class PerformanceAggregator:
+    """
+    대시보드 파생 지표 누적 계산 (aggregates.json)
+    - 일별 요약 1건이 들어올 때마다 이전 상태에서 이어서 갱신 (전체 기록을 다시 읽지 않음)
+    - 낙폭(drawdown), 월/연 수익률, 국면 구간, 목표 비중 변경 이력, SPY 대비 성과
+    - 파일 기록은 저장소가 담당 (dumps() 결과를 저장소의 쓰기 경로/배치 커밋으로 기록)
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.state = self._load()
+        # 파일이 없으면 기존 기록으로 rebuild() 필요
+        self.loaded = self.state is not None
+        if self.state is None:
+            self.state = self._empty()
+
+    def update(self, record: Dict) -> Dict:
+        """요약 1건 반영. 그날의 파생 값(요약 레코드에 함께 저장) 반환"""
+        s = self.state
+        date = str(record.get("date", ""))
+        self._extend_segment(s["regimes"], "regime", record.get("regime"), date)
+        self._extend_segment(s["exposure"], "target_exposure", record.get("target_exposure"), date)
+
+        value = record.get("total_value")
+        if not value or value <= 0:
+            return {}  # 자산 정보가 없는 구버전 기록
+        spy = record.get("spy_price")
+        prev = s["last"]
+        if s["first"] is None:
+            s["first"] = {"date": date, "total_value": value, "spy_price": spy}
+        first = s["first"]
+
+        # 기간 수익률: 직전 기간 마지막 값 대비 (첫 기간은 첫 값 대비)
+        self._update_period(s["monthly"], date[:7], prev, value)
+        self._update_period(s["yearly"], date[:4], prev, value)
+
+        s["peak"] = max(s["peak"] or value, value)
+        drawdown = value / s["peak"] - 1
+        s["max_drawdown"] = min(s["max_drawdown"], drawdown)
+
+        portfolio_return = value / first["total_value"] - 1
+        derived = {"drawdown": round(drawdown, 6), "portfolio_return": round(portfolio_return, 6)}
+        if spy and first.get("spy_price"):
+            benchmark_return = spy / first["spy_price"] - 1
+            derived["benchmark_return"] = round(benchmark_return, 6)
+            derived["relative_return"] = round((1 + portfolio_return) / (1 + benchmark_return) - 1, 6)
+
+        s["last"] = {"date": date, "total_value": value, "spy_price": spy, **derived}
+        return derived
+
+    def rebuild(self, summary: List[Dict]):
+        """전체 기록으로 다시 계산 (파일이 없거나 어긋났을 때 1회)"""
+        self.state = self._empty()
+        for rec in summary:
+            self.update(rec)
+        self.loaded = True
+
+    def dumps(self) -> bytes:
+        return json.dumps(self.state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _empty() -> Dict:
+        return {
+            "first": None, "last": None,
+            "peak": None, "max_drawdown": 0.0,
+            "monthly": {}, "yearly": {},
+            "regimes": [], "exposure": []
+        }
+
+    @staticmethod
+    def _update_period(periods: Dict[str, Dict], key: str, prev: Optional[Dict], value: float):
+        if key not in periods:
+            periods[key] = {"start": prev["total_value"] if prev else value}
+        period = periods[key]
+        period["end"] = value
+        period["return"] = round(value / period["start"] - 1, 6)
+
+    @staticmethod
+    def _extend_segment(segments: List[Dict], field: str, value, date: str):
+        """같은 값이 이어지면 마지막 구간 연장, 바뀌면 새 구간 시작"""
+        if value is None:
+            return
+        last = segments[-1] if segments else None
+        if last and last[field] == value:
+            if last["end"] != date:
+                last["end"] = date
+                last["days"] += 1
+            return
+        segments.append({field: value, "start": date, "end": date, "days": 1})
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+class DashboardExporter:
+    """
+    대시보드용 데이터 분할 export (docs/data)
+    - summary/YYYY-MM.json, history/YYYY-MM.json: 월별 샤드 (바뀐 달만 다시 씀)
+    - index.json: 샤드 목록 + 최신 요약 + 최근 매매 내역 + 누적 지표 (첫 화면 렌더링용)
+    - overview.json: 전체 기간 자산 추이를 OVERVIEW_POINTS개로 다운샘플링 (기록 길이와 무관하게 일정 크기)
+    - export(): 전체 기록으로 생성, export_recent(): 지난 export 이후 달만 갱신 (매 실행 비용 일정)
+    """
+    OVERVIEW_POINTS = 365
+    RECENT_HISTORY = 20
+
+    def __init__(self, root_path: str, compact: bool = False, gzip_outputs: bool = False):
+        self.root = root_path
+        self.compact = compact            # 저장소와 같은 설정 (DATA_COMPACT)
+        self.gzip_outputs = gzip_outputs
+        self.index_file = os.path.join(self.root, "index.json")
+        self.overview_file = os.path.join(self.root, "overview.json")
+
+    def export(self, summary: List[Dict], history: List[Dict], aggregates: Optional[Dict] = None) -> Dict:
+        """샤드/인덱스/개요 파일 생성. 작성된 index 내용 반환"""
+        previous = self._load(self.index_file, default={})
+        index = {
+            "summary_months": self._write_shards("summary", summary, previous.get("summary_months", [])),
+            "history_months": self._write_shards("history", history, previous.get("history_months", [])),
+            "latest": summary[-1] if summary else None,
+            "recent_history": history[-self.RECENT_HISTORY:],
+            "aggregates": aggregates,
+        }
+        self._save(self.overview_file, self._overview(summary))
+        self._save(self.index_file, index)
+        return index
+
+    def resume_points(self) -> Optional[Tuple[str, str]]:
+        """
+        증분 export 시작 월 (summary, history) = 지난 export의 마지막 월
+        index/overview가 없으면 None -> 전체 export 필요
+        """
+        previous = self._load(self.index_file)
+        if not previous or not os.path.exists(self.overview_file):
+            return None
+        return (self._last_month(previous.get("summary_months")),
+                self._last_month(previous.get("history_months")))
+
+    def export_recent(self, summary: List[Dict], history: List[Dict],
+                      summary_since: str, history_since: str, aggregates: Optional[Dict] = None) -> Dict:
+        """
+        증분 export: since 월 이후 샤드 + index + overview만 갱신 (지난 달 샤드는 그대로)
+        summary/history: since 월 이후 기록 (history는 최근 RECENT_HISTORY건 이상 포함)
+        """
+        previous = self._load(self.index_file, default={})
+        recent_summary = [r for r in summary if str(r.get("date", ""))[:7] >= summary_since]
+        index = {
+            "summary_months": self._merge_shards("summary", recent_summary, summary_since,
+                                                 previous.get("summary_months", [])),
+            "history_months": self._merge_shards("history", history, history_since,
+                                                 previous.get("history_months", [])),
+            "latest": summary[-1] if summary else previous.get("latest"),
+            "recent_history": history[-self.RECENT_HISTORY:],
+            "aggregates": aggregates,
+        }
+        overview = self._load(self.overview_file, default={})
+        self._save(self.overview_file, self._extend_overview(overview, recent_summary))
+        self._save(self.index_file, index)
+        return index
+
+    def _merge_shards(self, kind: str, records: List[Dict], since: str, previous: List[Dict]) -> List[Dict]:
+        # since 이전 달은 기존 항목 유지, 이후 달만 다시 계산
+        rows = [r for r in records if str(r.get("date", ""))[:7] >= since]
+        kept = [m for m in previous if m["month"] < since]
+        return kept + self._write_shards(kind, rows, previous)
+
+    def _extend_overview(self, overview: Dict, summary: List[Dict]) -> Dict:
+        """
+        기존 개요에 새 기록만 이어 붙임
+        점이 OVERVIEW_POINTS의 2배를 넘으면 다시 OVERVIEW_POINTS개로 다운샘플링 (크기 일정 유지)
+        """
+        fields = ("dates", "total_value", "spy_price", "drawdown")
+        dates = overview.get("dates") or []
+        last = dates[-1] if dates else ""
+        fresh = self._overview([r for r in summary if str(r.get("date", "")) > last])
+        merged = {f: (overview.get(f) or []) + fresh[f] for f in fields}
+        if len(merged["dates"]) > self.OVERVIEW_POINTS * 2:
+            picked = lttb_indices([v or 0.0 for v in merged["total_value"]], self.OVERVIEW_POINTS)
+            merged = {f: [merged[f][i] for i in picked] for f in fields}
+        return merged
+
+    @staticmethod
+    def _last_month(entries: Optional[List[Dict]]) -> str:
+        # 기록이 없으면 "" (모든 월이 이후로 취급됨)
+        return entries[-1]["month"] if entries else ""
+
+    def _write_shards(self, kind: str, records: List[Dict], previous: List[Dict]) -> List[Dict]:
+        months: Dict[str, List[Dict]] = OrderedDict()
+        for rec in records:
+            months.setdefault(str(rec.get("date", ""))[:7], []).append(rec)
+
+        known = {m["month"]: m for m in previous}
+        entries = []
+        for month, rows in months.items():
+            entry = {
+                "month": month,
+                "file": f"{kind}/{month}.json",
+                "count": len(rows),
+                "first": rows[0].get("date"),
+                "last": rows[-1].get("date"),
+            }
+            path = os.path.join(self.root, entry["file"])
+            # 지난 달 샤드는 내용이 그대로이므로 건너뜀 (보통 매일 이번 달 1개만 씀)
+            if known.get(month) != entry or not os.path.exists(path):
+                self._save(path, rows)
+            entries.append(entry)
+        return entries
+
+    def _overview(self, summary: List[Dict]) -> Dict:
+        values = [rec.get("total_value") or 0.0 for rec in summary]
+        picked = lttb_indices(values, self.OVERVIEW_POINTS)
+        return {
+            "dates": [summary[i].get("date") for i in picked],
+            "total_value": [summary[i].get("total_value") for i in picked],
+            "spy_price": [summary[i].get("spy_price") for i in picked],
+            "drawdown": [summary[i].get("drawdown") for i in picked],
+        }
+
+    def _load(self, path: str, default=None):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _save(self, path: str, data):
+        # 대시보드가 읽는 도중 반쪽 파일을 보지 않도록 임시 파일에 쓰고 교체 (atomic)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json(path, data, compact=self.compact, gzip_copy=self.gzip_outputs)
@@ -0,0 +1,219 @@
+# src/infra/ledger.py
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.core.models import Portfolio, TradeExecution
+
+class PortfolioLedger:
+    """
+    이벤트 소싱 포트폴리오 원장
+    - events.jsonl: 체결(TRADE) / 입출금(CASH) / 입고(POSITION) 이벤트를 한 줄씩 append
+    - snapshots.jsonl: SNAPSHOT_INTERVAL개 이벤트마다 잔고 스냅샷 + 이벤트 파일 위치(offset) 기록
+    - 특정 시점 잔고 = 그 이전 마지막 스냅샷 + 이후 이벤트 몇 개만 재생 (전체 스캔 없음)
+    - 체결 확인 전(ORDERED) 주문은 미결 주문으로 유지, 같은 주문번호의 확정 기록이 들어오면 정리
+    """
+    SNAPSHOT_INTERVAL = 50
+
+    def __init__(self, root_path: str, snapshot_interval: Optional[int] = None):
+        self.root = root_path
+        os.makedirs(self.root, exist_ok=True)
+        self.events_file = os.path.join(self.root, "events.jsonl")
+        self.snapshots_file = os.path.join(self.root, "snapshots.jsonl")
+        self.snapshot_interval = snapshot_interval or self.SNAPSHOT_INTERVAL
+        self._lock = threading.Lock()
+
+        self._repair_tail(self.events_file)
+        self._repair_tail(self.snapshots_file)
+        self._snapshots = self._read_jsonl(self.snapshots_file)
+        base = self._snapshots[-1] if self._snapshots else None
+        self._state = self._state_from(base)
+        self._seq = base["seq"] if base else 0
+        self._last_date = base["date"] if base else None
+        self._since_snapshot = 0
+        for event in self._events_from(base["offset"] if base else 0):
+            self._apply(self._state, event)
+            self._seq = event["seq"]
+            self._last_date = event["date"]
+            self._since_snapshot += 1
+
+    @property
+    def is_empty(self) -> bool:
+        return self._seq == 0
+
+    # ------------------------------------------
+    # 기록
+    # ------------------------------------------
+    def record_execution(self, execution: TradeExecution, cash_delta: Optional[float] = None) -> Dict:
+        """
+        체결 1건 기록
+        cash_delta: 실제 현금 변동 (미지정 시 체결가*수량 -/+ 수수료로 계산)
+        체결(FILLED/PARTIAL)만 잔고에 반영, 거부/미확인(REJECTED/ORDERED) 주문은 기록만 남김
+        (ORDERED는 open_orders()로 남아 있다가 체결 확인 후 다시 기록)
+        """
+        filled = execution.status in ("FILLED", "PARTIAL") and execution.quantity > 0
+        if cash_delta is None:
+            amount = execution.price * execution.quantity
+            cash_delta = 0.0
+            if filled:
+                cash_delta = -(amount + execution.fee) if execution.action == "BUY" else amount - execution.fee
+        return self._append({
+            "type": "TRADE",
+            "date": execution.date,
+            "ticker": execution.ticker,
+            "action": execution.action,
+            "quantity": execution.quantity if filled else 0,
+            "order_quantity": execution.quantity,
+            "price": execution.price,
+            "fee": execution.fee,
+            "status": execution.status,
+            "order_id": execution.order_id,
+            "cash_delta": cash_delta,
+        })
+
+    def record_cash(self, amount: float, reason: str = "", date: Optional[str] = None) -> Dict:
+        """입금(+)/출금(-) 기록"""
+        return self._append({"type": "CASH", "date": date or self._now(), "amount": amount, "reason": reason})
+
+    def record_position(self, ticker: str, quantity: float, reason: str = "", date: Optional[str] = None) -> Dict:
+        """현금 변동 없는 수량 조정 (초기 보유분 입고 등)"""
+        return self._append({"type": "POSITION", "date": date or self._now(),
+                             "ticker": ticker, "quantity": quantity, "reason": reason})
+
+    def snapshot(self):
+        """현재 잔고 스냅샷 기록 (이후 조회는 여기서부터 재생)"""
+        with self._lock:
+            self._snapshot_locked()
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def current(self) -> Portfolio:
+        """최신 잔고 (현재가는 비어 있음)"""
+        with self._lock:
+            return self._portfolio(self._state)
+
+    def state_at(self, date: str) -> Portfolio:
+        """date 시점(해당 일자 끝) 잔고. 'YYYY-MM-DD' 또는 'YYYY-MM-DD HH:MM:SS'"""
+        end = date if len(date) > 10 else f"{date} 23:59:59"
+        with self._lock:
+            base = None
+            for snap in self._snapshots:
+                if snap["date"] > end:
+                    break
+                base = snap
+            state = self._state_from(base)
+            for event in self._events_from(base["offset"] if base else 0):
+                if event["date"] > end:
+                    break  # 이벤트는 시간 순으로 기록됨
+                self._apply(state, event)
+            return self._portfolio(state)
+
+    def open_orders(self) -> List[Dict]:
+        """체결 확인 전(ORDERED)으로 기록된 뒤 아직 확정 기록이 없는 주문 (기록 순서)"""
+        with self._lock:
+            return [dict(order) for order in self._state["open"].values()]
+
+    def events(self) -> List[Dict]:
+        """전체 이벤트 (기록 순서)"""
+        return self._read_jsonl(self.events_file)
+
+    # ------------------------------------------
+    # 내부
+    # ------------------------------------------
+    def _append(self, event: Dict) -> Dict:
+        with self._lock:
+            event = {"seq": self._seq + 1, **event}
+            line = json.dumps(event, ensure_ascii=False) + "\n"
+            with open(self.events_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._seq = event["seq"]
+            self._last_date = event["date"]
+            self._apply(self._state, event)
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_interval:
+                self._snapshot_locked()
+            return event
+
+    def _snapshot_locked(self):
+        snap = {
+            "seq": self._seq,
+            "offset": os.path.getsize(self.events_file) if os.path.exists(self.events_file) else 0,
+            "date": self._last_date or self._now(),
+            "cash": self._state["cash"],
+            "holdings": dict(self._state["holdings"]),
+            "open": dict(self._state["open"]),
+        }
+        with open(self.snapshots_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snap, ensure_ascii=False) + "\n")
+        self._snapshots.append(snap)
+        self._since_snapshot = 0
+
+    @staticmethod
+    def _apply(state: Dict, event: Dict):
+        kind = event["type"]
+        if kind == "CASH":
+            state["cash"] += event["amount"]
+            return
+        holdings = state["holdings"]
+        ticker = event["ticker"]
+        if kind == "TRADE":
+            order_id = event.get("order_id")
+            if order_id:
+                if event["status"] == "ORDERED":
+                    state["open"][order_id] = {
+                        "order_id": order_id, "ticker": ticker, "action": event["action"],
+                        "quantity": event.get("order_quantity", 0), "price": event["price"], "date": event["date"]}
+                else:
+                    state["open"].pop(order_id, None)
+            state["cash"] += event["cash_delta"]
+            delta = event["quantity"] if event["action"] == "BUY" else -event["quantity"]
+        else:
+            delta = event["quantity"]
+        qty = max(0, holdings.get(ticker, 0) + delta)
+        if qty:
+            holdings[ticker] = qty
+        else:
+            holdings.pop(ticker, None)
+
+    @staticmethod
+    def _state_from(snapshot: Optional[Dict]) -> Dict:
+        if not snapshot:
+            return {"cash": 0.0, "holdings": {}, "open": {}}
+        return {"cash": snapshot["cash"], "holdings": dict(snapshot["holdings"]),
+                "open": dict(snapshot.get("open", {}))}
+
+    @staticmethod
+    def _portfolio(state: Dict) -> Portfolio:
+        return Portfolio(total_cash=state["cash"], holdings=dict(state["holdings"]), current_prices={})
+
+    def _events_from(self, offset: int):
+        if not os.path.exists(self.events_file):
+            return
+        with open(self.events_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _read_jsonl(self, path: str) -> List[Dict]:
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @staticmethod
+    def _repair_tail(path: str):
+        """기록 도중 끊긴 마지막 줄 제거 (이후 append가 깨진 줄에 이어 붙지 않도록)"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            f.truncate(data.rfind(b"\n") + 1)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
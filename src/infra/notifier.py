@@ -1,51 +1,85 @@
 # src/infra/notifier.py
+import itertools
+import json
+import os
+import queue
+import threading
+import time
 import requests
+from typing import Dict, List, Optional
 from src.core.interfaces import INotifier
+from src.utils.ratelimit import TokenBucket
+
+def parse_retry_after(response) -> Optional[float]:
+    """429 응답의 재시도 대기 시간(초) - Retry-After 헤더, 없으면 Telegram의 parameters.retry_after"""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        try:
+            value = (response.json().get("parameters") or {}).get("retry_after")
+        except (ValueError, AttributeError):
+            value = None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
 
 class TelegramNotifier(INotifier):
     def __init__(self, token: str, chat_id: str):
         self.token = token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.retry_after: Optional[float] = None  # 마지막 429 응답이 요구한 대기 시간(초)
 
-    def send_message(self, message: str) -> None:
-        self._send(f"🤖 [SolidQuant]\n{message}")
+    def send_message(self, message: str) -> bool:
+        return self._send(f"🤖 [SolidQuant]\n{message}")
 
-    def send_alert(self, message: str) -> None:
-        self._send(f"🚨 [WARNING]\n{message}")
+    def send_alert(self, message: str) -> bool:
+        return self._send(f"🚨 [WARNING]\n{message}")
 
-    def _send(self, text: str):
+    def _send(self, text: str) -> bool:
+        """전송 성공 여부 반환 (429 등 실패 시 False -> 재시도 대상)"""
         if not self.token or not self.chat_id:
             print(f"[Telegram Mock] {text}") # 설정 없으면 콘솔 출력
-            return
+            return True
 
+        self.retry_after = None
         try:
             payload = {"chat_id": self.chat_id, "text": text}
-            requests.post(self.base_url, json=payload, timeout=5)
+            response = requests.post(self.base_url, json=payload, timeout=5)
+            if response.status_code != 200:
+                print(f"[Telegram Error] Status: {response.status_code}")
+                if response.status_code == 429:
+                    self.retry_after = parse_retry_after(response)
+                return False
+            return True
         except Exception as e:
             print(f"[Telegram Error] Failed to send: {e}")
+            return False
 
 class SlackNotifier(INotifier):
     def __init__(self, webhook_url: str, logger):
         self.webhook_url = webhook_url
         self.logger = logger
+        self.retry_after: Optional[float] = None  # 마지막 429 응답이 요구한 대기 시간(초)
 
-    def send_message(self, message: str) -> None:
+    def send_message(self, message: str) -> bool:
         # 일반 메시지
-        self._send(f"🤖 *[SolidQuant]*\n{message}")
+        return self._send(f"🤖 *[SolidQuant]*\n{message}")
 
-    def send_alert(self, message: str) -> None:
+    def send_alert(self, message: str) -> bool:
         # 긴급 알림 (channel 전체 호출)
-        self._send(f"🚨 *[WARNING]* <!channel>\n{message}")
+        return self._send(f"🚨 *[WARNING]* <!channel>\n{message}")
 
-    def _send(self, text: str):
+    def _send(self, text: str) -> bool:
+        """전송 성공 여부 반환 (429 등 실패 시 False -> 재시도 대상)"""
         if not self.webhook_url:
             # URL이 없으면(테스트 환경 등) 콘솔에만 출력
             msg = f"[Slack Mock] {text}"
             self.logger.info(msg)
             
-            return
+            return True
 
+        self.retry_after = None
         try:
             # 슬랙 Webhook은 JSON Payload를 사용
             payload = {"text": text}
@@ -60,11 +94,242 @@ class SlackNotifier(INotifier):
                 error_msg = f"[Slack Error] Status: {response.status_code}, Body: {response.text}"
                 # [핵심] 파일에 기록 남기기
                 self.logger.error(error_msg)
-                
-                
+                if response.status_code == 429:
+                    self.retry_after = parse_retry_after(response)
+                return False
+            return True
                 
         except Exception as e:
             error_msg = f"[Slack Error] Connection failed: {e}"
             # [핵심] 파일에 기록 남기기
             self.logger.error(error_msg)
-            
\ No newline at end of file
+            return False
+            
+class NotificationOutbox:
+    """
+    알림 전송 대기 파일 (append-only JSONL)
+    - 전송 전에 메시지를 기록하고, 전송 성공 시 ack 레코드를 덧붙임
+    - 프로세스가 중간에 죽어도 ack되지 않은 메시지는 다음 실행에서 재전송
+    - append는 OS 버퍼까지만 기록 (호출 스레드에서 fsync 안 함), 디스크 동기화는 sync()로 묶어서 수행
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._dirty = False
+
+    def append(self, kind: str, text: str) -> str:
+        record_id = f"{time.time_ns()}-{next(self._ids)}"
+        self._write([{"id": record_id, "kind": kind, "text": text, "ts": time.time()}])
+        return record_id
+
+    def sync(self):
+        """마지막 sync 이후 기록된 레코드를 디스크에 한 번에 반영 (전송 직전 워커에서 호출)"""
+        with self._lock:
+            if not self._dirty or not os.path.exists(self.path):
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+            self._dirty = False
+
+    def ack(self, record_ids: List[str]):
+        if record_ids:
+            self._write([{"ack": rid} for rid in record_ids])
+
+    def pending(self) -> List[Dict]:
+        """ack되지 않은 레코드 (기록 순서)"""
+        records: Dict[str, Dict] = {}
+        with self._lock:
+            if not os.path.exists(self.path):
+                return []
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 끊긴 마지막 줄
+                    if "ack" in rec:
+                        records.pop(rec["ack"], None)
+                    else:
+                        records[rec["id"]] = rec
+        return list(records.values())
+
+    def compact(self):
+        """ack된 레코드 정리 (남은 레코드만 다시 기록)"""
+        remaining = self.pending()
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for rec in remaining:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+
+    def _write(self, records: List[Dict]):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for rec in records:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._dirty = True
+
+
+class QueuedNotifier(INotifier):
+    """
+    백그라운드 전송 래퍼 (Slack/Telegram 응답 시간이 매매 경로를 막지 않도록)
+    - send_message: 큐에 넣고 즉시 반환, 한 번의 실행에서 쌓인 메시지는 flush 시 한 번에 전송
+    - send_alert: 우선순위 큐로 일반 메시지보다 먼저, 바로 전송
+    - 실패 시 지수 백오프로 max_retries회 재시도 (채널이 429로 Retry-After를 주면 최소 그만큼 대기),
+      rate_limiter로 채널 호출 제한 준수
+    - outbox 지정 시 전송 전 파일에 기록 -> 끝내 실패하거나 프로세스가 죽어도 다음 실행에서 재전송
+      (fsync는 호출 스레드가 아닌 워커에서 전송 직전에 묶어서 수행)
+    - flush/close: 남은 메시지 전송을 deadline(초)까지만 기다림
+    """
+    # 우선순위 (작을수록 먼저)
+    PRIORITY_ALERT = 0
+    PRIORITY_MESSAGE = 1
+    PRIORITY_FLUSH = 2
+    PRIORITY_STOP = 3
+
+    def __init__(self, inner: INotifier, logger=None, separator: str = "\n\n",
+                 outbox: Optional[NotificationOutbox] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_retries: int = 3, retry_backoff: float = 1.0):
+        self.inner = inner
+        self.logger = logger
+        self.separator = separator
+        self.outbox = outbox
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="QueuedNotifier", daemon=True)
+        self._worker.start()
+        self._replay()
+
+    def send_message(self, message: str) -> bool:
+        self._put(self.PRIORITY_MESSAGE, "message", (message, self._record("message", message)))
+        return True
+
+    def send_alert(self, message: str) -> bool:
+        self._put(self.PRIORITY_ALERT, "alert", (message, self._record("alert", message)))
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """쌓인 메시지를 묶어 전송하고 완료될 때까지(최대 timeout초) 대기"""
+        done = threading.Event()
+        self._put(self.PRIORITY_FLUSH, "flush", done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """남은 메시지 전송 후 워커 종료. 기한 내 끝나지 않으면 False (미전송분은 outbox에 남음)"""
+        if self._closed:
+            return True
+        self._closed = True
+        self._queue.put((self.PRIORITY_STOP, next(self._seq), "stop", None))
+        self._worker.join(timeout)
+        drained = not self._worker.is_alive()
+        if drained and self.outbox:
+            self.outbox.compact()
+        return drained
+
+    def _record(self, kind: str, text: str) -> Optional[str]:
+        return self.outbox.append(kind, text) if self.outbox else None
+
+    def _replay(self):
+        """이전 실행에서 전송하지 못한 메시지 재전송"""
+        if not self.outbox:
+            return
+        pending = self.outbox.pending()
+        if pending and self.logger:
+            self.logger.warning(f"[Notifier] Re-sending {len(pending)} undelivered notifications.")
+        for rec in pending:
+            priority = self.PRIORITY_ALERT if rec["kind"] == "alert" else self.PRIORITY_MESSAGE
+            self._put(priority, rec["kind"], (rec["text"], rec["id"]))
+
+    def _put(self, priority: int, kind: str, payload):
+        if self._closed:
+            # 종료 후 들어온 요청은 직접 처리 (유실 방지)
+            if kind == "flush":
+                payload.set()
+            else:
+                text, record_id = payload
+                self._sync_outbox()
+                if self._deliver(kind, text) and record_id:
+                    self._ack([record_id])
+            return
+        self._queue.put((priority, next(self._seq), kind, payload))
+
+    def _deliver(self, kind: str, text: str) -> bool:
+        send = self.inner.send_alert if kind == "alert" else self.inner.send_message
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                ok = send(text) is not False  # 반환값이 없는 구현은 성공으로 간주
+            except Exception as e:
+                ok = False
+                if self.logger:
+                    self.logger.error(f"[Notifier] Background send failed: {e}")
+            if ok:
+                if self.rate_limiter:
+                    self.rate_limiter.reward()
+                return True
+            if self.rate_limiter:
+                self.rate_limiter.penalize()
+            if attempt < self.max_retries:
+                time.sleep(max(self.retry_backoff * (2 ** attempt), self._retry_after()))
+        if self.logger:
+            self.logger.error(f"[Notifier] Giving up after {self.max_retries + 1} attempts ({kind}).")
+        return False
+
+    def _retry_after(self) -> float:
+        """채널이 마지막 429 응답에서 요구한 대기 시간 (없으면 0)"""
+        hint = getattr(self.inner, "retry_after", None)
+        return float(hint) if isinstance(hint, (int, float)) else 0.0
+
+    def _sync_outbox(self):
+        if not self.outbox:
+            return
+        try:
+            self.outbox.sync()
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"[Notifier] Outbox sync failed: {e}")
+
+    def _ack(self, record_ids: List[str]):
+        # ack 기록 실패로 워커가 죽지 않도록 (기록 못 한 메시지는 다음 실행에서 재전송될 뿐)
+        if not self.outbox or not record_ids:
+            return
+        try:
+            self.outbox.ack(record_ids)
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"[Notifier] Outbox ack failed: {e}")
+
+    def _run(self):
+        pending = []  # [(text, record_id)] - flush 때 묶어서 전송
+        while True:
+            _, _, kind, payload = self._queue.get()
+            if kind == "message":
+                pending.append(payload)
+                continue
+            if kind == "alert":
+                text, record_id = payload
+                self._sync_outbox()
+                if self._deliver(kind, text) and record_id:
+                    self._ack([record_id])
+                continue
+
+            if pending:
+                text = self.separator.join(t for t, _ in pending)
+                self._sync_outbox()
+                if self._deliver("message", text):
+                    self._ack([rid for _, rid in pending if rid])
+                pending = []
+            if kind == "stop":
+                return
+            payload.set()
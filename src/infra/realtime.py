@@ -0,0 +1,218 @@
+# src/infra/realtime.py
+import json
+import threading
+from base64 import b64decode
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Set
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+from websockets.sync.client import connect
+
+@dataclass
+class FillEvent:
+    """실시간 체결통보 1건"""
+    order_id: str
+    ticker: str
+    action: str     # "BUY" or "SELL"
+    quantity: int   # 이번 통보의 체결 수량
+    price: float    # 체결 단가
+    rejected: bool = False
+
+class KisFillListener:
+    """
+    KIS 실시간 해외주식 체결통보 구독기 (웹소켓)
+    - 주문번호별 체결 수량을 누적하고, 대기 중인 주문이 모두 체결되면 즉시 깨움
+    - _get_pending_orders_count 폴링(2초 간격) 대신 체결 이벤트로 주문 완료를 판단
+    """
+    TR_ID_REAL = "H0GSCNI0"
+    TR_ID_VIRTUAL = "H0GSCNI9"
+    URL_REAL = "ws://ops.koreainvestment.com:21000"
+    URL_VIRTUAL = "ws://ops.koreainvestment.com:31000"
+
+    # 체결통보 필드 위치 ('^' 구분)
+    F_ORDER_NO = 2
+    F_SIDE = 4          # 01: 매도, 02: 매수
+    F_TICKER = 7
+    F_FILL_QTY = 8
+    F_FILL_PRICE = 9
+    F_REJECTED = 11     # 1: 거부
+    F_FILLED = 12       # 2: 체결 (1: 접수/정정/취소/거부)
+
+    def __init__(self, approval_key: str, hts_id: str, logger, is_real: bool = False, url: Optional[str] = None,
+                 on_fill: Optional[Callable[[FillEvent], None]] = None):
+        self.approval_key = approval_key
+        self.hts_id = hts_id
+        self.logger = logger
+        # 체결/거부 이벤트마다 호출 (예: 브로커 잔고 캐시 무효화)
+        self.on_fill = on_fill
+        self.tr_id = self.TR_ID_REAL if is_real else self.TR_ID_VIRTUAL
+        self.url = url if url else (self.URL_REAL if is_real else self.URL_VIRTUAL)
+
+        self.connected = threading.Event()
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+        self._ordered: Dict[str, int] = {}   # {주문번호: 주문 수량}
+        self._filled: Dict[str, int] = {}    # {주문번호: 누적 체결 수량}
+        self._rejected: Set[str] = set()
+        self._cipher_key: Optional[tuple] = None  # (key, iv) - 구독 응답으로 수신
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------
+    # 수명 주기
+    # ------------------------------------------
+    def start(self, timeout: float = 5.0) -> bool:
+        """백그라운드 스레드에서 구독 시작. 연결 성공 여부 반환"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="KisFillListener", daemon=True)
+        self._thread.start()
+        return self.connected.wait(timeout)
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+        self.connected.clear()
+
+    # ------------------------------------------
+    # 주문 추적
+    # ------------------------------------------
+    def track(self, order_id: str, quantity: int):
+        """체결을 기다릴 주문 등록 (주문 접수 직후 호출)"""
+        with self._cond:
+            self._ordered[order_id] = quantity
+            self._cond.notify_all()
+
+    def replace(self, old_id: str, new_id: str, quantity: int):
+        """정정 주문: 원주문은 추적 종료, 새 주문번호로 잔량 추적"""
+        with self._cond:
+            self._ordered[old_id] = self._filled.get(old_id, 0)
+            self._ordered[new_id] = quantity
+            self._cond.notify_all()
+
+    def filled_quantity(self, order_id: str) -> int:
+        with self._cond:
+            return self._filled.get(order_id, 0)
+
+    def pending(self, order_ids: Optional[Iterable[str]] = None) -> int:
+        """전량 체결(또는 거부)되지 않은 주문 개수"""
+        with self._cond:
+            return self._pending_locked(order_ids)
+
+    def wait_for_fills(self, order_ids: Iterable[str], timeout: float) -> bool:
+        """주문이 모두 체결될 때까지 대기. True: 전량 체결, False: 타임아웃/연결 끊김"""
+        order_ids = list(order_ids)
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._pending_locked(order_ids) == 0 or not self.connected.is_set(),
+                timeout
+            ) and self._pending_locked(order_ids) == 0
+
+    def _pending_locked(self, order_ids: Optional[Iterable[str]]) -> int:
+        ids = self._ordered.keys() if order_ids is None else order_ids
+        return sum(
+            1 for oid in ids
+            if oid not in self._rejected and self._filled.get(oid, 0) < self._ordered.get(oid, 0)
+        )
+
+    # ------------------------------------------
+    # 웹소켓 처리
+    # ------------------------------------------
+    def _run(self):
+        try:
+            with connect(self.url, open_timeout=5) as ws:
+                self._ws = ws
+                ws.send(json.dumps(self._subscribe_message()))
+                self.connected.set()
+                self.logger.info(f"[FillListener] Subscribed to {self.tr_id} ({self.url})")
+                for raw in ws:
+                    if self._stop.is_set():
+                        break
+                    try:
+                        self._handle(ws, raw)
+                    except (ValueError, IndexError, KeyError, AttributeError, TypeError) as e:
+                        # 잘못된 메시지 1건 때문에 수신 스레드가 죽지 않도록 건너뜀
+                        self.logger.warning(f"[FillListener] Skipped malformed message: {e}")
+        except Exception as e:
+            if not self._stop.is_set():
+                self.logger.error(f"[FillListener] Connection error: {e}")
+        finally:
+            self._ws = None
+            self.connected.clear()
+            # 대기 중인 스레드가 폴링으로 전환할 수 있도록 깨움
+            with self._cond:
+                self._cond.notify_all()
+
+    def _subscribe_message(self) -> dict:
+        return {
+            "header": {
+                "approval_key": self.approval_key,
+                "custtype": "P",
+                "tr_type": "1",  # 1: 등록, 2: 해제
+                "content-type": "utf-8"
+            },
+            "body": {"input": {"tr_id": self.tr_id, "tr_key": self.hts_id}}
+        }
+
+    def _handle(self, ws, raw: str):
+        # 실시간 데이터: "암호화여부|TR_ID|건수|데이터"
+        if raw[:1] in ("0", "1"):
+            encrypted, tr_id, count, body = raw.split("|", 3)
+            if tr_id != self.tr_id:
+                return
+            if encrypted == "1":
+                body = self._decrypt(body)
+            fields = body.split("^")
+            size = len(fields) // max(int(count), 1)
+            for i in range(0, size * int(count), size):
+                event = self._parse(fields[i:i + size])
+                if event:
+                    self._apply(event)
+            return
+
+        # 제어 메시지 (JSON): PINGPONG 응답, 구독 응답(복호화 키 수신)
+        msg = json.loads(raw)
+        header = msg.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            ws.send(raw)
+            return
+        output = msg.get("body", {}).get("output")
+        if output and output.get("key"):
+            self._cipher_key = (output["key"], output["iv"])
+
+    def _decrypt(self, body: str) -> str:
+        if not self._cipher_key:
+            raise ValueError("Encrypted notice received before subscription key")
+        key, iv = self._cipher_key
+        cipher = AES.new(key.encode("utf-8"), AES.MODE_CBC, iv.encode("utf-8"))
+        return unpad(cipher.decrypt(b64decode(body)), AES.block_size).decode("utf-8")
+
+    def _parse(self, fields) -> Optional[FillEvent]:
+        rejected = fields[self.F_REJECTED] == "1"
+        if fields[self.F_FILLED] != "2" and not rejected:
+            return None  # 접수/정정/취소 통보는 무시
+        return FillEvent(
+            order_id=fields[self.F_ORDER_NO],
+            ticker=fields[self.F_TICKER],
+            action="SELL" if fields[self.F_SIDE] == "01" else "BUY",
+            quantity=0 if rejected else int(fields[self.F_FILL_QTY] or 0),
+            price=0.0 if rejected else float(fields[self.F_FILL_PRICE] or 0),
+            rejected=rejected
+        )
+
+    def _apply(self, event: FillEvent):
+        with self._cond:
+            if event.rejected:
+                self._rejected.add(event.order_id)
+                self.logger.warning(f"[FillListener] Order rejected: {event.order_id} {event.ticker}")
+            else:
+                self._filled[event.order_id] = self._filled.get(event.order_id, 0) + event.quantity
+                self.logger.info(f"[FillListener] Filled: {event.action} {event.ticker} {event.quantity} @ {event.price}")
+            self._cond.notify_all()
+        if self.on_fill:
+            self.on_fill(event)
@@ -1,24 +1,58 @@
 # src/infra/repo.py
+import base64
+import contextlib
 import json
 import os
-from typing import List, Dict
+import sqlite3
+import uuid
+from typing import List, Dict, Optional, Tuple
 from dataclasses import asdict
 from datetime import datetime
 from src.core.models import MarketData, Portfolio, TradeSignal, MarketRegime, TradeExecution
+from src.infra.dashboard import DashboardExporter, PerformanceAggregator
+from src.utils.jsonio import encode_files
 
 class JsonRepository:
-    def __init__(self, root_path: str = "docs/data"):
+    def __init__(self, root_path: str = "docs/data", compact: bool = False, gzip_outputs: bool = False):
         self.root = root_path
         os.makedirs(self.root, exist_ok=True)
+        # compact: 들여쓰기 없이 + 필드별 소수점 반올림 (매일 커밋되는 docs/data 크기 축소)
+        # gzip_outputs: 정적 호스팅용 .gz 사본 함께 저장
+        self.compact = compact
+        self.gzip_outputs = gzip_outputs
         
         self.status_file = os.path.join(self.root, "status.json")
+        # 전체 JSON 배열 (다른 도구 호환용, export_legacy_arrays()로만 다시 생성)
         self.summary_file = os.path.join(self.root, "summary.json")
         self.history_file = os.path.join(self.root, "history.json")
+        # 원본 기록 (한 줄에 레코드 하나씩 이어쓰기)
+        self.summary_log = os.path.join(self.root, "summary.jsonl")
+        self.history_log = os.path.join(self.root, "history.jsonl")
+        # batch() 커밋 journal: 반영 도중 중단된 커밋은 다음 실행 시 마저 반영
+        self.journal_file = os.path.join(self.root, ".commit.journal")
+        self._batch: Optional[List[Tuple[str, str, bytes]]] = None
+        self._recover()
+        # 대시보드 분할 데이터 (월별 샤드 + index.json + overview.json)
+        self.exporter = DashboardExporter(self.root, compact=compact, gzip_outputs=gzip_outputs)
+        # 대시보드 파생 지표 (낙폭, 월/연 수익률, 국면 구간 등) 누적 상태
+        self.aggregator = PerformanceAggregator(os.path.join(self.root, "aggregates.json"))
 
     def save_daily_summary(self, market: MarketData, signal: TradeSignal, pf: Portfolio):
-        """일별 요약 저장 (Append 방식)"""
-        
-        record = {
+        """일별 요약 저장 (summary.jsonl에 한 줄 Append)"""
+        record = self._aggregate(self._summary_record(market, signal, pf))
+        # 기존 파일을 읽지 않고 한 줄만 추가 -> 기록이 쌓여도 저장 비용 일정
+        self._append_jsonl(self.summary_log, record, legacy_path=self.summary_file)
+        self._write_file(self.aggregator.path, self.aggregator.dumps())
+
+    def save_trade_history(self, executions: List[TradeExecution], pf: Portfolio, reason: str):
+        """매매 내역 저장 (history.jsonl에 한 줄 Append)"""
+        if not executions:
+            return
+        record = self._history_record(executions, pf, reason)
+        self._append_jsonl(self.history_log, record, legacy_path=self.history_file)
+
+    def _summary_record(self, market: MarketData, signal: TradeSignal, pf: Portfolio) -> Dict:
+        return {
             "date": market.date,
             
             # [자산 정보]
@@ -36,19 +70,20 @@ class JsonRepository:
             "regime": signal.reason, # 혹은 mapped string (예: "Bear")
             "target_exposure": signal.target_exposure
         }
-        
-        data = self._load_json(self.summary_file, default=[])
-        data.append(record)
-        
-        # 파일이 너무 커지는 것을 방지하려면 여기서 최근 N개(예: 2000개)만 유지하는 로직 추가 가능
-        # data = data[-2000:] 
-        
-        self._save_json(self.summary_file, data)
-    def save_trade_history(self, executions: List[TradeExecution], pf: Portfolio, reason: str):
-        """매매 내역 저장 - Append"""
-        if not executions:
-            return
 
+    def _aggregate(self, record: Dict) -> Dict:
+        """파생 지표를 이전 상태에서 이어서 계산해 레코드에 추가"""
+        if not self.aggregator.loaded:
+            self.aggregator.rebuild(self.load_summary())
+        record.update(self.aggregator.update(record))
+        return record
+
+    def rebuild_aggregates(self):
+        """파생 지표를 전체 기록으로 다시 계산 (상태 파일이 어긋났을 때)"""
+        self.aggregator.rebuild(self.load_summary())
+        self._write_file(self.aggregator.path, self.aggregator.dumps())
+
+    def _history_record(self, executions: List[TradeExecution], pf: Portfolio, reason: str) -> Dict:
         # 거래 규모 계산
         trade_amt = sum(e.price * e.quantity for e in executions)
         
@@ -56,7 +91,7 @@ class JsonRepository:
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         tx_id = f"tx_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        record = {
+        return {
             "id": tx_id,                    # [추가]
             "date": now_str,
             "portfolio_value": pf.total_value, # [추가]
@@ -64,16 +99,73 @@ class JsonRepository:
             "reason": reason,
             "executions": [asdict(e) for e in executions]
         }
-        
-        data = self._load_json(self.history_file, default=[])
-        
-        # 최신 내역이 위로 오게 할지, 아래로 가게 할지 결정 (여기선 Append -> 아래)
-        data.append(record)
-        
-        # 히스토리가 무한정 길어지는 것 방지 (예: 최근 100건만 유지) - 선택사항
-        # if len(data) > 100: data = data[-100:]
-        
-        self._save_json(self.history_file, data)
+
+    def load_summary(self) -> List[Dict]:
+        """일별 요약 전체 (기록 순서)"""
+        return self._load_jsonl(self.summary_log, legacy_path=self.summary_file)
+
+    def load_history(self) -> List[Dict]:
+        """매매 내역 전체 (기록 순서)"""
+        return self._load_jsonl(self.history_log, legacy_path=self.history_file)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        여러 저장을 하나의 커밋으로 묶음 (예: 실행 마지막의 요약/매매 내역/상태 저장)
+        - 블록 안의 쓰기는 모아 두었다가 종료 시 journal 1개에 기록(fsync) 후 반영
+        - 반영한 파일/디렉터리를 fsync한 뒤에만 journal 삭제 (전원이 꺼져도 journal 또는 반영 결과 중 하나는 남음)
+        - 반영 도중 중단되면 다음 실행 시 journal로 마저 반영 -> 파일 간 상태가 항상 일치
+        - 블록 안에서 예외가 나면 아무것도 쓰지 않음
+        """
+        if self._batch is not None:
+            yield self  # 중첩 batch는 바깥 커밋에 합침
+            return
+        self._batch = []
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            self._discard()
+            raise
+        ops, self._batch = self._batch, None
+        self._commit(ops)
+
+    def export_dashboard(self, full: bool = False):
+        """
+        대시보드 데이터 갱신
+        - 저장과 분리된 단계: 실행 마지막에 한 번만 호출
+        - 기본: 지난 export 이후 달의 샤드 + index.json/overview.json만 갱신 (기록 끝부분만 읽음)
+        - full=True 또는 첫 export: 전체 기록으로 다시 생성
+        - docs/ja/dashboard.js는 index.json/overview.json과 필요한 월별 샤드만 읽음
+        - 임시 파일에 쓴 뒤 교체하므로 도중에 실패해도 기존 파일은 그대로 유지
+        """
+        resume = None if full else self.exporter.resume_points()
+        if resume is None:
+            self.exporter.export(self.load_summary(), self.load_history(), self.aggregator.state)
+            return
+        summary_since, history_since = resume
+        self.exporter.export_recent(
+            self._summary_since(summary_since),
+            self._history_since(history_since, self.exporter.RECENT_HISTORY),
+            summary_since, history_since, self.aggregator.state
+        )
+
+    def export_legacy_arrays(self):
+        """
+        summary.json/history.json(전체 배열) 생성 - 다른 도구 호환용 선택 단계
+        전체 기록을 다시 쓰므로 필요할 때만 호출 (대시보드는 사용하지 않음)
+        """
+        self._save_json(self.summary_file, self.load_summary())
+        self._save_json(self.history_file, self.load_history())
+
+    def _summary_since(self, month: str) -> List[Dict]:
+        """month(YYYY-MM) 이후 일별 요약 (파일 끝에서부터 읽음)"""
+        return self._tail_jsonl(self.summary_log, self.summary_file, month)
+
+    def _history_since(self, month: str, min_count: int = 0) -> List[Dict]:
+        """month 이후 매매 내역 (최근 min_count건은 월과 무관하게 포함)"""
+        return self._tail_jsonl(self.history_log, self.history_file, month, min_count)
+
     def update_status(self, 
                       regime: MarketRegime, 
                       exposure: float, 
@@ -128,5 +220,417 @@ class JsonRepository:
             return default
 
     def _save_json(self, path: str, data):
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+        # 임시 파일에 쓴 뒤 교체 -> 쓰는 도중 중단되어도 기존 파일이 잘리지 않음
+        for target, payload in encode_files(path, data, compact=self.compact, gzip_copy=self.gzip_outputs):
+            self._write_file(target, payload)
+
+    def _write_file(self, path: str, payload: bytes):
+        if self._batch is not None:
+            self._batch.append(("write", path, payload))
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _append_jsonl(self, path: str, record: Dict, legacy_path: Optional[str] = None):
+        # 직렬화를 먼저 해서 실패해도 파일에 반쪽짜리 줄이 남지 않도록
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        if legacy_path:
+            self._migrate_legacy(legacy_path, path)
+        if self._batch is not None:
+            self._batch.append(("append", path, line.encode("utf-8")))
+            return
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    # ------------------------------------------
+    # batch 커밋 (journal)
+    # ------------------------------------------
+    def _commit(self, ops: List[Tuple[str, str, bytes]]):
+        entries = self._journal_entries(ops)
+        commit_id = uuid.uuid4().hex if entries else None
+
+        # 커밋 지점: journal이 디스크(디렉터리 항목 포함)에 기록된 뒤에만 실제 파일을 건드림
+        if entries:
+            tmp_path = f"{self.journal_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "commit_id": commit_id,
+                    "entries": [dict(e, data=base64.b64encode(e["data"]).decode("ascii")) for e in entries]
+                }, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_file)
+            self._fsync_dir(self.root)
+
+        # 다른 저장소(SQLite)는 journal 이후에 커밋 -> 복구 시 commit_id로 커밋 여부 확인
+        self._commit_external(commit_id)
+
+        if entries:
+            self._apply(entries)
+            self._remove_journal()
+
+    def _commit_external(self, commit_id: Optional[str]):
+        """journal과 함께 커밋해야 하는 다른 저장소 (JSON 저장소는 없음)"""
+
+    def _is_committed(self, commit_id: Optional[str]) -> bool:
+        """journal의 commit_id가 다른 저장소에도 커밋되었는지 (JSON 저장소는 journal이 곧 커밋)"""
+        return True
+
+    def _journal_entries(self, ops: List[Tuple[str, str, bytes]]) -> List[Dict]:
+        entries = []
+        appends: Dict[str, Dict] = {}
+        for op, path, data in ops:
+            rel = os.path.relpath(path, self.root)
+            if op == "append":
+                # 같은 파일 append는 하나로 합치고, 시작 위치(offset)를 기록 -> 다시 반영해도 중복되지 않음
+                if rel in appends:
+                    appends[rel]["data"] += data
+                    continue
+                offset = os.path.getsize(path) if os.path.exists(path) else 0
+                appends[rel] = {"op": op, "path": rel, "offset": offset, "data": data}
+                entries.append(appends[rel])
+            else:
+                entries.append({"op": op, "path": rel, "data": data})
+        return entries
+
+    def _apply(self, entries: List[Dict]):
+        """journal 내용을 파일에 반영하고 파일/디렉터리까지 디스크에 기록"""
+        dirs = set()
+        for e in entries:
+            path = os.path.join(self.root, e["path"])
+            if e["op"] == "append":
+                with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                    f.truncate(e["offset"])
+                    f.seek(e["offset"])
+                    f.write(e["data"])
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(e["data"])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            dirs.add(os.path.dirname(path))
+        # 새로 만든 파일/교체한 파일의 디렉터리 항목도 기록
+        for d in sorted(dirs):
+            self._fsync_dir(d)
+
+    def _remove_journal(self):
+        # 반영 결과가 디스크에 기록된 뒤에만 호출 (journal이 유일한 사본일 수 있으므로)
+        os.remove(self.journal_file)
+        self._fsync_dir(self.root)
+
+    @staticmethod
+    def _fsync_dir(path: str):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return  # 디렉터리를 열 수 없는 플랫폼(Windows 등)은 생략
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _recover(self):
+        """중단된 batch 커밋 마저 반영 (journal이 완성되고 다른 저장소도 커밋된 경우만)"""
+        if os.path.exists(f"{self.journal_file}.tmp"):
+            os.remove(f"{self.journal_file}.tmp")  # 커밋 지점 이전에 중단 -> 버림
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+        if isinstance(journal, list):
+            journal = {"commit_id": None, "entries": journal}  # commit_id 도입 이전 형식
+        if self._is_committed(journal["commit_id"]):
+            self._apply([dict(e, data=base64.b64decode(e["data"])) for e in journal["entries"]])
+        # 다른 저장소에 커밋되지 않았으면 (SQLite 커밋 전 중단) 파일도 반영하지 않고 버림
+        self._remove_journal()
+
+    def _discard(self):
+        # 블록 안에서 갱신된 누적 지표를 디스크 상태로 되돌림
+        self.aggregator = PerformanceAggregator(self.aggregator.path)
+
+    def _load_jsonl(self, path: str, legacy_path: Optional[str] = None) -> List[Dict]:
+        if not os.path.exists(path):
+            # 아직 이어쓰기 기록이 없으면 구버전 JSON 배열을 그대로 사용
+            return self._load_json(legacy_path, default=[]) if legacy_path else []
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # 기록 도중 끊긴 줄은 건너뜀
+        return records
+
+    def _tail_jsonl(self, path: str, legacy_path: Optional[str], month: str, min_count: int = 0) -> List[Dict]:
+        """
+        JSONL 끝부분만 역순으로 읽어 month 이후 레코드(+ 최근 min_count건) 반환
+        기록은 시간 순으로 append 되므로 month 이전 레코드를 만나면 중단
+        """
+        if not os.path.exists(path):
+            records = self._load_jsonl(path, legacy_path)
+            start = next((i for i, r in enumerate(records) if str(r.get("date", ""))[:7] >= month), len(records))
+            return records[min(start, max(len(records) - min_count, 0)):]
+        records = []
+        for line in self._reverse_lines(path):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 기록 도중 끊긴 줄은 건너뜀
+            if len(records) >= min_count and str(record.get("date", ""))[:7] < month:
+                break
+            records.append(record)
+        records.reverse()
+        return records
+
+    @staticmethod
+    def _reverse_lines(path: str, block_size: int = 64 * 1024):
+        """파일 끝에서부터 한 줄씩 (빈 줄 제외)"""
+        with open(path, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            rest = b""
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + rest).split(b"\n")
+                # 블록 첫 줄은 앞부분이 잘렸을 수 있으므로 다음 블록과 합쳐서 처리
+                rest = lines.pop(0) if pos > 0 else b""
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line
+            if rest.strip():
+                yield rest
+
+    def _migrate_legacy(self, legacy_path: str, log_path: str):
+        """구버전 JSON 배열 -> JSONL 1회 변환 (JSONL이 아직 없을 때만)"""
+        if os.path.exists(log_path) or not os.path.exists(legacy_path):
+            return
+        records = self._load_json(legacy_path, default=[])
+        tmp_path = f"{log_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for rec in records if isinstance(records, list) else []:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, log_path)
+
+
+class SqliteRepository(JsonRepository):
+    """
+    SQLite 저장소 (JsonRepository와 같은 저장 인터페이스)
+    - 일별 요약/매매 내역을 테이블로 저장하고 날짜/종목 인덱스로 범위 조회
+    - WAL 모드: 쓰기 중에도 읽기(분석/대시보드 export)가 막히지 않음
+    - status.json 및 대시보드 JSON(export_dashboard)은 기존과 동일하게 root_path에 생성
+    """
+    SUMMARY_COLUMNS = ("date", "total_value", "cash_balance", "spy_price", "spy_ma180",
+                       "spy_volatility", "spy_momentum", "mdd", "regime", "target_exposure",
+                       "drawdown", "portfolio_return", "benchmark_return", "relative_return")
+    EXECUTION_COLUMNS = ("ticker", "action", "quantity", "price", "fee", "date", "status", "reason", "order_id")
+
+    def __init__(self, db_path: str, root_path: str = "docs/data", compact: bool = False, gzip_outputs: bool = False):
+        # DB를 먼저 열어야 부모 생성자의 journal 복구에서 커밋 여부를 확인할 수 있음
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 커밋 단위 내구성 유지
+        self._create_tables()
+        super().__init__(root_path, compact=compact, gzip_outputs=gzip_outputs)
+        self._import_legacy()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------
+    # 저장
+    # ------------------------------------------
+    def save_daily_summary(self, market: MarketData, signal: TradeSignal, pf: Portfolio):
+        """일별 요약 저장 (1행 INSERT)"""
+        record = self._aggregate(self._summary_record(market, signal, pf))
+        with self._transaction():
+            self._insert_summary(record)
+        self._write_file(self.aggregator.path, self.aggregator.dumps())
+
+    def save_trade_history(self, executions: List[TradeExecution], pf: Portfolio, reason: str):
+        """매매 내역 저장 (거래 1행 + 체결 N행, 한 트랜잭션)"""
+        if not executions:
+            return
+        with self._transaction():
+            self._insert_history(self._history_record(executions, pf, reason))
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def load_summary(self) -> List[Dict]:
+        return self.summary_between()
+
+    def load_history(self) -> List[Dict]:
+        rows = self.conn.execute("SELECT * FROM trades ORDER BY seq").fetchall()
+        return self._history_rows(rows)
+
+    def summary_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """기간 내 일별 요약 (start <= date <= end, 날짜 문자열 'YYYY-MM-DD')"""
+        where, params = self._date_range("date", start, end)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM summary{where} ORDER BY date, seq", params
+        ).fetchall()
+        # 구버전 기록에 없던 필드(NULL)는 원래처럼 키 없이 반환
+        return [{k: row[k] for k in row.keys() if row[k] is not None} for row in rows]
+
+    def executions_for(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """종목별 체결 내역 (체결 시간 순)"""
+        where, params = self._date_range("date", start, end)
+        where = f"{where} AND ticker = ?" if where else " WHERE ticker = ?"
+        rows = self.conn.execute(
+            f"SELECT {', '.join(self.EXECUTION_COLUMNS)} FROM executions{where} ORDER BY date, trade_seq",
+            params + [ticker]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _summary_since(self, month: str) -> List[Dict]:
+        return self.summary_between(start=month)
+
+    def _history_since(self, month: str, min_count: int = 0) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM trades WHERE date >= ? OR seq IN "
+            "(SELECT seq FROM trades ORDER BY seq DESC LIMIT ?) ORDER BY seq", [month, min_count]
+        ).fetchall()
+        return self._history_rows(rows)
+
+    def history_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """기간 내 매매 내역 (체결 목록 포함)"""
+        where, params = self._date_range("date", start, end)
+        rows = self.conn.execute(f"SELECT * FROM trades{where} ORDER BY seq", params).fetchall()
+        return self._history_rows(rows)
+
+    # ------------------------------------------
+    # 내부
+    # ------------------------------------------
+    def _transaction(self):
+        # batch() 중에는 종료 시 한 번에 커밋
+        return contextlib.nullcontext() if self._batch is not None else self.conn
+
+    def _commit_external(self, commit_id: Optional[str]):
+        # journal(fsync 완료) 이후 DB 커밋, 같은 트랜잭션에 commit_id 기록 -> 복구 시 반영 여부 판단
+        if commit_id is not None:
+            self.conn.execute("DELETE FROM commits")
+            self.conn.execute("INSERT INTO commits (id) VALUES (?)", [commit_id])
+        self.conn.commit()
+
+    def _is_committed(self, commit_id: Optional[str]) -> bool:
+        if commit_id is None:
+            return True
+        return self.conn.execute("SELECT 1 FROM commits WHERE id = ?", [commit_id]).fetchone() is not None
+
+    def _discard(self):
+        self.conn.rollback()
+        super()._discard()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS summary (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    {', '.join(self.SUMMARY_COLUMNS)}
+                );
+                CREATE INDEX IF NOT EXISTS idx_summary_date ON summary(date);
+
+                CREATE TABLE IF NOT EXISTS trades (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT, date TEXT, portfolio_value REAL, total_trade_amount REAL, reason TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_trades_date ON trades(date);
+
+                CREATE TABLE IF NOT EXISTS executions (
+                    trade_seq INTEGER NOT NULL REFERENCES trades(seq),
+                    {', '.join(self.EXECUTION_COLUMNS)}
+                );
+                CREATE INDEX IF NOT EXISTS idx_executions_ticker_date ON executions(ticker, date);
+                CREATE INDEX IF NOT EXISTS idx_executions_trade ON executions(trade_seq);
+
+                -- 마지막 batch 커밋 id (JSON journal과 DB 커밋을 함께 확정하기 위한 표시)
+                CREATE TABLE IF NOT EXISTS commits (id TEXT PRIMARY KEY);
+            """)
+            # 이전 버전 DB: 새로 추가된 요약 컬럼 보충
+            existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(summary)")}
+            for column in self.SUMMARY_COLUMNS:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE summary ADD COLUMN {column}")
+
+    def _import_legacy(self):
+        """DB가 비어 있으면 기존 JSON/JSONL 기록을 1회 가져옴 (JSON 저장소에서 전환 시)"""
+        if self.conn.execute("SELECT 1 FROM summary LIMIT 1").fetchone() or \
+           self.conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone():
+            return
+        summary = self._load_jsonl(self.summary_log, legacy_path=self.summary_file)
+        history = self._load_jsonl(self.history_log, legacy_path=self.history_file)
+        with self.conn:
+            for rec in summary:
+                self._insert_summary(rec)
+            for rec in history:
+                self._insert_history(rec)
+
+    def _insert_summary(self, record: Dict):
+        self.conn.execute(
+            f"INSERT INTO summary ({', '.join(self.SUMMARY_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.SUMMARY_COLUMNS))})",
+            [record.get(c) for c in self.SUMMARY_COLUMNS]
+        )
+
+    def _insert_history(self, record: Dict):
+        cur = self.conn.execute(
+            "INSERT INTO trades (id, date, portfolio_value, total_trade_amount, reason) VALUES (?, ?, ?, ?, ?)",
+            [record.get("id"), record.get("date"), record.get("portfolio_value"),
+             record.get("total_trade_amount"), record.get("reason")]
+        )
+        self.conn.executemany(
+            f"INSERT INTO executions (trade_seq, {', '.join(self.EXECUTION_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(self.EXECUTION_COLUMNS))})",
+            [[cur.lastrowid] + [e.get(c) for c in self.EXECUTION_COLUMNS] for e in record.get("executions", [])]
+        )
+
+    def _history_rows(self, rows) -> List[Dict]:
+        if not rows:
+            return []
+        # 체결 목록은 한 번의 쿼리로 모아서 거래별로 분배
+        seqs = [row["seq"] for row in rows]
+        executions: Dict[int, List[Dict]] = {seq: [] for seq in seqs}
+        for i in range(0, len(seqs), 500):  # SQLite 바인딩 변수 개수 제한
+            chunk = seqs[i:i + 500]
+            for e in self.conn.execute(
+                f"SELECT trade_seq, {', '.join(self.EXECUTION_COLUMNS)} FROM executions "
+                f"WHERE trade_seq IN ({', '.join('?' * len(chunk))}) ORDER BY rowid", chunk
+            ):
+                executions[e["trade_seq"]].append({c: e[c] for c in self.EXECUTION_COLUMNS})
+        return [
+            {
+                "id": row["id"],
+                "date": row["date"],
+                "portfolio_value": row["portfolio_value"],
+                "total_trade_amount": row["total_trade_amount"],
+                "reason": row["reason"],
+                "executions": executions[row["seq"]]
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _date_range(column: str, start: Optional[str], end: Optional[str]):
+        clauses, params = [], []
+        if start:
+            clauses.append(f"{column} >= ?")
+            params.append(start)
+        if end:
+            # 날짜만 주면 'YYYY-MM-DD HH:MM:SS' 형식 기록도 그날 끝까지 포함
+            clauses.append(f"{column} <= ?")
+            params.append(end if len(end) > 10 else f"{end} 23:59:59")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
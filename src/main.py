@@ -2,7 +2,6 @@
 import sys
 import traceback
 import pandas as pd
-import time
 
 # 모듈 경로 설정
 import os
@@ -13,25 +12,44 @@ from src.core.logic import RegimeAnalyzer, VolatilityTargeter, Rebalancer
 from src.utils.calculator import IndicatorCalculator
 from src.utils.logger import TradeLogger
 from src.infra.data import YFinanceLoader
-from src.infra.broker import MockBroker, KisBroker
+from src.infra.broker import MockBroker, KisBroker, ExecutionPolicy
 from src.infra.notifier import TelegramNotifier
 from src.infra.notifier import SlackNotifier
-from src.infra.repo import JsonRepository
+from src.infra.notifier import QueuedNotifier, NotificationOutbox
+from src.utils.ratelimit import TokenBucket
+from src.infra.repo import JsonRepository, SqliteRepository
+from src.infra.ledger import PortfolioLedger
 from src.core.models import MarketRegime
 
 class TradingBot:
+    # 실행 종료 시 알림 전송 대기 최대 시간(초)
+    NOTIFY_FLUSH_TIMEOUT = 10
+    # Slack Incoming Webhook 권장 한도 (초당 1건, 짧은 버스트 허용)
+    NOTIFY_RATE_LIMIT = 1.0
+
     def __init__(self):
         # 1. 설정 및 로거 초기화
         self.config = Config()
-        self.logger = TradeLogger(self.config.LOG_PATH)
+        self.logger = TradeLogger(self.config.LOG_PATH, structured=self.config.LOG_STRUCTURED)
         
         self.logger.info("=== Initializing Trading Bot ===")
         
         # 2. 인프라 객체 생성 (DI)
         self.data_loader = YFinanceLoader(self.logger)
-        self.repo = JsonRepository(self.config.DATA_PATH)
+        if self.config.STORAGE_BACKEND == "sqlite":
+            self.repo = SqliteRepository(self.config.DB_PATH, self.config.DATA_PATH,
+                                         compact=self.config.DATA_COMPACT, gzip_outputs=self.config.DATA_GZIP)
+        else:
+            self.repo = JsonRepository(self.config.DATA_PATH,
+                                       compact=self.config.DATA_COMPACT, gzip_outputs=self.config.DATA_GZIP)
         #self.notifier = TelegramNotifier(self.config.TELEGRAM_TOKEN, self.config.TELEGRAM_CHAT_ID)
-        self.notifier = SlackNotifier(self.config.SLACK_WEBHOOK_URL, self.logger)
+        # 알림은 백그라운드로 전송 (Slack 응답 대기가 매매 경로를 막지 않도록)
+        # 전송 전 outbox에 기록 -> 실패/중단 시 다음 실행에서 재전송
+        self.notifier = QueuedNotifier(
+            SlackNotifier(self.config.SLACK_WEBHOOK_URL, self.logger), self.logger,
+            outbox=NotificationOutbox(self.config.NOTIFY_OUTBOX_PATH),
+            rate_limiter=TokenBucket(self.NOTIFY_RATE_LIMIT, capacity=3)
+        )
         
         # 브로커 선택 (실전 vs 모의)
         if self.config.IS_LIVE_TRADING:
@@ -40,11 +58,22 @@ class TradingBot:
             self.broker = KisBroker(
                 self.config.KIS_APP_KEY, 
                 self.config.KIS_APP_SECRET, 
-                self.config.KIS_ACC_NO
+                self.config.KIS_ACC_NO,
+                self.logger,
+                token_path=self.config.KIS_TOKEN_PATH,
+                execution_policy=ExecutionPolicy(),
+                exchange_map_path=self.config.KIS_EXCHANGE_MAP_PATH,
+                ledger=PortfolioLedger(self.config.LEDGER_PATH)  # 체결 이벤트 기록 (모의투자와 같은 형식, 별도 경로)
             )
+            # 운용 종목의 거래소 코드를 미리 확정 (잘못된 거래소로 시세/주문 실패 방지)
+            self.broker.warm_up_exchanges(sum(self.config.ASSET_GROUPS.values(), []))
+            if self.config.KIS_HTS_ID:
+                self.broker.start_fill_listener(self.config.KIS_HTS_ID)
         else:
             self.logger.info("Mode: PAPER TRADING (MockBroker)")
-            self.broker = MockBroker(initial_cash=10000.0) # 테스트용 초기자금
+            # 원장이 있으면 이전 실행의 잔고로 이어서 시작, 없으면 초기자금으로 시작
+            self.broker = MockBroker(initial_cash=10000.0, ledger=PortfolioLedger(self.config.LEDGER_PATH),
+                                     logger=self.logger)
 
         # 3. 도메인 서비스 및 유틸 생성
         self.calculator = IndicatorCalculator()
@@ -56,12 +85,14 @@ class TradingBot:
         try:
             self.logger.info(">>> Step 1: Data Collection")
             # SPY 데이터 수집 (지표 계산용)
-            spy_df = self.data_loader.fetch_ohlcv(["SPY"], days=400) # 여유있게 400일
-            vix = self.data_loader.fetch_vix()
+            with self.logger.timed("data_collection"):
+                spy_df = self.data_loader.fetch_ohlcv(["SPY"], days=400) # 여유있게 400일
+                vix = self.data_loader.fetch_vix()
             
             self.logger.info(">>> Step 2: Indicator Calculation")
             market_data = self.calculator.calculate(spy_df, vix)
-            self.logger.info(f"Market Data: Price={market_data.spy_price}, VIX={market_data.vix}, MDD={market_data.spy_mdd:.2%}")
+            self.logger.info("Market Data: Price=%s, VIX=%s, MDD=%.2f%%",
+                             market_data.spy_price, market_data.vix, market_data.spy_mdd * 100)
             
             # 위험 감지 (Circuit Breaker)
             if market_data.is_risk_condition():
@@ -80,10 +111,11 @@ class TradingBot:
             self.logger.info(f"Current Portfolio: Cash=${pre_trade_pf.total_cash:,.0f}, Value=${pre_trade_pf.total_value:,.0f}")
             
             # 현재가 업데이트 (리밸런싱 계산을 위해 전체 티커 최신가 필요)
-            # 여기서는 편의상 YFinance로 전체 티커 현재가 조회 후 Portfolio에 주입
-            self.logger.info("Fetching Real-time prices from Broker...")
+            # 보유 종목은 잔고 조회 응답의 현재가(now_pric2)를 사용하고, 나머지만 시세 조회
             all_tickers = sum(self.config.ASSET_GROUPS.values(), [])
-            real_time_prices = self.broker.fetch_current_prices(all_tickers)
+            missing = [t for t in all_tickers if pre_trade_pf.current_prices.get(t, 0) <= 0]
+            self.logger.info(f"Fetching Real-time prices from Broker... ({len(missing)}/{len(all_tickers)} tickers)")
+            real_time_prices = self.broker.fetch_current_prices(missing) if missing else {}
             # 주의: Broker가 가격을 못 가져온 종목이 있다면 기존 값 유지 등의 방어 로직 필요
             for t, price in real_time_prices.items():
                 if price > 0:
@@ -95,14 +127,16 @@ class TradingBot:
                 self.logger.info(f"Signal Generated: {signal.reason}")
                 self.logger.info(f"Executing {len(signal.orders)} orders...")
                 
-                executions = self.broker.execute_orders(signal.orders)
+                with self.logger.timed("order_execution"):
+                    executions = self.broker.execute_orders(signal.orders)
                 
                 if executions:
                     msg = f"✅ Orders Executed. Count: {len(executions)}"
                     self.notifier.send_message(msg)
-                    if self.config.IS_LIVE_TRADING:
-                        time.sleep(3) 
-                    
+                    # 전량 체결이면 브로커가 체결 내역으로 계산해 둔 스냅샷 사용,
+                    # 확정되지 않은 주문이 있으면 캐시를 버리고 바로 재조회 (고정 대기 없음)
+                    if not all(e.status == "FILLED" for e in executions):
+                        self.broker.invalidate_portfolio()
                     final_pf = self.broker.get_portfolio()
                     self.logger.info(f"Updated Portfolio: Cash=${final_pf.total_cash:,.0f}, Value=${final_pf.total_value:,.0f}")
                 else:
@@ -114,16 +148,37 @@ class TradingBot:
                 executions = []
 
             self.logger.info(">>> Step 5: Archiving Data")
-            self.repo.save_daily_summary(market_data, signal, final_pf)
-            self.repo.save_trade_history(executions, final_pf)
-            self.repo.update_status(regime, exposure, final_pf, market_data, signal.reason)
+            # 요약/매매 내역/상태를 한 번에 커밋 (중간에 중단되어도 파일 간 불일치 없음)
+            with self.repo.batch():
+                self.repo.save_daily_summary(market_data, signal, final_pf)
+                self.repo.save_trade_history(executions, final_pf, signal.reason)
+                self.repo.update_status(regime, exposure, final_pf, market_data, signal.reason)
+            # 대시보드용 JSON은 기록(JSONL)에서 한 번에 재생성
+            self.repo.export_dashboard()
+            if self.config.EXPORT_LEGACY_ARRAYS:
+                self.repo.export_legacy_arrays()  # 전체 배열 (다른 도구 호환용, 선택)
             
         except Exception as e:
             error_msg = f"Critical Error:\n{traceback.format_exc()}"
             self.logger.error(error_msg)
             self.notifier.send_alert(f"🔥 Bot Crashed!\n{str(e)}")
             raise e # GitHub Actions 실패 처리를 위해 raise
+        finally:
+            # 이번 실행에서 쌓인 메시지를 한 번에 전송 (최대 NOTIFY_FLUSH_TIMEOUT초 대기)
+            if not self.notifier.flush(self.NOTIFY_FLUSH_TIMEOUT):
+                self.logger.warning("Notification flush timed out.")
+
+    def close(self):
+        self.notifier.close(self.NOTIFY_FLUSH_TIMEOUT)
+        if isinstance(self.broker, KisBroker):
+            self.broker.close()
+        if isinstance(self.repo, SqliteRepository):
+            self.repo.close()  # WAL 내용을 DB 파일에 반영
+        self.logger.close()  # 백그라운드 로그 스레드에 남은 기록 모두 쓰기
 
 if __name__ == "__main__":
     bot = TradingBot()
-    bot.run()
\ No newline at end of file
+    try:
+        bot.run()
+    finally:
+        bot.close()
@@ -4,14 +4,15 @@ import numpy as np
 from src.core.models import MarketData
 
 class IndicatorCalculator:
+    # 지표 계산에 사용하는 컬럼 (백테스트 데이터 로딩 시 이 컬럼만 유지)
+    REQUIRED_FIELDS = ('Close',)
+
     def calculate(self, df: pd.DataFrame, vix_now: float) -> MarketData:
         """
         OHLCV 데이터프레임(1년치 이상)을 받아 오늘의 MarketData 스냅샷 생성
         df columns: ['Open', 'High', 'Low', 'Close', 'Volume'] (MultiIndex일 경우 처리 필요)
         """
-        # [수정] 결측치 전처리 (ffill -> bfill)
-        # 중간에 빈 데이터가 있으면 직전 값으로 채워서 계산 연속성 보장
-        df = df.ffill().bfill()
+        # 결측치 정제는 로드 시점에 1회 수행 (src/utils/cleaner.py 참고)
         # 물리적으로 253개가 안 되면 12개월 모멘텀 계산 불가
         min_required = 253
         
@@ -26,6 +27,11 @@ class IndicatorCalculator:
             close = df.xs('Close', axis=1, level=0).iloc[:, 0]
         else:
             close = df['Close']
+
+        # 정제되지 않은 데이터 방어: 종가 시리즈만 직전 값으로 채움
+        # (bfill은 미래 값이 과거로 새어 들어가므로 사용하지 않음)
+        if close.isna().any():
+            close = close.ffill()
             
         # 2. 오늘 날짜 및 가격
         today_date = close.index[-1].strftime("%Y-%m-%d")
@@ -0,0 +1,113 @@
+# src/utils/cleaner.py
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+PRICE_FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+
+@dataclass
+class CleaningReport:
+    """정제 결과 리포트 (로드 시점에 1회 생성)"""
+    rows_before: int = 0
+    rows_after: int = 0
+    dropped_rows: int = 0                                         # 전 종목 NaN인 날짜 (휴장일 등)
+    dropped_columns: List[str] = field(default_factory=list)      # 전체가 NaN인 컬럼
+    filled_cells: Dict[str, int] = field(default_factory=dict)    # {ticker: ffill로 채운 종가 개수}
+    zero_prices: Dict[str, int] = field(default_factory=dict)     # {ticker: 0 이하 가격 개수 (NaN 처리됨)}
+    stale_days: Dict[str, int] = field(default_factory=dict)      # {ticker: 가격 변동 없는 연속 구간의 일수}
+    outlier_jumps: Dict[str, List[str]] = field(default_factory=dict) # {ticker: [급등락 날짜]}
+
+    def summary(self) -> str:
+        return (f"rows {self.rows_before} -> {self.rows_after} (dropped {self.dropped_rows}), "
+                f"dropped cols {self.dropped_columns}, filled {sum(self.filled_cells.values())}, "
+                f"zero {sum(self.zero_prices.values())}, stale {sum(self.stale_days.values())}, "
+                f"jumps {sum(len(v) for v in self.outlier_jumps.values())}")
+
+class DataCleaner:
+    """
+    과거 시세 데이터 1회성 정제기
+    - 데이터 로드 직후 전체 기간에 대해 한 번만 실행 (매 시뮬레이션 날짜마다 반복하지 않음)
+    - ffill만 사용 (bfill은 미래 데이터가 과거 행으로 새어 들어가므로 사용하지 않음)
+    """
+    def __init__(self, ffill_limit: int = 5, stale_window: int = 5, jump_threshold: float = 0.25):
+        self.ffill_limit = ffill_limit        # 연속 결측 최대 보간 일수
+        self.stale_window = stale_window      # 이 일수 이상 가격이 동일하면 stale로 표시
+        self.jump_threshold = jump_threshold  # 일간 변동률 절대값이 이 이상이면 이상치로 표시
+
+    def clean(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, CleaningReport]:
+        report = CleaningReport(rows_before=len(df))
+
+        # 1. 캘린더 정렬 (정렬 + 중복 날짜 제거 + 전 종목이 비어있는 날짜 제거)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        all_nan_rows = df.isna().all(axis=1)
+        report.dropped_rows = int(all_nan_rows.sum())
+        df = df[~all_nan_rows]
+
+        # 2. 전체가 NaN인 컬럼 제거 (상장 전/데이터 없는 종목)
+        all_nan_cols = df.columns[df.isna().all(axis=0)]
+        report.dropped_columns = [self._col_name(c) for c in all_nan_cols]
+        df = df.drop(columns=all_nan_cols)
+
+        # 3. 0 이하 가격은 결측으로 간주 (Volume은 제외)
+        price_cols = [c for c in df.columns if self._field(c) in PRICE_FIELDS]
+        prices = df[price_cols]
+        non_positive = prices <= 0
+        df[price_cols] = prices.mask(non_positive)
+
+        close_cols = [c for c in price_cols if self._field(c) == 'Close']
+        report.zero_prices = self._count_by_ticker(non_positive[close_cols])
+
+        # 4. 가격 정체 플래그는 보간 전 원본으로 계산 (ffill로 채운 칸은 '동일가'로 세지 않음)
+        raw_close = df[close_cols]
+        unchanged = raw_close.diff().eq(0)
+        run_len = self._run_length(unchanged)
+        report.stale_days = self._count_by_ticker(run_len >= self.stale_window)
+
+        # 5. 제한된 forward-fill (긴 공백은 채우지 않고 NaN으로 남김)
+        missing_before = raw_close.isna()
+        df = df.ffill(limit=self.ffill_limit)
+        report.filled_cells = self._count_by_ticker(missing_before & df[close_cols].notna())
+
+        # 6. 급등락 플래그 (데이터는 수정하지 않고 리포트만)
+        close = df[close_cols]
+
+        jumps = close.pct_change(fill_method=None).abs() > self.jump_threshold
+        report.outlier_jumps = {
+            self._ticker(c): [d.strftime("%Y-%m-%d") for d in close.index[jumps[c].to_numpy()]]
+            for c in close_cols if jumps[c].any()
+        }
+
+        report.rows_after = len(df)
+        return df, report
+
+    def align(self, other: pd.DataFrame, index: pd.Index) -> pd.DataFrame:
+        """보조 시계열(VIX 등)을 주 캘린더에 맞춤 (직전 값 사용, 미래 값 사용 안 함)"""
+        other = other[~other.index.duplicated(keep='last')].sort_index()
+        return other.reindex(other.index.union(index)).ffill().reindex(index)
+
+    @staticmethod
+    def _run_length(unchanged: pd.DataFrame) -> pd.DataFrame:
+        # 각 컬럼별로 '변화 없음'이 연속된 일수 (벡터화: 변화 발생 시점의 누적값을 빼서 0으로 리셋)
+        values = unchanged.to_numpy(dtype=np.int64)
+        cum = values.cumsum(axis=0)
+        reset = np.where(values == 0, cum, 0)
+        reset = np.maximum.accumulate(reset, axis=0)
+        return pd.DataFrame(cum - reset, index=unchanged.index, columns=unchanged.columns)
+
+    def _count_by_ticker(self, mask: pd.DataFrame) -> Dict[str, int]:
+        counts = mask.sum(axis=0)
+        return {self._ticker(c): int(n) for c, n in counts.items() if n > 0}
+
+    @staticmethod
+    def _field(col) -> str:
+        # MultiIndex: (Price, Ticker) / 단일 컬럼: Price
+        return col[0] if isinstance(col, tuple) else col
+
+    @staticmethod
+    def _ticker(col) -> str:
+        return col[1] if isinstance(col, tuple) else col
+
+    @staticmethod
+    def _col_name(col) -> str:
+        return "/".join(col) if isinstance(col, tuple) else str(col)
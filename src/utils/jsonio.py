@@ -0,0 +1,72 @@
+# src/utils/jsonio.py
+import gzip
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson  # 선택 의존성: 설치되어 있으면 직렬화가 수 배 빠름
+except ImportError:
+    orjson = None
+
+# 필드별 소수점 자리수 (compact 모드). 목록에 없는 실수 필드는 DEFAULT_DIGITS 적용
+FIELD_PRECISION: Dict[str, int] = {
+    # 금액 ($)
+    "total_value": 2, "cash_balance": 2, "portfolio_value": 2, "total_trade_amount": 2,
+    "value": 2, "start": 2, "end": 2, "peak": 2, "fee": 2,
+    # 가격
+    "spy_price": 2, "spy_ma180": 2, "price": 4,
+    # 비율/지표
+    "spy_volatility": 4, "spy_momentum": 4, "mdd": 4, "vix": 2,
+    "target_exposure": 4,
+}
+DEFAULT_DIGITS = 6
+
+def round_floats(obj, precision: Optional[Dict[str, int]] = None, digits: int = DEFAULT_DIGITS, key: str = ""):
+    """중첩된 dict/list의 실수를 필드별 자리수로 반올림 (리스트 원소는 상위 키 기준)"""
+    if isinstance(obj, float):
+        return round(obj, (precision or FIELD_PRECISION).get(key, digits))
+    if isinstance(obj, dict):
+        return {k: round_floats(v, precision, digits, k) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [round_floats(v, precision, digits, key) for v in obj]
+    return obj
+
+def dumps(data, compact: bool = False, precision: Optional[Dict[str, int]] = None) -> bytes:
+    """
+    JSON 직렬화 (UTF-8 bytes)
+    - 기본: 기존 형식 그대로 (indent=4, 한글 유지)
+    - compact: 공백 없음 + 필드별 반올림, orjson이 있으면 orjson 사용
+    """
+    if not compact:
+        return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+    data = round_floats(data, precision)
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def write_json(path: str, data, compact: bool = False, gzip_copy: bool = False,
+               atomic: bool = True, precision: Optional[Dict[str, int]] = None):
+    """
+    JSON 파일 저장
+    - atomic: 임시 파일에 쓴 뒤 교체 (쓰는 도중 실패해도 기존 파일 유지)
+    - gzip_copy: 정적 호스팅용 .gz 사본도 함께 저장 (mtime 고정 -> 내용이 같으면 바이트도 같음)
+    """
+    for target, payload in encode_files(path, data, compact, gzip_copy, precision):
+        _write_bytes(target, payload, atomic)
+
+def encode_files(path: str, data, compact: bool = False, gzip_copy: bool = False,
+                 precision: Optional[Dict[str, int]] = None) -> List[Tuple[str, bytes]]:
+    """write_json이 쓸 [(경로, 내용)] 목록 (일괄 커밋 등 쓰기를 미룰 때 사용)"""
+    payload = dumps(data, compact, precision)
+    files = [(path, payload)]
+    if gzip_copy:
+        files.append((f"{path}.gz", gzip.compress(payload, compresslevel=9, mtime=0)))
+    return files
+
+def _write_bytes(path: str, payload: bytes, atomic: bool):
+    target = f"{path}.tmp" if atomic else path
+    with open(target, 'wb') as f:
+        f.write(payload)
+    if atomic:
+        os.replace(target, path)
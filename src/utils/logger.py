@@ -1,34 +1,169 @@
 # src/utils/logger.py
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+# 구조화 로그(JSON Lines)에 남기는 추가 필드 (info(..., ticker="SPY") 처럼 키워드로 전달)
+STRUCTURED_FIELDS = ("step", "ticker", "latency", "order_id")
+
+class JsonLineFormatter(logging.Formatter):
+    """로그 1건 = JSON 1줄 (ts, level, msg + 지정된 구조화 필드만)"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _DeferredQueueHandler(QueueHandler):
+    """레코드를 포맷하지 않고 그대로 큐에 넣음 (같은 프로세스 내 큐라 직렬화 불필요)"""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class _FormattingQueueListener(QueueListener):
+    """리스너 스레드에서 메시지를 1번만 만들어 파일/콘솔 핸들러가 공유"""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 호출 스레드의 다른 핸들러가 같은 레코드를 읽을 수 있으므로 복사본을 수정
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+# logging.getLogger("SolidQuant")는 프로세스 전역이므로 리스너(백그라운드 스레드)도 전역으로 1개만 유지
+_listener: Optional[QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+def _flush_handlers(handlers, close: bool = False):
+    for handler in handlers:
+        try:
+            handler.close() if close else handler.flush()
+        except (OSError, ValueError):
+            pass  # 콘솔 스트림이 이미 닫힌 경우 (테스트 캡처 종료 등)
+
+def _stop_listener(close_handlers: bool = False):
+    """대기 중인 로그를 모두 쓰고 백그라운드 스레드 종료"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        _flush_handlers(listener.handlers, close=close_handlers)
+
+atexit.register(_stop_listener)
 
 class TradeLogger:
-    def __init__(self, log_dir: str = "logs"):
+    """
+    매매 봇 로거
+    - 호출 스레드는 큐에 넣기만 하고, 파일/콘솔 쓰기는 백그라운드 스레드(QueueListener)가 담당
+    - 지연 포맷팅: info("Price=%s", price) 형태로 넘기면 꺼진 레벨은 문자열을 만들지 않음
+      (켜진 레벨도 호출 스레드에서는 포맷하지 않고, 리스너 스레드에서 1번만 포맷)
+    - structured=True: 파일을 JSON Lines(YYYY-MM-DD.jsonl)로 기록 (step/ticker/latency/order_id 필드)
+      필드는 키워드(ticker="SPY") 또는 logging 호환 extra={"ticker": "SPY"}로 전달
+    """
+    def __init__(self, log_dir: str = "logs", structured: bool = False, level: int = logging.INFO):
+        global _listener, _queue
         os.makedirs(log_dir, exist_ok=True)
-        self.log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y-%m-%d')}.log")
-        
+        ext = "jsonl" if structured else "log"
+        self.log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y-%m-%d')}.{ext}")
+
         self.logger = logging.getLogger("SolidQuant")
-        self.logger.setLevel(logging.INFO)
-        
-        # 중복 핸들러 방지
-        if not self.logger.handlers:
+        self.logger.setLevel(level)
+        # 출력은 아래 핸들러로만 (root 핸들러로 전파되어 같은 레코드를 다시 포맷/출력하지 않도록)
+        self.logger.propagate = False
+
+        # 중복 핸들러 방지 (외부에서 붙인 핸들러는 무시하고 이 클래스가 붙인 핸들러만 확인)
+        if not any(getattr(h, "_trade_logger", False) for h in self.logger.handlers):
             # 1. 파일 핸들러
             fh = logging.FileHandler(self.log_file, encoding='utf-8')
-            fh.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-            self.logger.addHandler(fh)
-            
+            if structured:
+                fh.setFormatter(JsonLineFormatter())
+            else:
+                fh.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+
             # 2. 콘솔 핸들러 (GitHub Actions 로그용)
             ch = logging.StreamHandler()
             ch.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
-            self.logger.addHandler(ch)
 
-    def info(self, msg: Any):
-        self.logger.info(f"{msg}")
+            # 3. 로거에는 큐 핸들러만 연결, 실제 쓰기는 리스너 스레드에서
+            _stop_listener(close_handlers=True)  # 핸들러가 초기화된 경우 이전 리스너 정리
+            _queue = queue.Queue()
+            qh = _DeferredQueueHandler(_queue)
+            for handler in (qh, fh, ch):
+                handler._trade_logger = True
+            self.logger.addHandler(qh)
+            _listener = _FormattingQueueListener(_queue, fh, ch, respect_handler_level=True)
+            _listener.start()
+
+    # ------------------------------------------
+    # 기록
+    # ------------------------------------------
+    def debug(self, msg: Any, *args, **fields):
+        self._log(logging.DEBUG, msg, args, fields)
+
+    def info(self, msg: Any, *args, **fields):
+        self._log(logging.INFO, msg, args, fields)
+
+    def warning(self, msg: Any, *args, **fields):
+        self._log(logging.WARNING, msg, args, fields)
+
+    def error(self, msg: Any, *args, **fields):
+        self._log(logging.ERROR, msg, args, fields)
+
+    def is_enabled(self, level: int) -> bool:
+        """비용이 큰 로그 메시지를 만들기 전에 확인용"""
+        return self.logger.isEnabledFor(level)
+
+    @contextmanager
+    def timed(self, step: str, **fields):
+        """블록 실행 시간을 latency(ms) 필드와 함께 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            latency = round((time.perf_counter() - start) * 1000, 1)
+            self.info("[%s] done in %.1f ms", step, latency, step=step, latency=latency, **fields)
+
+    # ------------------------------------------
+    # 종료
+    # ------------------------------------------
+    def flush(self):
+        """큐에 쌓인 로그가 모두 기록될 때까지 대기"""
+        if _listener is None or _queue is None:
+            return
+        _queue.join()
+        _flush_handlers(_listener.handlers)
 
-    def warning(self, msg: Any):
-        self.logger.warning(f"{msg}")
+    def close(self):
+        """
+        리스너 종료 (남은 로그 모두 기록)
+        이후 기록은 파일/콘솔 핸들러에 직접(동기) 쓰도록 전환해 유실 없음
+        """
+        if _listener is None:
+            return
+        handlers = _listener.handlers
+        _stop_listener()
+        for handler in list(self.logger.handlers):
+            if isinstance(handler, QueueHandler):
+                self.logger.removeHandler(handler)
+        for handler in handlers:
+            self.logger.addHandler(handler)
 
-    def error(self, msg: Any):
-        self.logger.error(f"{msg}")
\ No newline at end of file
+    def _log(self, level: int, msg: Any, args: tuple, fields: dict):
+        # 꺼진 레벨은 여기서 바로 반환 (메시지 포맷팅/레코드 생성 없음)
+        if not self.logger.isEnabledFor(level):
+            return
+        fields.update(fields.pop("extra", None) or {})
+        extra = {k: v for k, v in fields.items() if k in STRUCTURED_FIELDS}
+        self.logger.log(level, msg, *args, extra=extra or None)
@@ -0,0 +1,57 @@
+# src/utils/ratelimit.py
+import threading
+import time
+from typing import Callable, Optional
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷 (초당 호출 수 제한)
+    - 한도 이내면 대기 없이 통과, 한도를 넘는 순간에만 필요한 만큼 대기
+    - 서버가 제한 초과(Throttling)를 알려오면 penalize()로 속도를 절반으로 낮추고,
+      이후 성공할 때마다 reward()로 원래 속도까지 천천히 회복 (AIMD)
+    """
+    def __init__(self,
+                 rate: float,
+                 capacity: Optional[float] = None,
+                 min_rate: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 4
+        self.capacity = float(capacity) if capacity else max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰 확보 (부족하면 대기). 실제 대기한 시간(초) 반환"""
+        with self._lock:
+            self._refill()
+            # 토큰을 먼저 예약(음수 허용)하고 락 밖에서 대기 -> 동시 호출자도 순서대로 간격 유지
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def penalize(self):
+        """제한 초과 응답 수신 시: 속도 절반 + 버킷 비움"""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def reward(self):
+        """성공 응답 수신 시: 최대 속도까지 조금씩 회복"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
@@ -64,4 +64,17 @@ def test_broker_price_injection():
     assert exec_price == pytest.approx(202.0) 
     
     # 잔고 차감 확인: 10000 - (202 * 10 + 수수료)
-    assert broker.get_portfolio().total_cash < 8000.0
\ No newline at end of file
+    assert broker.get_portfolio().total_cash < 8000.0
+
+def test_loader_float32_storage(mock_full_data):
+    """
+    [Loader] dtype 지정 시 float32로 저장되어도 슬라이싱 결과가 동일한지 확인
+    """
+    full_df, full_vix = mock_full_data
+    loader = BacktestDataLoader(full_df, full_vix, dtype='float32')
+
+    assert (loader.full_df.dtypes == np.float32).all()
+
+    loader.set_date(pd.Timestamp("2024-01-05"))
+    df = loader.fetch_ohlcv(["SPY"], days=3)
+    assert df['Close'].iloc[-1] == pytest.approx(140.0)
@@ -0,0 +1,63 @@
+# tests/test_backtest_fetcher.py
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.backtest.fetcher import compact_price_frame, compact_vix_frame, download_historical_data
+
+@pytest.fixture
+def yf_ohlcv():
+    """yfinance 다종목 다운로드 결과 흉내 (Price, Ticker) MultiIndex"""
+    dates = pd.date_range(start="2024-01-01", periods=5)
+    columns = pd.MultiIndex.from_product([['Close', 'High', 'Low', 'Open', 'Volume'], ['IEF', 'SPY', 'SSO']])
+    values = np.arange(5 * len(columns), dtype=np.float64).reshape(5, -1)
+    return pd.DataFrame(values, index=dates, columns=columns)
+
+def test_compact_keeps_only_strategy_columns(yf_ohlcv):
+    """[컬럼] 전 종목 Close + SPY 지표 컬럼만 남아야 함"""
+    df = compact_price_frame(yf_ohlcv, ['SSO', 'IEF'])
+
+    assert list(df.columns) == [('Close', 'SSO'), ('Close', 'IEF'), ('Close', 'SPY')]
+    pd.testing.assert_series_equal(df[('Close', 'SPY')], yf_ohlcv[('Close', 'SPY')])
+    # 기존 접근 방식 호환 (full_df['Close'], xs)
+    assert list(df['Close'].columns) == ['SSO', 'IEF', 'SPY']
+    assert list(df.xs('SPY', axis=1, level=1).columns) == ['Close']
+
+def test_compact_float32_contiguous_block(yf_ohlcv):
+    """[메모리] float32 지정 시 하나의 연속된 2D 블록으로 저장"""
+    df = compact_price_frame(yf_ohlcv, ['SSO', 'IEF'], dtype='float32')
+
+    assert (df.dtypes == np.float32).all()
+    values = df.to_numpy()
+    assert values.flags['C_CONTIGUOUS']
+    assert df.memory_usage(index=False).sum() < yf_ohlcv.memory_usage(index=False).sum() / 5
+
+def test_compact_single_ticker_frame_passthrough():
+    """[구조] 단일 인덱스 프레임은 구조를 유지하고 타입만 변환"""
+    df = pd.DataFrame({'Close': [1.0, 2.0]})
+    out = compact_price_frame(df, dtype='float32')
+    assert list(out.columns) == ['Close']
+    assert out['Close'].dtype == np.float32
+
+def test_compact_vix_frame_flattens_multiindex():
+    """[VIX] MultiIndex VIX 결과도 단일 'Close' 컬럼으로 정리"""
+    columns = pd.MultiIndex.from_product([['Close', 'Open'], ['^VIX']])
+    vix = pd.DataFrame([[15.0, 14.0], [16.0, 15.0]], columns=columns)
+
+    out = compact_vix_frame(vix)
+    assert list(out.columns) == ['Close']
+    assert out['Close'].iloc[-1] == 16.0
+
+@patch("src.backtest.fetcher.yf.download")
+def test_download_includes_indicator_ticker(mock_download, yf_ohlcv):
+    """[다운로드] 지표 계산용 SPY가 자산 목록에 없어도 함께 다운로드"""
+    vix = pd.DataFrame({'Close': [15.0] * 5}, index=yf_ohlcv.index)
+    mock_download.side_effect = [yf_ohlcv, vix]
+
+    df, out_vix = download_historical_data(['SSO', 'IEF'], "2024-01-01", "2024-01-06")
+
+    args, _ = mock_download.call_args_list[0]
+    assert args[0] == ['SSO', 'IEF', 'SPY']
+    assert ('Close', 'SPY') in df.columns
+    assert ('Volume', 'SSO') not in df.columns
+    assert list(out_vix.columns) == ['Close']
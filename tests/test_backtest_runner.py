@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 from unittest.mock import patch, MagicMock
 from src.backtest.runner import run_backtest
+from src.backtest.components import BacktestBroker
 
 
 @pytest.fixture
@@ -45,4 +46,31 @@ def test_run_backtest_flow(mock_show, mock_download, mock_fetcher_return):
     mock_show.assert_called_once()
     
     # 로그 등을 통해 루프가 돌았는지 간접 확인할 수 있지만,
-    # 에러 없이 여기까지 왔다면 로직 흐름은 정상임.
\ No newline at end of file
+    # 에러 없이 여기까지 왔다면 로직 흐름은 정상임.
+
+
+@patch("src.backtest.runner.download_historical_data")
+@patch("src.backtest.runner.plt.show")
+def test_run_backtest_excludes_indicator_ticker_from_prices(mock_show, mock_download):
+    """
+    [Runner] 지표 계산용으로 받은 SPY는 브로커 가격에 들어가지 않음 (매매 대상 아님)
+    """
+    dates = pd.date_range(start="2022-01-01", end="2023-02-15")
+    prices = np.column_stack([np.linspace(100, 200, len(dates)), np.linspace(50, 60, len(dates))])
+    columns = pd.MultiIndex.from_product([['Close'], ['SPY', 'SSO']])
+    df = pd.DataFrame(prices, index=dates, columns=columns)
+    vix = pd.DataFrame({'Close': [15.0] * len(dates)}, index=dates)
+    mock_download.return_value = (df, vix)
+
+    injected = []
+    original = BacktestBroker.set_prices
+
+    def spy_set_prices(self, prices):
+        injected.append(dict(prices))
+        original(self, prices)
+
+    with patch.object(BacktestBroker, "set_prices", spy_set_prices):
+        run_backtest(start_date="2023-01-02", end_date="2023-01-05", initial_cash=10000.0)
+
+    assert injected
+    assert all(set(p) == {'SSO'} for p in injected)
@@ -0,0 +1,52 @@
+# tests/test_bench_broker_bench.py
+import pytest
+from unittest.mock import MagicMock
+from src.bench.broker_bench import bench_execute_orders, default_scenario
+from src.bench.fake_kis import FakeKisServer
+from src.infra.broker import KisBroker
+from src.core.models import Order
+from src.utils.ratelimit import TokenBucket
+
+@pytest.fixture
+def scenario():
+    return default_scenario()
+
+def test_bench_reports_wall_time_and_call_counts(scenario):
+    """[벤치마크] 실행 시간과 엔드포인트별 호출 수를 기록"""
+    prices, holdings, orders = scenario
+    res = bench_execute_orders("test", orders, prices, holdings, repeat=2, poll_interval=0.05)
+
+    assert len(res.wall_times) == 2
+    assert res.filled == len(orders)
+    assert res.calls["/uapi/overseas-stock/v1/trading/order"] == len(orders)
+    assert res.calls["/uapi/hashkey"] == len(orders)
+    assert "median" in res.summary()
+
+def test_bench_rejected_orders_not_filled(scenario):
+    """[벤치마크] 거부 종목은 체결 건수에서 제외"""
+    prices, holdings, orders = scenario
+    res = bench_execute_orders("rejects", orders, prices, holdings, repeat=1, poll_interval=0.05,
+                               reject_tickers={"PDBC"})
+    assert res.filled == len(orders) - 1
+
+def test_fake_throttle_slows_broker_down():
+    """[호출 제한] 서버가 EGW00201을 돌려주면 브로커가 호출 속도를 낮춤"""
+    server = FakeKisServer({"SSO": 50.0}, holdings={"SSO": 10}, max_rps=10)
+    try:
+        broker = KisBroker("k", "s", "1234567801", MagicMock(), base_url=server.url, rate_limiter=TokenBucket(20))
+        executions = broker._submit_orders([Order("SSO", "SELL", 1, 50.0) for _ in range(6)])
+
+        assert executions
+        assert server.throttled > 0
+        assert broker.rate_limiter.rate < 20
+    finally:
+        server.close()
+
+def test_pending_check_failure_is_not_treated_as_filled():
+    """[미체결] 미체결 조회 실패는 체결 완료가 아니라 미체결로 간주"""
+    session = MagicMock()
+    session.request.return_value.json.return_value = {"access_token": "TOKEN"}
+    broker = KisBroker("k", "s", "1234567801", MagicMock(), session=session, rate_limiter=TokenBucket(1000))
+    broker._get_pending_orders = MagicMock(side_effect=Exception("throttled"))
+
+    assert broker._get_pending_orders_count() == 1
@@ -0,0 +1,17 @@
+# tests/test_bench_repo_bench.py
+from src.bench.repo_bench import bench_formats, sample_summary
+
+def test_bench_compact_is_smaller():
+    """[벤치마크] compact 형식이 기존(pretty)보다 작고, 결과 요약 출력 가능"""
+    results = bench_formats(days=200, repeat=1)
+    pretty, compact = results[0], results[1]
+
+    assert compact.size < pretty.size * 0.7
+    assert compact.gzip_size < compact.size
+    assert "KB" in compact.summary(pretty)
+
+def test_sample_summary_shape():
+    """[벤치마크] 합성 데이터는 save_daily_summary 레코드와 같은 필드"""
+    rows = sample_summary(3)
+    assert len(rows) == 3
+    assert {"date", "total_value", "spy_price", "regime", "target_exposure"} <= set(rows[0])
@@ -61,4 +61,13 @@ def test_config_ticker_duplication():
         all_tickers.extend(tickers)
         
     # 중복 확인
-    assert len(all_tickers) == len(set(all_tickers)), "Duplicate tickers found in ASSET_GROUPS!"
\ No newline at end of file
+    assert len(all_tickers) == len(set(all_tickers)), "Duplicate tickers found in ASSET_GROUPS!"
+def test_ledger_path_split_by_mode():
+    """[설정] 모의/실전 원장은 서로 다른 경로를 기본값으로 사용"""
+    with patch.dict(os.environ, {"IS_LIVE_TRADING": "False"}, clear=True):
+        paper = Config().LEDGER_PATH
+    with patch.dict(os.environ, {"IS_LIVE_TRADING": "True"}, clear=True):
+        live = Config().LEDGER_PATH
+    assert paper != live
+    with patch.dict(os.environ, {"IS_LIVE_TRADING": "True", "LEDGER_PATH": "/tmp/custom"}, clear=True):
+        assert Config().LEDGER_PATH == "/tmp/custom"
@@ -1,6 +1,12 @@
+import json
+import time
 import pytest
-from src.infra.broker import MockBroker
+import requests
+from unittest.mock import MagicMock, patch
+from src.infra.broker import MockBroker, KisBroker, ExecutionPolicy
 from src.core.models import Order
+from src.utils.ratelimit import TokenBucket
+from src.bench.fake_kis import FakeKisServer
 
 def test_mock_broker_initialization():
     # 1. 초기 상태 확인
@@ -109,6 +115,15 @@ def test_mock_broker_insufficient_funds():
     assert pf.total_cash == 100.0 # 현금 그대로
     assert pf.holdings.get('SPY', 0) == 0
 
+def test_mock_broker_logs_through_logger(capsys):
+    """logger 지정 시 print 대신 로거로 기록 (부족 수량 조정은 warning)"""
+    logger = MagicMock()
+    broker = MockBroker(initial_cash=100.0, holdings={'SPY': 1}, logger=logger)
+    broker.execute_orders([Order('SPY', 'SELL', 1, 100.0), Order('QQQ', 'BUY', 10, 100.0)])
+
+    assert capsys.readouterr().out == ""
+    logger.info.assert_any_call(" > [FILLED] SELL SPY: 1 @ $99.00 (Fee: $0.10)", extra={'ticker': 'SPY'})
+    assert logger.warning.call_args.kwargs == {'extra': {'ticker': 'QQQ'}}
 
 
 def test_mock_broker_cash_recycling_logic():
@@ -141,4 +156,527 @@ def test_mock_broker_cash_recycling_logic():
     
     # 현금 흐름: 0 -> +1000(매도) -> -1000(매수) -> 0 (수수료/슬리피지 제외 시)
     # 실제로는 MockBroker 수수료 로직 때문에 약간 차감됨, 대략 0 근처인지 확인
-    assert pf.total_cash < 100.0 # 잔돈만 남아야 함
\ No newline at end of file
+    assert pf.total_cash < 100.0 # 잔돈만 남아야 함
+
+
+# ==========================================
+# KisBroker (HTTP 세션 Mock)
+# ==========================================
+def _response(payload: dict, headers: dict = None):
+    res = MagicMock()
+    res.json.return_value = payload
+    res.headers = headers or {}
+    return res
+
+@pytest.fixture
+def kis_session():
+    """requests.Session 대체 (토큰 발급 응답 기본 설정)"""
+    session = MagicMock()
+    session.request.return_value = _response({"access_token": "TOKEN"})
+    return session
+
+@pytest.fixture
+def kis_broker(kis_session):
+    # 테스트에서는 호출 제한으로 인한 대기가 없도록 넉넉한 한도 사용
+    return KisBroker("app_key", "app_secret", "1234567801", MagicMock(),
+                     session=kis_session, rate_limiter=TokenBucket(1000))
+
+def test_kis_broker_uses_shared_session_with_timeout(kis_broker, kis_session):
+    """[세션] 모든 호출이 하나의 세션을 거치고 타임아웃이 지정되는지 확인"""
+    kis_session.request.return_value = _response({"rt_cd": "0", "output": {"last": "101.5"}})
+
+    prices = kis_broker.fetch_current_prices(["SPY", "IEF"])
+
+    assert prices == {"SPY": 101.5, "IEF": 101.5}
+    # 토큰 발급 1회 + 시세 2회 = 3회 모두 같은 세션
+    assert kis_session.request.call_count == 3
+    for call in kis_session.request.call_args_list:
+        assert call.kwargs["timeout"] == (KisBroker.CONNECT_TIMEOUT, KisBroker.READ_TIMEOUT)
+
+def test_kis_broker_session_retry_policy():
+    """[세션] 조회(GET)만 응답 오류 재시도, 주문(POST)은 재시도 대상이 아님"""
+    session = KisBroker._create_session()
+    retry = session.get_adapter("https://openapi.koreainvestment.com:9443").max_retries
+
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+
+
+def test_kis_token_cache_reused_across_runs(kis_session, tmp_path):
+    """[토큰] 첫 실행에서 발급한 토큰을 다음 실행에서 재사용 (tokenP 재호출 없음)"""
+    token_path = str(tmp_path / "kis_token.json")
+    kis_session.request.return_value = _response({"access_token": "TOKEN_1", "expires_in": 86400})
+
+    first = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), session=kis_session, token_path=token_path)
+    assert first.access_token == "TOKEN_1"
+    assert kis_session.request.call_count == 1
+
+    second = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), session=kis_session, token_path=token_path)
+    assert second.access_token == "TOKEN_1"
+    assert kis_session.request.call_count == 1  # 추가 발급 없음
+
+    # 다른 앱키(또는 실전/모의 전환)는 캐시를 공유하지 않음
+    KisBroker("other_key", "app_secret", "1234567801", MagicMock(), session=kis_session, token_path=token_path)
+    assert kis_session.request.call_count == 2
+
+def test_kis_token_refreshed_before_expiry(kis_session, tmp_path):
+    """[토큰] 만료 임박 토큰은 재사용하지 않고 선제적으로 갱신"""
+    token_path = str(tmp_path / "kis_token.json")
+    kis_session.request.return_value = _response({"access_token": "SHORT", "expires_in": 60})
+    broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), session=kis_session, token_path=token_path)
+
+    kis_session.request.return_value = _response({"access_token": "FRESH", "expires_in": 86400})
+    headers = broker._get_header("TR")
+
+    assert headers["authorization"] == "Bearer FRESH"
+
+def test_kis_token_reissued_on_auth_error(kis_broker, kis_session):
+    """[토큰] API가 토큰 만료 오류를 주면 재발급 후 1회 재시도"""
+    kis_session.request.side_effect = [
+        _response({"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "기간이 만료된 token 입니다."}),
+        _response({"access_token": "NEW_TOKEN", "expires_in": 86400}),
+        _response({"rt_cd": "0", "output": {"last": "55.0"}}),
+    ]
+
+    prices = kis_broker.fetch_current_prices(["IEF"])
+
+    assert prices == {"IEF": 55.0}
+    assert kis_broker.access_token == "NEW_TOKEN"
+    retry_headers = kis_session.request.call_args.kwargs["headers"]
+    assert retry_headers["authorization"] == "Bearer NEW_TOKEN"
+
+def test_kis_throttle_error_slows_down_and_retries(kis_broker, kis_session):
+    """[호출 제한] 초당 제한 초과 응답 시 속도를 낮추고 같은 요청을 재시도"""
+    kis_session.request.side_effect = [
+        _response({"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}),
+        _response({"rt_cd": "0", "output": {"last": "42.0"}}),
+    ]
+
+    prices = kis_broker.fetch_current_prices(["GLD"])
+
+    assert prices == {"GLD": 42.0}
+    assert kis_session.request.call_count == 3  # 토큰 1 + 시세 2 (재시도)
+    assert kis_broker.rate_limiter.rate < kis_broker.rate_limiter.max_rate
+
+
+def test_kis_prices_fetched_concurrently(kis_broker, kis_session):
+    """[동시성] 종목별 시세 조회가 병렬로 실행되어 전체 시간이 1회 왕복 수준이어야 함"""
+    import time
+
+    def slow_quote(method, url, **kwargs):
+        time.sleep(0.2)  # 네트워크 왕복 흉내
+        return _response({"rt_cd": "0", "output": {"last": "10.0"}})
+
+    kis_session.request.side_effect = slow_quote
+    tickers = ["SSO", "QLD", "IEF", "GLD", "PDBC", "SHV"]
+
+    start = time.time()
+    prices = kis_broker.fetch_current_prices(tickers)
+    elapsed = time.time() - start
+
+    assert prices == {t: 10.0 for t in tickers}
+    assert elapsed < 0.2 * len(tickers) / 2
+
+def test_kis_prices_failure_returns_zero(kis_broker, kis_session):
+    """[계약] 실패한 종목은 0.0, 나머지는 정상 가격 (결과 dict 형태 유지)"""
+    def quote(method, url, **kwargs):
+        if kwargs["params"]["SYMB"] == "PDBC":
+            raise ConnectionError("reset by peer")
+        if kwargs["params"]["SYMB"] == "GLD":
+            return _response({"rt_cd": "1", "msg1": "종목코드 오류"})
+        return _response({"rt_cd": "0", "output": {"last": "20.0"}})
+
+    kis_session.request.side_effect = quote
+
+    prices = kis_broker.fetch_current_prices(["SSO", "GLD", "PDBC"])
+
+    assert prices == {"SSO": 20.0, "GLD": 0.0, "PDBC": 0.0}
+    assert list(prices) == ["SSO", "GLD", "PDBC"]
+
+def test_kis_pending_checks_only_ordered_exchanges(kis_broker, kis_session):
+    """[미체결] 주문을 낸 거래소만 조회"""
+    kis_session.request.return_value = _response({"rt_cd": "0", "output": []})
+
+    assert kis_broker._get_pending_orders_count({"AMS"}) == 0
+
+    exchanges = [c.kwargs["params"]["OVRS_EXCG_CD"] for c in kis_session.request.call_args_list[1:]]
+    assert exchanges == ["AMS"]
+
+def test_kis_pending_follows_continuation_keys(kis_broker, kis_session):
+    """[연속조회] tr_cont=M 이면 CTX_AREA 키로 다음 페이지를 이어서 조회하고 건수를 합산"""
+    pages = []
+
+    def nccs(method, url, **kwargs):
+        params = kwargs["params"]
+        pages.append((params["OVRS_EXCG_CD"], params["CTX_AREA_NK100"], kwargs["headers"].get("tr_cont")))
+        if params["OVRS_EXCG_CD"] == "NAS" and not params["CTX_AREA_NK100"]:
+            return _response({"rt_cd": "0", "output": [{}] * 15, "ctx_area_fk100": "FK", "ctx_area_nk100": "NK  "},
+                             headers={"tr_cont": "M"})
+        if params["OVRS_EXCG_CD"] == "NAS":
+            return _response({"rt_cd": "0", "output": [{}] * 3}, headers={"tr_cont": "D"})
+        return _response({"rt_cd": "0", "output": [{}]})
+
+    kis_session.request.side_effect = nccs
+
+    assert kis_broker._get_pending_orders_count(["NAS", "NYS"]) == 19
+    assert ("NAS", "NK", "N") in pages
+    assert len(pages) == 3
+
+def test_kis_pending_exchanges_queried_concurrently(kis_broker, kis_session):
+    """[동시성] 거래소별 미체결 조회가 병렬로 실행되어야 함"""
+    import time
+
+    def slow_nccs(method, url, **kwargs):
+        time.sleep(0.2)
+        return _response({"rt_cd": "0", "output": []})
+
+    kis_session.request.side_effect = slow_nccs
+
+    start = time.time()
+    assert kis_broker._get_pending_orders_count() == 0
+    assert time.time() - start < 0.4
+
+def _balance_page(rows, cash="1000.0", **extra):
+    output1 = [{"ovrs_pdno": t, "ovrs_cblc_qty": str(q), "now_pric2": str(p)} for t, q, p in rows]
+    return {"rt_cd": "0", "output1": output1, "output2": {"ovrs_ord_psbl_amt": cash}, **extra}
+
+def test_kis_portfolio_merges_all_exchanges(kis_broker, kis_session):
+    """[잔고] NAS/NYS/AMS 잔고를 모두 조회해 하나의 Portfolio로 병합 (AMS 상장 SSO 누락 방지)"""
+    def balance(method, url, **kwargs):
+        exch = kwargs["params"]["OVRS_EXCG_CD"]
+        if exch == "AMS" and not kwargs["params"]["CTX_AREA_NK100"]:
+            return _response(_balance_page([("SSO", 10, 50.0)], ctx_area_fk100="FK", ctx_area_nk100="NK"),
+                             headers={"tr_cont": "M"})
+        if exch == "AMS":
+            return _response(_balance_page([("QLD", 3, 80.0), ("SPY", 0, 500.0)]))
+        if exch == "NAS":
+            return _response(_balance_page([("IEF", 5, 95.0)]))
+        return _response(_balance_page([("GLD", 2, 180.0)]))
+
+    kis_session.request.side_effect = balance
+
+    pf = kis_broker.get_portfolio()
+
+    assert pf.total_cash == 1000.0
+    assert pf.holdings == {"IEF": 5, "GLD": 2, "SSO": 10, "QLD": 3}
+    assert pf.current_prices["SSO"] == 50.0
+
+def test_kis_portfolio_empty_when_any_exchange_fails(kis_broker, kis_session):
+    """[잔고] 한 거래소라도 실패하면 불완전한 잔고 대신 빈 Portfolio"""
+    def balance(method, url, **kwargs):
+        if kwargs["params"]["OVRS_EXCG_CD"] == "NYS":
+            return _response({"rt_cd": "1", "msg1": "조회 오류"})
+        return _response(_balance_page([("IEF", 5, 95.0)]))
+
+    kis_session.request.side_effect = balance
+
+    pf = kis_broker.get_portfolio()
+    assert pf.total_cash == 0
+    assert pf.holdings == {}
+
+def test_kis_portfolio_snapshot_reused_within_ttl(kis_broker, kis_session):
+    """[잔고 캐시] TTL 이내 재조회는 API 호출 없이 사본 반환"""
+    kis_session.request.return_value = _response(_balance_page([("SSO", 10, 50.0)]))
+
+    first = kis_broker.get_portfolio()
+    calls = kis_session.request.call_count
+    first.holdings["SSO"] = 0  # 반환된 사본을 수정해도 캐시는 그대로
+
+    second = kis_broker.get_portfolio()
+    assert kis_session.request.call_count == calls
+    assert second.holdings == {"SSO": 10}
+
+def test_kis_portfolio_snapshot_invalidated_by_order(kis_broker, kis_session):
+    """[잔고 캐시] 주문 접수 후에는 다시 조회"""
+    kis_session.request.return_value = _response(_balance_page([("SSO", 10, 50.0)]))
+    kis_broker.get_portfolio()
+
+    kis_session.request.return_value = _response({"rt_cd": "0", "output": {"ODNO": "0001"}, "HASH": "H"})
+    assert kis_broker._send_order(Order("SSO", "SELL", 10, 50.0)) is not None
+
+    kis_session.request.return_value = _response(_balance_page([]))
+    assert kis_broker.get_portfolio().holdings == {}
+
+def test_kis_portfolio_failure_not_cached(kis_broker, kis_session):
+    """[잔고 캐시] 조회 실패 결과는 캐시하지 않음"""
+    kis_session.request.return_value = _response({"rt_cd": "1", "msg1": "오류"})
+    assert kis_broker.get_portfolio().holdings == {}
+
+    kis_session.request.return_value = _response(_balance_page([("IEF", 5, 95.0)]))
+    assert kis_broker.get_portfolio().holdings == {"IEF": 5}
+
+def test_kis_orders_pipelined(kis_broker, kis_session):
+    """[주문] HashKey 발급과 주문 전송이 각각 병렬로 실행되고 결과는 입력 순서 유지"""
+    import time
+    sent = []
+
+    def api(method, url, **kwargs):
+        time.sleep(0.1)  # 네트워크 왕복 흉내
+        if url.endswith("/hashkey"):
+            return _response({"HASH": f"H-{kwargs['json']['PDNO']}"})
+        sent.append((kwargs["json"]["PDNO"], kwargs["headers"]["hashkey"]))
+        return _response({"rt_cd": "0", "output": {"ODNO": kwargs["json"]["PDNO"]}})
+
+    kis_session.request.side_effect = api
+    orders = [Order(t, "SELL", 1, 10.0) for t in ["SSO", "QLD", "IEF", "GLD"]]
+
+    start = time.time()
+    executions = kis_broker._submit_orders(orders)
+    elapsed = time.time() - start
+
+    assert [e.ticker for e in executions] == ["SSO", "QLD", "IEF", "GLD"]
+    assert sorted(sent) == sorted((t, f"H-{t}") for t in ["SSO", "QLD", "IEF", "GLD"])
+    assert elapsed < 0.1 * 2 * len(orders) / 2
+
+def test_kis_order_payload_built_once(kis_broker, kis_session):
+    """[주문] 요청 본문은 주문당 1번만 만들고, HashKey를 발급한 본문 그대로 전송"""
+    hashed, sent = {}, {}
+
+    def api(method, url, **kwargs):
+        body = kwargs["json"]
+        if url.endswith("/hashkey"):
+            hashed[body["PDNO"]] = body
+            return _response({"HASH": f"H-{body['PDNO']}"})
+        sent[body["PDNO"]] = body
+        return _response({"rt_cd": "0", "output": {"ODNO": body["PDNO"]}})
+
+    kis_session.request.side_effect = api
+    orders = [Order(t, "SELL", 1, 10.0) for t in ["SSO", "IEF"]]
+
+    with patch.object(kis_broker, "_order_payload", wraps=kis_broker._order_payload) as build:
+        kis_broker._submit_orders(orders)
+
+    assert build.call_count == len(orders)
+    assert all(sent[t] is hashed[t] for t in ["SSO", "IEF"])
+
+def test_kis_buy_budget_allocated_before_submission(kis_broker, kis_session):
+    """[매수] 병렬 전송 전에 남은 현금 기준으로 순서대로 수량이 확정되어야 함"""
+    def api(method, url, **kwargs):
+        if url.endswith("/hashkey"):
+            return _response({"HASH": "H"})
+        if url.endswith("/inquire-balance"):
+            return _response(_balance_page([], cash="1000.0"))
+        if url.endswith("/inquire-ccnl"):
+            return _response({"rt_cd": "0", "output": []})
+        return _response({"rt_cd": "0", "output": {"ODNO": kwargs["json"]["PDNO"]}})
+
+    kis_session.request.side_effect = api
+    orders = [Order("SSO", "BUY", 8, 100.0), Order("IEF", "BUY", 5, 100.0)]
+
+    executions = kis_broker.execute_orders(orders)
+
+    # 1000 * 0.98 / 102 = 9주 가능 -> SSO 8주 후 잔여 200 -> IEF 1주로 조정
+    assert [(e.ticker, e.quantity) for e in executions] == [("SSO", 8), ("IEF", 1)]
+
+# ==========================================
+# 미체결 재호가 (로컬 KIS 스탠드인 서버)
+# ==========================================
+@pytest.fixture
+def make_fake_kis():
+    servers = []
+
+    def _make(**kwargs):
+        server = FakeKisServer(**kwargs)
+        servers.append(server)
+        return server
+
+    yield _make
+    for server in servers:
+        server.close()
+
+def _fake_broker(server, policy=None):
+    broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), base_url=server.url,
+                       rate_limiter=TokenBucket(1000), execution_policy=policy)
+    broker.POLL_INTERVAL = 0.05
+    return broker
+
+def test_execution_policy_price_within_slippage_bound():
+    """[정책] 재호가 가격은 횟수에 따라 공격적으로, 단 최대 슬리피지 한도 안쪽"""
+    policy = ExecutionPolicy(step=0.005, max_slippage=0.01)
+    assert policy.price_for("SELL", 50.0, 1) == 49.75
+    assert policy.price_for("SELL", 50.0, 5) == 49.5
+    assert policy.price_for("BUY", 50.0, 1) == 50.25
+    assert policy.price_for("BUY", 33.33, 9) <= 33.33 * 1.01
+
+def test_kis_unfilled_sell_repriced_until_filled(make_fake_kis):
+    """[재호가] 호가에 닿지 않은 매도 지정가는 정정되어 체결되고, 매수는 매도 대금으로 진행"""
+    server = make_fake_kis(prices={"SSO": 50.0, "IEF": 100.0}, spread=0.02, holdings={"SSO": 10}, cash=0.0)
+    broker = _fake_broker(server, ExecutionPolicy(reprice_interval=0.2, step=0.005, max_slippage=0.02))
+
+    start = time.time()
+    executions = broker.execute_orders([Order("SSO", "SELL", 10, 50.0), Order("IEF", "BUY", 4, 100.0)])
+    elapsed = time.time() - start
+
+    sell = executions[0]
+    assert sell.price == 49.5  # bid(49.5)까지 두 번 정정
+    assert server.holdings["SSO"] == 0
+    assert ("POST", "/uapi/overseas-stock/v1/trading/order-rvsecncl") in server.calls
+    # 매도 대금(495) 기준 매수: 495 * 0.98 / 102 = 4주
+    assert [(e.ticker, e.quantity) for e in executions[1:]] == [("IEF", 4)]
+    assert elapsed < 10
+
+def test_kis_orders_work_with_stdlib_logger(make_fake_kis):
+    """[로거] 표준 logging.Logger를 넘겨도 주문 접수/정정이 누락되지 않음 (구조화 필드는 extra로 전달)"""
+    import logging
+
+    class Records(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    std_logger = logging.getLogger("test.kis")
+    std_logger.setLevel(logging.INFO)
+    captured = Records()
+    std_logger.addHandler(captured)
+    server = make_fake_kis(prices={"SSO": 50.0, "IEF": 100.0}, spread=0.02, holdings={"SSO": 10}, cash=0.0)
+    broker = KisBroker("app_key", "app_secret", "1234567801", std_logger, base_url=server.url,
+                       rate_limiter=TokenBucket(1000),
+                       execution_policy=ExecutionPolicy(reprice_interval=0.2, step=0.005, max_slippage=0.02))
+    broker.POLL_INTERVAL = 0.05
+
+    try:
+        executions = broker.execute_orders([Order("SSO", "SELL", 10, 50.0), Order("IEF", "BUY", 4, 100.0)])
+    finally:
+        std_logger.removeHandler(captured)
+
+    assert [(e.ticker, e.status) for e in executions] == [("SSO", "FILLED"), ("IEF", "FILLED")]
+    assert executions[0].price == 49.5  # 정정 후 체결가 반영
+    sent = [r for r in captured.records if "Order Sent" in r.getMessage()]
+    assert [r.ticker for r in sent] == ["SSO", "IEF"]
+    repriced = [r for r in captured.records if "Repriced" in r.getMessage() and r.ticker == "SSO"]
+    assert repriced and repriced[-1].order_id == executions[0].order_id
+
+def test_kis_reprice_respects_max_slippage(make_fake_kis):
+    """[재호가] 한도까지 정정해도 체결되지 않으면 한도 가격에 남겨둔 채 타임아웃"""
+    server = make_fake_kis(prices={"SSO": 50.0}, spread=0.2, holdings={"SSO": 10})
+    policy = ExecutionPolicy(reprice_interval=0.1, step=0.005, max_slippage=0.01, max_attempts=4)
+    broker = _fake_broker(server, policy)
+
+    executions = broker._submit_orders([Order("SSO", "SELL", 10, 50.0)])
+    assert broker._work_orders(executions, timeout=1.0) is False
+
+    open_orders = server.open_orders()
+    assert [o["price"] for o in open_orders] == [49.5]
+    assert executions[0].order_id == open_orders[0]["odno"]
+
+def test_kis_partial_delayed_fills_without_reprice(make_fake_kis):
+    """[부분 체결] 호가에 닿은 주문은 지연/부분 체결이어도 정정 없이 끝까지 대기"""
+    server = make_fake_kis(prices={"QLD": 80.0}, fill_delay=0.2, fill_chunk=3, holdings={"QLD": 10})
+    broker = _fake_broker(server, ExecutionPolicy(reprice_interval=5.0))
+
+    executions = broker._submit_orders([Order("QLD", "SELL", 10, 80.0)])
+    assert broker._work_orders(executions, timeout=5.0) is True
+
+    assert server.holdings["QLD"] == 0
+    assert not any(path.endswith("order-rvsecncl") for _, path in server.calls)
+
+def test_kis_fills_reconciled_in_one_call(make_fake_kis):
+    """[체결 확인] 체결내역 1회 조회로 체결가/상태 갱신, 정정 전 원주문 체결분까지 합산"""
+    server = make_fake_kis(prices={"SSO": 50.0}, spread=0.02, fill_chunk=4, holdings={"SSO": 10})
+    broker = _fake_broker(server, ExecutionPolicy(reprice_interval=0.2, step=0.01, max_slippage=0.02))
+    executions = broker._submit_orders([Order("SSO", "SELL", 10, 49.5)])
+    broker._work_orders(executions, timeout=5.0)
+
+    calls = len(server.calls)
+    [e] = broker._reconcile_executions(executions)
+
+    assert len(server.calls) == calls + 1
+    assert e.status == "FILLED"
+    assert e.quantity == 10
+    assert e.price == 49.5
+    assert e.fee == 0.0
+
+def test_kis_reconcile_marks_partial_fill(make_fake_kis):
+    """[체결 확인] 일부만 체결된 주문은 PARTIAL + 체결 수량으로 기록"""
+    server = make_fake_kis(prices={"IEF": 100.0}, fill_chunk=3, holdings={"IEF": 10})
+    broker = _fake_broker(server)
+    executions = broker._submit_orders([Order("IEF", "SELL", 10, 100.0)])
+    server.handle("GET", "/ping", {})  # 요청 1회 = 체결 1회 진행
+
+    [e] = broker._reconcile_executions(executions)
+
+    assert e.status == "PARTIAL"
+    assert 0 < e.quantity < 10
+
+def test_kis_buy_sized_from_reconciled_proceeds(make_fake_kis):
+    """[매수] 매도가 전량 체결로 확인되면 잔고 재조회 없이 실제 매도 대금으로 매수, 주문 후 잔고도 재조회 생략"""
+    server = make_fake_kis(prices={"SSO": 50.0, "IEF": 100.0}, holdings={"SSO": 10}, cash=0.0)
+    broker = _fake_broker(server)
+    broker.get_portfolio()
+
+    executions = broker.execute_orders([Order("SSO", "SELL", 10, 50.0), Order("IEF", "BUY", 4, 100.0)])
+    final_pf = broker.get_portfolio()
+
+    balance_calls = [p for _, p in server.calls if p.endswith("inquire-balance")]
+    # 최초 조회 + 주문 직전 1회(캐시로 수량을 정하지 않음)만, 매도 후/주문 후에는 재조회 없음
+    assert len(balance_calls) == 2 * len(KisBroker.EXCHANGES)
+    assert [(e.ticker, e.status) for e in executions] == [("SSO", "FILLED"), ("IEF", "FILLED")]
+    assert final_pf.holdings == {"SSO": 0, "IEF": 4}
+    assert final_pf.total_cash == pytest.approx(500.0 - 400.0)
+
+def test_kis_buys_sized_from_fresh_balance(make_fake_kis):
+    """[매수] 매수만 있는 실행도 TTL 내 캐시가 아닌 최신 잔고(예수금)로 수량 산정"""
+    server = make_fake_kis(prices={"IEF": 100.0}, cash=1000.0)
+    broker = _fake_broker(server)
+    broker.get_portfolio()  # 캐시: 예수금 1000
+    server.cash = 300.0     # 다른 경로로 예수금 감소
+
+    [e] = broker.execute_orders([Order("IEF", "BUY", 8, 100.0)])
+
+    assert e.quantity == int(300.0 * 0.98 / 102.0)
+
+# ==========================================
+# 거래소 코드 조회
+# ==========================================
+def test_exchange_resolved_once_and_persisted(make_fake_kis, tmp_path):
+    """[거래소] 처음 보는 종목만 조회하고, 저장된 결과는 다음 실행에서 재사용"""
+    server = make_fake_kis(prices={"TLT": 90.0}, exchanges={"TLT": "NYS"})
+    path = str(tmp_path / "exchanges.json")
+
+    broker = KisBroker("k", "s", "1234567801", MagicMock(), base_url=server.url,
+                       rate_limiter=TokenBucket(1000), exchange_map_path=path)
+    assert broker._get_exchange_code("TLT") == "NYS"
+    assert broker._get_exchange_code("SSO") == "AMS"  # 알려진 종목은 조회 없음
+    lookups = [p for _, p in server.calls if p.endswith("search-info")]
+    assert len(lookups) == 2  # NAS(512) 실패 -> NYS(513) 성공
+
+    server.reset_calls()
+    again = KisBroker("k", "s", "1234567801", MagicMock(), base_url=server.url,
+                      rate_limiter=TokenBucket(1000), exchange_map_path=path)
+    assert again._get_exchange_code("TLT") == "NYS"
+    assert not any(p.endswith("search-info") for _, p in server.calls)
+
+def test_exchange_lookup_error_tries_next_exchange(make_fake_kis, tmp_path):
+    """[거래소] 한 거래소 조회에서 예외가 나도 나머지 거래소를 계속 조회"""
+    server = make_fake_kis(prices={}, exchanges={"TLT": "NYS"})
+    broker = KisBroker("k", "s", "1234567801", MagicMock(), base_url=server.url,
+                       rate_limiter=TokenBucket(1000), exchange_map_path=str(tmp_path / "exchanges.json"))
+    original = broker._request
+    failed = []
+
+    def flaky_request(method, url, **kwargs):
+        if url.endswith("search-info") and not failed:
+            failed.append(kwargs["params"]["PRDT_TYPE_CD"])
+            raise requests.exceptions.ConnectionError("reset")
+        return original(method, url, **kwargs)
+
+    broker._request = flaky_request
+    assert broker._get_exchange_code("TLT") == "NYS"
+    assert failed == ["512"]
+
+def test_exchange_warm_up_whole_universe(make_fake_kis, tmp_path):
+    """[거래소] 유니버스 선조회 - 모르는 종목만 조회, 찾지 못한 종목은 NAS로 두되 저장하지 않음"""
+    server = make_fake_kis(prices={}, exchanges={"TLT": "NYS", "VNQ": "AMS"})
+    path = tmp_path / "exchanges.json"
+    broker = KisBroker("k", "s", "1234567801", MagicMock(), base_url=server.url,
+                       rate_limiter=TokenBucket(1000), exchange_map_path=str(path))
+
+    codes = broker.warm_up_exchanges(["SSO", "TLT", "VNQ", "XXXX"])
+
+    assert codes == {"SSO": "AMS", "TLT": "NYS", "VNQ": "AMS", "XXXX": "NAS"}
+    saved = json.loads(path.read_text())
+    assert saved["TLT"] == "NYS" and saved["VNQ"] == "AMS"
+    assert "XXXX" not in saved
@@ -0,0 +1,251 @@
+import json
+import os
+import math
+import pytest
+from src.infra.dashboard import DashboardExporter, PerformanceAggregator, lttb_indices
+from src.infra.repo import JsonRepository
+from src.utils.jsonio import round_floats
+from src.core.models import MarketData, Portfolio, TradeSignal, TradeExecution
+
+def make_summary(days, start_year=2020):
+    """start_year 1월 1일부터 days일치 요약 레코드 (월별 28일 기준 날짜)"""
+    rows = []
+    for i in range(days):
+        year, rest = divmod(i, 12 * 28)
+        month, day = divmod(rest, 28)
+        rows.append({
+            "date": f"{start_year + year}-{month + 1:02d}-{day + 1:02d}",
+            "total_value": 10000 + 1000 * math.sin(i / 20),
+            "spy_price": 400 + i * 0.1,
+        })
+    return rows
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_lttb_keeps_endpoints_and_extremes():
+    # 1. 첫/마지막 점과 급등락 지점은 다운샘플링 후에도 유지
+    values = [0.0] * 1000
+    values[500] = 100.0
+    values[700] = -50.0
+    picked = lttb_indices(values, 50)
+
+    assert len(picked) == 50
+    assert picked[0] == 0 and picked[-1] == 999
+    assert 500 in picked and 700 in picked
+    assert picked == sorted(picked)
+
+def test_lttb_short_series_unchanged():
+    # 2. 목표 개수보다 짧으면 그대로
+    assert lttb_indices([1.0, 2.0, 3.0], 10) == [0, 1, 2]
+
+def test_export_writes_monthly_shards_and_index(tmp_path):
+    # 3. 월별 샤드 + 인덱스(최신 요약, 최근 매매) 생성
+    exporter = DashboardExporter(str(tmp_path), compact=True)
+    summary = make_summary(28 * 3)
+    history = [{"id": f"tx_{i}", "date": f"2020-0{i + 1}-05 10:00:00", "executions": []} for i in range(3)]
+    index = exporter.export(summary, history)
+
+    assert [m["month"] for m in index["summary_months"]] == ["2020-01", "2020-02", "2020-03"]
+    assert index["summary_months"][0] == {
+        "month": "2020-01", "file": "summary/2020-01.json", "count": 28,
+        "first": "2020-01-01", "last": "2020-01-28"
+    }
+    # 샤드는 compact 형식 (필드별 소수점 반올림)
+    assert read(tmp_path / "summary" / "2020-02.json") == round_floats(summary[28:56])
+    assert read(tmp_path / "history" / "2020-03.json") == history[2:]
+    assert index["latest"] == summary[-1]
+    assert read(exporter.index_file) == round_floats(index)
+
+def test_export_follows_compact_setting(tmp_path):
+    # 3-1. compact는 저장소 설정(DATA_COMPACT)을 따름 - 기본은 반올림 없이 원래 값 그대로
+    summary = make_summary(28)
+    DashboardExporter(str(tmp_path / "plain")).export(summary, [])
+    DashboardExporter(str(tmp_path / "compact"), compact=True).export(summary, [])
+
+    assert read(tmp_path / "plain" / "summary" / "2020-01.json") == summary
+    assert read(tmp_path / "compact" / "summary" / "2020-01.json") == round_floats(summary)
+
+    repo = JsonRepository(root_path=str(tmp_path / "repo"), compact=True)
+    assert repo.exporter.compact is True
+
+def test_export_overview_is_constant_size(tmp_path):
+    # 4. 기록이 길어져도 개요 데이터 크기는 일정
+    exporter = DashboardExporter(str(tmp_path))
+    exporter.export(make_summary(300), [])
+    small = os.path.getsize(exporter.overview_file)
+    exporter.export(make_summary(3000), [])
+    large = os.path.getsize(exporter.overview_file)
+
+    overview = read(exporter.overview_file)
+    assert len(overview["dates"]) == DashboardExporter.OVERVIEW_POINTS
+    assert overview["dates"][-1] == make_summary(3000)[-1]["date"]
+    assert large < small * 1.5
+
+def test_export_skips_unchanged_months(tmp_path):
+    # 5. 다음 날 export 시 지난 달 샤드는 다시 쓰지 않음
+    exporter = DashboardExporter(str(tmp_path))
+    summary = make_summary(28 * 2 + 5)
+    exporter.export(summary, [])
+    old_shard = tmp_path / "summary" / "2020-01.json"
+    os.utime(old_shard, (0, 0))
+
+    summary.append({"date": "2020-03-06", "total_value": 1.0, "spy_price": 1.0})
+    exporter.export(summary, [])
+
+    assert os.path.getmtime(old_shard) == 0
+    assert len(read(tmp_path / "summary" / "2020-03.json")) == 6
+
+def test_repo_export_dashboard_writes_shards(tmp_path):
+    # 6. 저장소 export 단계에서 분할 데이터도 함께 생성
+    repo = JsonRepository(root_path=str(tmp_path))
+    pf = Portfolio(1000.0, {'A': 10}, {'A': 100.0})
+    repo.save_daily_summary(MarketData("2024-01-31", 100, 90, 0.1, 0.1, -0.05, 15), TradeSignal(0.8, True, [], "Bull"), pf)
+    repo.save_daily_summary(MarketData("2024-02-01", 101, 90, 0.1, 0.1, -0.05, 15), TradeSignal(0.8, True, [], "Bull"), pf)
+    repo.save_trade_history([TradeExecution("SPY", "BUY", 1, 100.0, 0.1, "2024-02-01", "FILLED")], pf, "Trade")
+    repo.export_dashboard()
+
+    index = read(tmp_path / "index.json")
+    assert [m["file"] for m in index["summary_months"]] == ["summary/2024-01.json", "summary/2024-02.json"]
+    assert index["recent_history"][0]["executions"][0]["ticker"] == "SPY"
+    assert read(tmp_path / "overview.json")["total_value"] == [2000.0, 2000.0]
+
+def test_aggregator_drawdown_and_periods(tmp_path):
+    # 7. 낙폭/월/연 수익률/SPY 대비 성과를 1건씩 누적 계산
+    agg = PerformanceAggregator(str(tmp_path / "aggregates.json"))
+    rows = [
+        {"date": "2023-12-29", "total_value": 100.0, "spy_price": 10.0, "regime": "Bull", "target_exposure": 1.0},
+        {"date": "2024-01-02", "total_value": 120.0, "spy_price": 11.0, "regime": "Bull", "target_exposure": 1.0},
+        {"date": "2024-01-03", "total_value": 90.0, "spy_price": 12.0, "regime": "Bear", "target_exposure": 0.5},
+        {"date": "2024-02-01", "total_value": 99.0, "spy_price": 12.0, "regime": "Bear", "target_exposure": 0.5},
+    ]
+    derived = [agg.update(r) for r in rows]
+
+    assert derived[2]["drawdown"] == pytest.approx(-0.25)
+    assert derived[3]["drawdown"] == pytest.approx(-0.175)
+    assert derived[3]["relative_return"] == pytest.approx(0.99 / 1.2 - 1, abs=1e-6)
+    assert agg.state["max_drawdown"] == pytest.approx(-0.25)
+    # 1월 수익률은 12월 마지막 값(100) 대비
+    assert agg.state["monthly"]["2024-01"]["return"] == pytest.approx(-0.1)
+    assert agg.state["monthly"]["2024-02"]["return"] == pytest.approx(0.1)
+    assert agg.state["yearly"]["2024"]["return"] == pytest.approx(-0.01)
+    assert [(r["regime"], r["start"], r["days"]) for r in agg.state["regimes"]] == [
+        ("Bull", "2023-12-29", 2), ("Bear", "2024-01-03", 2)]
+    assert [e["target_exposure"] for e in agg.state["exposure"]] == [1.0, 0.5]
+
+def test_aggregator_state_persists_between_runs(tmp_path):
+    # 8. 저장된 상태에서 이어서 계산한 결과 == 전체 기록으로 다시 계산한 결과
+    path = str(tmp_path / "aggregates.json")
+    summary = make_summary(200)
+    agg = PerformanceAggregator(path)
+    for rec in summary[:150]:
+        agg.update(rec)
+    with open(path, 'wb') as f:  # 저장소가 기록하는 방식 그대로 (dumps 결과를 파일로)
+        f.write(agg.dumps())
+
+    resumed = PerformanceAggregator(path)
+    assert resumed.loaded
+    for rec in summary[150:]:
+        resumed.update(rec)
+
+    full = PerformanceAggregator(str(tmp_path / "other.json"))
+    full.rebuild(summary)
+    assert json.loads(json.dumps(resumed.state)) == json.loads(json.dumps(full.state))
+
+def test_repo_writes_aggregates_incrementally(tmp_path):
+    # 9. 저장소: 요약 저장 시 파생 값이 레코드와 aggregates.json에 함께 기록되고, 기존 기록으로 초기화
+    legacy = JsonRepository(root_path=str(tmp_path))
+    legacy._save_json(legacy.summary_file, [{"date": "2024-01-01", "total_value": 4000.0, "spy_price": 100.0}])
+
+    repo = JsonRepository(root_path=str(tmp_path))
+    pf = Portfolio(1000.0, {'A': 10}, {'A': 100.0})
+    repo.save_daily_summary(MarketData("2024-01-02", 100, 90, 0.1, 0.1, -0.05, 15), TradeSignal(0.8, True, [], "Bull"), pf)
+
+    last = repo.load_summary()[-1]
+    assert last["drawdown"] == pytest.approx(-0.5)
+    saved = read(tmp_path / "aggregates.json")
+    assert saved["peak"] == 4000.0
+    assert saved["last"]["date"] == "2024-01-02"
+
+    repo.export_dashboard()
+    assert read(tmp_path / "index.json")["aggregates"]["max_drawdown"] == pytest.approx(-0.5)
+
+def append_days(repo, start, count):
+    """start번째 날(2024-01-01 기준)부터 count일치 요약 + 격일 매매 저장"""
+    from datetime import date, timedelta
+    for i in range(start, start + count):
+        day = (date(2024, 1, 1) + timedelta(days=i)).isoformat()
+        pf = Portfolio(1000.0 + i, {'A': 10}, {'A': 100.0 + math.sin(i)})
+        repo.save_daily_summary(MarketData(day, 100 + i, 90, 0.1, 0.1, -0.05, 15), TradeSignal(0.8, True, [], "Bull"), pf)
+        if i % 2 == 0:
+            repo.save_trade_history([TradeExecution("SPY", "BUY", 1, 100.0, 0.1, f"{day} 10:00:00", "FILLED")], pf, day)
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_incremental_export_matches_full_export(tmp_path, backend):
+    # 10. 매일 증분 export한 결과 == 전체 기록으로 한 번에 export한 결과 (샤드/인덱스/개요)
+    from src.infra.repo import SqliteRepository
+    def make(name):
+        root = str(tmp_path / name)
+        if backend == "sqlite":
+            return SqliteRepository(os.path.join(root, "trading.db"), root_path=root)
+        return JsonRepository(root_path=root)
+
+    daily, full = make("daily"), make("full")
+    for i in range(20, 80):  # 1/21 ~ 3/20, 하루씩 저장 후 export (첫 export는 전체)
+        append_days(daily, i, 1)
+        daily.export_dashboard()
+    append_days(full, 20, 60)
+    full.export_dashboard(full=True)
+
+    # 매매 내역의 id/date는 저장 시각 기준이므로 사유(reason)로 비교
+    def reasons(rows):
+        return [r["reason"] for r in rows]
+
+    for kind, key in (("summary", lambda rows: rows), ("history", reasons)):
+        names = sorted(os.listdir(tmp_path / "full" / kind))
+        assert names == sorted(os.listdir(tmp_path / "daily" / kind))
+        for name in names:
+            assert key(read(tmp_path / "daily" / kind / name)) == key(read(tmp_path / "full" / kind / name))
+    daily_index, full_index = read(tmp_path / "daily" / "index.json"), read(tmp_path / "full" / "index.json")
+    assert reasons(daily_index.pop("recent_history")) == reasons(full_index.pop("recent_history"))
+    assert [m["count"] for m in daily_index.pop("history_months")] == [m["count"] for m in full_index.pop("history_months")]
+    assert daily_index == full_index
+    assert read(tmp_path / "daily" / "overview.json") == read(tmp_path / "full" / "overview.json")
+
+def test_incremental_export_reads_only_recent_records(tmp_path):
+    # 11. 증분 export는 전체 기록을 읽지 않고, 전체 배열(summary.json/history.json)도 쓰지 않음
+    repo = JsonRepository(root_path=str(tmp_path))
+    append_days(repo, 0, 70)
+    repo.export_dashboard()
+    append_days(repo, 70, 1)
+
+    repo.load_summary = repo.load_history = lambda: pytest.fail("full reload during incremental export")
+    old_shard = tmp_path / "summary" / "2024-01.json"
+    os.utime(old_shard, (0, 0))
+    repo.export_dashboard()
+
+    assert os.path.getmtime(old_shard) == 0
+    assert read(tmp_path / "summary" / "2024-03.json")[-1]["date"] == "2024-03-11"
+    assert len(read(tmp_path / "index.json")["recent_history"]) == DashboardExporter.RECENT_HISTORY
+    assert not os.path.exists(repo.summary_file) and not os.path.exists(repo.history_file)
+
+def test_incremental_overview_stays_bounded(tmp_path):
+    # 12. 증분 export를 계속해도 개요 점 개수는 OVERVIEW_POINTS의 2배를 넘지 않음
+    exporter = DashboardExporter(str(tmp_path))
+    summary = make_summary(1200)  # 400 + 800 -> 도중에 재다운샘플링 발생
+    exporter.export(summary[:400], [])
+    for rec in summary[400:]:
+        exporter.export_recent([rec], [], rec["date"][:7], "")
+    overview = read(exporter.overview_file)
+    assert len(overview["dates"]) <= DashboardExporter.OVERVIEW_POINTS * 2
+    assert overview["dates"][0] == summary[0]["date"]
+    assert overview["dates"][-1] == summary[-1]["date"]
+
+def test_reverse_lines_across_blocks(tmp_path):
+    # 13. 블록 경계에 걸친 줄도 온전히 역순으로 읽음
+    path = tmp_path / "log.jsonl"
+    lines = [json.dumps({"i": i, "pad": "x" * (i % 7)}) for i in range(200)]
+    path.write_text("\n".join(lines) + "\n")
+    got = [line.decode() for line in JsonRepository._reverse_lines(str(path), block_size=16)]
+    assert got == lines[::-1]
@@ -0,0 +1,185 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from src.infra.ledger import PortfolioLedger
+from src.infra.broker import MockBroker, KisBroker
+from src.bench.fake_kis import FakeKisServer
+from src.utils.ratelimit import TokenBucket
+from src.core.models import Order, Portfolio, TradeExecution
+
+@pytest.fixture
+def ledger(tmp_path):
+    return PortfolioLedger(str(tmp_path / "ledger"), snapshot_interval=3)
+
+def trade(ticker, action, qty, price, date, fee=0.0, status="FILLED"):
+    return TradeExecution(ticker, action, qty, price, fee, date, status)
+
+def test_ledger_replays_trades_and_cash(ledger):
+    # 1. 입금 + 매수/매도 이벤트로 현재 잔고 계산
+    ledger.record_cash(1000.0, "initial", date="2024-01-01 09:00:00")
+    ledger.record_execution(trade("SPY", "BUY", 5, 100.0, "2024-01-02 10:00:00", fee=1.0))
+    ledger.record_execution(trade("SPY", "SELL", 2, 110.0, "2024-01-03 10:00:00", fee=1.0))
+
+    pf = ledger.current()
+    assert pf.total_cash == pytest.approx(1000 - 501 + 219)
+    assert pf.holdings == {"SPY": 3}
+
+def test_ledger_rejected_trade_has_no_effect(ledger):
+    # 2. 거부된 주문은 기록만 하고 잔고는 그대로
+    ledger.record_cash(1000.0, date="2024-01-01 09:00:00")
+    ledger.record_execution(trade("SPY", "BUY", 5, 100.0, "2024-01-02 10:00:00", status="REJECTED"))
+
+    assert ledger.current().total_cash == 1000.0
+    assert ledger.current().holdings == {}
+    assert ledger.events()[-1]["status"] == "REJECTED"
+
+def test_ledger_state_at_date(ledger):
+    # 3. 특정 날짜 시점 잔고 (당일 끝 기준)
+    ledger.record_cash(1000.0, date="2024-01-01 09:00:00")
+    for day in range(2, 9):
+        ledger.record_execution(trade("SPY", "BUY", 1, 100.0, f"2024-01-0{day} 10:00:00"))
+
+    assert ledger.state_at("2023-12-31").holdings == {}
+    assert ledger.state_at("2024-01-01").total_cash == 1000.0
+    assert ledger.state_at("2024-01-04").holdings == {"SPY": 3}
+    assert ledger.state_at("2024-01-08").holdings == {"SPY": 7}
+    assert ledger.state_at("2024-01-05 09:59:59").holdings == {"SPY": 3}
+
+def test_ledger_snapshots_limit_replay(ledger, monkeypatch):
+    # 4. 스냅샷 이후 이벤트만 재생 (이벤트 파일 앞부분을 읽지 않음)
+    ledger.record_cash(1000.0, date="2024-01-01 09:00:00")
+    for day in range(2, 9):
+        ledger.record_execution(trade("SPY", "BUY", 1, 100.0, f"2024-01-0{day} 10:00:00"))
+    assert len(ledger._snapshots) == 2  # 3개 이벤트마다 1개
+
+    replayed = []
+    original = PortfolioLedger._apply
+    monkeypatch.setattr(PortfolioLedger, "_apply",
+                        staticmethod(lambda state, event: (replayed.append(event["seq"]), original(state, event))))
+    assert ledger.state_at("2024-01-08").holdings == {"SPY": 7}
+    assert replayed == [7, 8]
+
+def test_ledger_restores_state_across_runs(tmp_path):
+    # 5. 다시 열어도 같은 잔고 (스냅샷 + 이후 이벤트)
+    path = str(tmp_path / "ledger")
+    first = PortfolioLedger(path, snapshot_interval=2)
+    first.record_cash(500.0, date="2024-01-01 09:00:00")
+    first.record_position("GLD", 4, date="2024-01-01 09:00:00")
+    first.record_execution(trade("GLD", "SELL", 4, 50.0, "2024-01-02 10:00:00"))
+
+    second = PortfolioLedger(path, snapshot_interval=2)
+    assert second.current().total_cash == 700.0
+    assert second.current().holdings == {}
+    assert second.record_cash(1.0)["seq"] == 4
+
+def test_ledger_drops_truncated_tail(tmp_path):
+    # 6. 기록 도중 끊긴 마지막 줄은 제거하고 이어서 기록
+    path = str(tmp_path / "ledger")
+    ledger = PortfolioLedger(path)
+    ledger.record_cash(100.0)
+    with open(ledger.events_file, 'a') as f:
+        f.write('{"seq": 2, "type": "CA')
+
+    reopened = PortfolioLedger(path)
+    reopened.record_cash(50.0)
+    assert [e["seq"] for e in PortfolioLedger(path).events()] == [1, 2]
+    assert PortfolioLedger(path).current().total_cash == 150.0
+
+def test_mock_broker_persists_through_ledger(tmp_path):
+    # 7. 모의투자 잔고가 다음 실행으로 이어짐 (초기자금으로 다시 시작하지 않음)
+    path = str(tmp_path / "ledger")
+    broker = MockBroker(initial_cash=1000.0, holdings={"SPY": 2}, ledger=PortfolioLedger(path))
+    broker.execute_orders([Order("QQQ", "BUY", 3, 100.0)])
+    cash = broker.cash
+
+    next_run = MockBroker(initial_cash=1000.0, ledger=PortfolioLedger(path))
+    pf = next_run.get_portfolio()
+    assert pf.total_cash == pytest.approx(cash)
+    assert pf.holdings == {"SPY": 2, "QQQ": 3}
+
+def test_kis_broker_records_executions(tmp_path):
+    # 8. 실전 브로커 체결도 같은 원장에 기록 (첫 기록 시 주문 전 잔고를 초기 상태로)
+    server = FakeKisServer(prices={"SSO": 50.0, "IEF": 100.0}, holdings={"SSO": 10}, cash=0.0)
+    try:
+        ledger = PortfolioLedger(str(tmp_path / "ledger"))
+        broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), base_url=server.url,
+                           rate_limiter=TokenBucket(1000), ledger=ledger)
+        broker.POLL_INTERVAL = 0.05
+        broker.execute_orders([Order("SSO", "SELL", 10, 50.0), Order("IEF", "BUY", 4, 100.0)])
+    finally:
+        server.close()
+
+    trades = [e for e in ledger.events() if e["type"] == "TRADE"]
+    assert [(e["ticker"], e["action"], e["quantity"], e["status"]) for e in trades] == [
+        ("SSO", "SELL", 10, "FILLED"), ("IEF", "BUY", 4, "FILLED")]
+    assert all(e["order_id"] for e in trades)
+    pf = ledger.current()
+    assert pf.holdings == {"IEF": 4}
+    assert pf.total_cash == pytest.approx(100.0)
+
+def test_unconfirmed_order_not_applied(ledger):
+    # 9. 체결 확인 전(ORDERED) 주문은 기록만 하고 잔고에는 반영하지 않음
+    ledger.record_cash(1000.0)
+    ledger.record_execution(trade("SPY", "BUY", 5, 100.0, "2024-01-02 10:00:00", status="ORDERED"))
+    ledger.record_execution(trade("SPY", "BUY", 2, 100.0, "2024-01-02 10:01:00", status="PARTIAL"))
+
+    assert ledger.current().holdings == {"SPY": 2}
+    assert ledger.current().total_cash == pytest.approx(800.0)
+    assert [e["quantity"] for e in ledger.events()[1:]] == [0, 2]
+
+def test_kis_ledger_not_seeded_from_failed_balance(tmp_path):
+    # 10. 주문 전 잔고 조회 실패 시 0 잔고로 기록하지 않고, 다음 잔고 조회 성공 시 실제 잔고로 시작
+    server = FakeKisServer(prices={"SSO": 50.0}, holdings={"SSO": 10}, cash=0.0)
+    try:
+        ledger = PortfolioLedger(str(tmp_path / "ledger"))
+        broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), base_url=server.url,
+                           rate_limiter=TokenBucket(1000), ledger=ledger)
+        broker.POLL_INTERVAL = 0.05
+        real_fetch = broker._fetch_portfolio
+        calls = []
+        def flaky_fetch():
+            calls.append(1)
+            return None if len(calls) == 1 else real_fetch()
+        broker._fetch_portfolio = flaky_fetch
+
+        [e] = broker.execute_orders([Order("SSO", "SELL", 10, 50.0)])
+        assert e.status == "FILLED"
+        assert ledger.is_empty
+
+        broker.invalidate_portfolio()
+        broker.get_portfolio()
+    finally:
+        server.close()
+
+    assert [e["type"] for e in ledger.events()] == ["CASH"]  # 매도 대금이 반영된 잔고로 시작 (체결 이중 반영 없음)
+    assert ledger.current().total_cash == pytest.approx(500.0)
+    assert ledger.current().holdings == {}
+
+@pytest.mark.parametrize("row, status, holdings", [
+    ({"ft_ccld_qty": "5", "ft_ccld_unpr3": "100.0", "nccs_qty": "0"}, "FILLED", {"SPY": 5}),
+    ({"ft_ccld_qty": "2", "ft_ccld_unpr3": "100.0", "nccs_qty": "3"}, "ORDERED", {}),  # 아직 체결 중
+    (None, "REJECTED", {}),  # 조회 범위를 지나도록 내역 없음 -> 만료
+])
+def test_kis_open_order_settled_on_next_run(tmp_path, row, status, holdings):
+    # 11. ORDERED로 남은 주문은 다음 실행에서 체결 내역으로 확인되면 확정 기록
+    ledger = PortfolioLedger(str(tmp_path / "ledger"))
+    ledger.record_cash(1000.0, date="2024-01-01 09:00:00")
+    ledger.record_execution(TradeExecution("SPY", "BUY", 5, 100.0, 0.0, "2024-01-02 10:00:00", "ORDERED",
+                                           order_id="0001"))
+    assert [o["order_id"] for o in ledger.open_orders()] == ["0001"]
+
+    server = FakeKisServer(prices={"SPY": 100.0}, cash=1000.0)
+    try:
+        broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), base_url=server.url,
+                           rate_limiter=TokenBucket(1000), ledger=ledger)
+        broker._inquire_fills = lambda: {"0001": dict(row, odno="0001")} if row else {}
+        broker._record_ledger(Portfolio(1000.0, {}, {}), [])
+    finally:
+        server.close()
+
+    trades = [e for e in ledger.events() if e["type"] == "TRADE"]
+    assert trades[-1]["status"] == status
+    assert ledger.current().holdings == holdings
+    assert bool(ledger.open_orders()) is (status == "ORDERED")
+    # 다시 열어도 미결 주문 상태 유지 (스냅샷/이벤트 재생)
+    assert bool(PortfolioLedger(ledger.root).open_orders()) is (status == "ORDERED")
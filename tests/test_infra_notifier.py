@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock 
-from src.infra.notifier import TelegramNotifier, SlackNotifier
+import time
+from src.infra.notifier import TelegramNotifier, SlackNotifier, QueuedNotifier, NotificationOutbox
+from src.utils.ratelimit import TokenBucket
 
 @pytest.fixture
 def mock_requests_post():
@@ -85,4 +87,200 @@ def test_slack_send_failure(mock_requests_post, mock_logger):
     
     # 호출된 메시지 내용 확인
     args, _ = mock_logger.error.call_args
-    assert "[Slack Error]" in args[0] # 메시지 내용에 에러 태그가 있는가?
\ No newline at end of file
+    assert "[Slack Error]" in args[0] # 메시지 내용에 에러 태그가 있는가?
+
+
+@pytest.fixture
+def slow_notifier():
+    """응답이 느린 알림 채널 흉내 (호출마다 0.3초)"""
+    inner = MagicMock()
+    inner.send_message.side_effect = lambda msg: time.sleep(0.3)
+    inner.send_alert.side_effect = lambda msg: time.sleep(0.3)
+    return inner
+
+def test_queued_notifier_does_not_block_caller(slow_notifier):
+    # 1. 느린 채널이어도 호출은 즉시 반환
+    notifier = QueuedNotifier(slow_notifier)
+    start = time.time()
+    notifier.send_message("a")
+    notifier.send_alert("b")
+    assert time.time() - start < 0.1
+    assert notifier.close(timeout=5)
+
+def test_queued_notifier_coalesces_messages_per_run(slow_notifier):
+    # 2. 한 실행의 일반 메시지는 flush 시 하나로 묶어 1회 전송
+    notifier = QueuedNotifier(slow_notifier)
+    notifier.send_message("Step 1")
+    notifier.send_message("Step 2")
+    assert notifier.flush(timeout=5)
+
+    slow_notifier.send_message.assert_called_once()
+    args, _ = slow_notifier.send_message.call_args
+    assert args[0] == "Step 1\n\nStep 2"
+    notifier.close()
+
+def test_queued_notifier_sends_alert_promptly(slow_notifier):
+    # 3. 경고는 flush를 기다리지 않고 바로 전송
+    notifier = QueuedNotifier(slow_notifier)
+    notifier.send_message("later")
+    notifier.send_alert("now")
+
+    deadline = time.time() + 2
+    while not slow_notifier.send_alert.called and time.time() < deadline:
+        time.sleep(0.01)
+    slow_notifier.send_alert.assert_called_once_with("now")
+    slow_notifier.send_message.assert_not_called()
+    notifier.close()
+
+def test_queued_notifier_flush_deadline(slow_notifier):
+    # 4. 전송이 기한을 넘기면 False 반환 (호출자는 기한 이상 기다리지 않음)
+    notifier = QueuedNotifier(slow_notifier)
+    notifier.send_alert("slow")
+    notifier.send_message("msg")
+    start = time.time()
+    assert notifier.flush(timeout=0.1) is False
+    assert time.time() - start < 0.3
+    assert notifier.close(timeout=5)
+    slow_notifier.send_message.assert_called_once_with("msg")
+
+def test_queued_notifier_retries_inner_error(mock_logger):
+    # 5. 채널 예외가 나면 백오프 후 재시도, 워커는 계속 동작
+    inner = MagicMock()
+    inner.send_alert.side_effect = [Exception("boom"), None, None]
+    notifier = QueuedNotifier(inner, mock_logger, retry_backoff=0.01)
+    notifier.send_alert("first")
+    notifier.send_alert("second")
+    assert notifier.close(timeout=5)
+
+    assert [c.args[0] for c in inner.send_alert.call_args_list] == ["first", "first", "second"]
+    mock_logger.error.assert_called()
+
+def test_slack_send_returns_false_on_rate_limit(mock_requests_post, mock_logger):
+    # 6. 429(rate limit) 응답은 실패로 반환 -> 재시도 대상
+    mock_requests_post.return_value.status_code = 429
+    notifier = SlackNotifier("https://hooks.slack.com/test", mock_logger)
+    assert notifier.send_message("hi") is False
+
+    mock_requests_post.return_value.status_code = 200
+    assert notifier.send_message("hi") is True
+
+def test_queued_notifier_alert_jumps_ahead_of_messages():
+    # 7. 워커가 바쁜 동안 들어온 경고는 대기 중인 일반 메시지보다 먼저 전송
+    sent = []
+    inner = MagicMock()
+    inner.send_message.side_effect = lambda msg: sent.append(("message", msg))
+    inner.send_alert.side_effect = lambda msg: (time.sleep(0.2), sent.append(("alert", msg)))
+    notifier = QueuedNotifier(inner)
+    notifier.send_alert("busy")
+    time.sleep(0.05)  # 워커가 첫 경고를 전송하는 중
+    notifier.send_message("routine")
+    notifier.flush(timeout=0)
+    notifier.send_alert("urgent")
+    assert notifier.close(timeout=5)
+
+    assert sent == [("alert", "busy"), ("alert", "urgent"), ("message", "routine")]
+
+def test_outbox_keeps_undelivered_until_next_run(tmp_path, mock_logger):
+    # 8. 재시도가 모두 실패하면 outbox에 남고, 다음 실행에서 재전송 후 정리
+    path = str(tmp_path / "outbox.jsonl")
+    failing = MagicMock()
+    failing.send_alert.return_value = False
+    failing.send_message.return_value = True
+    notifier = QueuedNotifier(failing, mock_logger, outbox=NotificationOutbox(path),
+                              max_retries=1, retry_backoff=0.01)
+    notifier.send_alert("crash")
+    notifier.send_message("report")
+    assert notifier.flush(timeout=5)
+    assert notifier.close(timeout=5)
+
+    assert failing.send_alert.call_count == 2
+    pending = NotificationOutbox(path).pending()
+    assert [(r["kind"], r["text"]) for r in pending] == [("alert", "crash")]
+
+    healthy = MagicMock()
+    notifier = QueuedNotifier(healthy, mock_logger, outbox=NotificationOutbox(path))
+    assert notifier.close(timeout=5)
+
+    healthy.send_alert.assert_called_once_with("crash")
+    assert NotificationOutbox(path).pending() == []
+    with open(path) as f:
+        assert f.read() == ""  # ack 완료 레코드는 정리됨
+
+def test_outbox_ignores_truncated_line(tmp_path):
+    # 9. 기록 도중 끊긴 줄은 무시
+    path = tmp_path / "outbox.jsonl"
+    outbox = NotificationOutbox(str(path))
+    rid = outbox.append("message", "hello")
+    with open(path, "a") as f:
+        f.write('{"id": "broken", "kind"')
+    assert [r["id"] for r in outbox.pending()] == [rid]
+
+def test_queued_notifier_respects_rate_limit():
+    # 10. rate_limiter로 채널 호출 간격 유지
+    inner = MagicMock()
+    limiter = TokenBucket(rate=10, capacity=1)
+    notifier = QueuedNotifier(inner, rate_limiter=limiter)
+    start = time.time()
+    for i in range(4):
+        notifier.send_alert(f"a{i}")
+    assert notifier.close(timeout=5)
+
+    assert inner.send_alert.call_count == 4
+    assert time.time() - start >= 0.25  # 첫 호출 이후 0.1초 간격
+
+def test_rate_limit_retry_after_surfaced(mock_requests_post, mock_logger):
+    # 11. 429 응답의 Retry-After(헤더 또는 Telegram parameters.retry_after)를 노출
+    mock_requests_post.return_value.status_code = 429
+    mock_requests_post.return_value.headers = {"Retry-After": "30"}
+    slack = SlackNotifier("https://hooks.slack.com/test", mock_logger)
+    assert slack.send_message("hi") is False
+    assert slack.retry_after == 30.0
+
+    mock_requests_post.return_value.headers = {}
+    mock_requests_post.return_value.json.return_value = {"ok": False, "parameters": {"retry_after": 12}}
+    telegram = TelegramNotifier(token="123:ABC", chat_id="111")
+    assert telegram.send_message("hi") is False
+    assert telegram.retry_after == 12.0
+
+    mock_requests_post.return_value.status_code = 200
+    assert telegram.send_message("hi") is True
+    assert telegram.retry_after is None
+
+def test_queued_notifier_waits_for_retry_after(mock_logger):
+    # 12. 재시도 대기는 백오프와 채널이 요구한 Retry-After 중 긴 쪽
+    inner = MagicMock()
+    inner.retry_after = 30.0
+    inner.send_alert.side_effect = [False, True]
+    with patch('src.infra.notifier.time.sleep') as mock_sleep:
+        notifier = QueuedNotifier(inner, mock_logger, retry_backoff=0.01)
+        notifier.send_alert("limited")
+        assert notifier.close(timeout=5)
+
+    assert inner.send_alert.call_count == 2
+    mock_sleep.assert_called_once_with(30.0)
+
+def test_outbox_fsync_batched_on_worker(tmp_path):
+    # 13. 호출 스레드(append)에서는 fsync하지 않고, 워커가 전송 직전에 한 번만 동기화
+    inner = MagicMock()
+    with patch('src.infra.notifier.os.fsync') as mock_fsync:
+        notifier = QueuedNotifier(inner, outbox=NotificationOutbox(str(tmp_path / "outbox.jsonl")))
+        for i in range(3):
+            notifier.send_message(f"m{i}")
+        assert mock_fsync.call_count == 0
+        assert notifier.flush(timeout=5)
+        assert mock_fsync.call_count == 1
+        assert notifier.close(timeout=5)
+
+def test_queued_notifier_survives_ack_failure(tmp_path, mock_logger):
+    # 14. outbox ack 기록 실패(OSError)로 워커가 죽지 않음
+    inner = MagicMock()
+    outbox = NotificationOutbox(str(tmp_path / "outbox.jsonl"))
+    notifier = QueuedNotifier(inner, mock_logger, outbox=outbox)
+    with patch.object(outbox, "ack", side_effect=OSError("disk full")):
+        notifier.send_alert("first")
+        notifier.send_alert("second")
+        assert notifier.flush(timeout=5)
+    assert notifier.close(timeout=5)
+
+    assert [c.args[0] for c in inner.send_alert.call_args_list] == ["first", "second"]
+    mock_logger.error.assert_called()
@@ -0,0 +1,173 @@
+# tests/test_infra_realtime.py
+import json
+import queue
+import threading
+import time
+import pytest
+from base64 import b64encode
+from unittest.mock import MagicMock
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+from websockets.sync.server import serve
+from src.infra.realtime import KisFillListener
+from src.infra.broker import KisBroker
+
+AES_KEY = "k" * 32
+AES_IV = "i" * 16
+
+def make_notice(order_no, side, ticker, qty, price, filled="2", rejected="0"):
+    """체결통보 레코드('^' 구분 25개 필드) 생성"""
+    fields = [""] * 25
+    fields[KisFillListener.F_ORDER_NO] = order_no
+    fields[KisFillListener.F_SIDE] = side
+    fields[KisFillListener.F_TICKER] = ticker
+    fields[KisFillListener.F_FILL_QTY] = str(qty)
+    fields[KisFillListener.F_FILL_PRICE] = str(price)
+    fields[KisFillListener.F_REJECTED] = rejected
+    fields[KisFillListener.F_FILLED] = filled
+    return "^".join(fields)
+
+def encrypt(text):
+    cipher = AES.new(AES_KEY.encode(), AES.MODE_CBC, AES_IV.encode())
+    return b64encode(cipher.encrypt(pad(text.encode(), AES.block_size))).decode()
+
+class FakeKisWebsocket:
+    """
+    로컬 웹소켓 스탠드인
+    구독 요청을 받으면 복호화 키를 응답하고, script 큐에 넣은 메시지를 순서대로 전송
+    """
+    def __init__(self):
+        self.script = queue.Queue()
+        self.subscriptions = []
+        self.received = []
+        self.server = serve(self._handler, "127.0.0.1", 0)
+        self.url = f"ws://127.0.0.1:{self.server.socket.getsockname()[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handler(self, ws):
+        sub = json.loads(ws.recv())
+        self.subscriptions.append(sub)
+        tr_id = sub["body"]["input"]["tr_id"]
+        ws.send(json.dumps({
+            "header": {"tr_id": tr_id},
+            "body": {"rt_cd": "0", "msg1": "SUBSCRIBE SUCCESS", "output": {"iv": AES_IV, "key": AES_KEY}}
+        }))
+        while True:
+            msg = self.script.get()
+            if msg is None:
+                return
+            ws.send(msg)
+            if '"PINGPONG"' in msg:
+                self.received.append(ws.recv())
+
+    def push_notice(self, tr_id, record, encrypted=False):
+        body = encrypt(record) if encrypted else record
+        self.script.put(f"{1 if encrypted else 0}|{tr_id}|001|{body}")
+
+    def close(self):
+        self.script.put(None)
+        self.server.shutdown()
+
+@pytest.fixture
+def fake_ws():
+    server = FakeKisWebsocket()
+    yield server
+    server.close()
+
+@pytest.fixture
+def listener(fake_ws):
+    lst = KisFillListener("APPROVAL", "hts_user", MagicMock(), is_real=False, url=fake_ws.url)
+    assert lst.start(timeout=5)
+    yield lst
+    lst.stop()
+
+def test_listener_subscribes_with_approval_key(fake_ws, listener):
+    """[구독] 접속키, TR ID, HTS ID로 체결통보를 구독"""
+    deadline = time.time() + 2
+    while not fake_ws.subscriptions and time.time() < deadline:
+        time.sleep(0.01)
+
+    sub = fake_ws.subscriptions[0]
+    assert sub["header"]["approval_key"] == "APPROVAL"
+    assert sub["body"]["input"] == {"tr_id": KisFillListener.TR_ID_VIRTUAL, "tr_key": "hts_user"}
+
+def test_listener_resolves_on_fill_events(fake_ws, listener):
+    """[체결] 부분 체결이 누적되어 전량 체결되는 순간 대기가 풀림"""
+    tr_id = KisFillListener.TR_ID_VIRTUAL
+    listener.track("0001", 10)
+    listener.track("0002", 5)
+
+    fake_ws.push_notice(tr_id, make_notice("0001", "01", "SSO", 4, 50.1))
+    fake_ws.push_notice(tr_id, make_notice("0001", "01", "SSO", 0, 0, filled="1"))  # 접수 통보 (무시)
+    fake_ws.push_notice(tr_id, make_notice("0002", "01", "IEF", 5, 95.0), encrypted=True)
+    fake_ws.push_notice(tr_id, make_notice("0001", "01", "SSO", 6, 50.2))
+
+    start = time.time()
+    assert listener.wait_for_fills(["0001", "0002"], timeout=5) is True
+    assert time.time() - start < 1.0
+    assert listener.filled_quantity("0001") == 10
+    assert listener.filled_quantity("0002") == 5
+    assert listener.pending() == 0
+
+def test_listener_rejected_order_is_not_pending(fake_ws, listener):
+    """[거부] 거부된 주문은 더 이상 기다리지 않음"""
+    listener.track("0003", 3)
+    fake_ws.push_notice(KisFillListener.TR_ID_VIRTUAL, make_notice("0003", "02", "GLD", 0, 0, filled="1", rejected="1"))
+
+    assert listener.wait_for_fills(["0003"], timeout=5) is True
+    assert listener.filled_quantity("0003") == 0
+
+def test_listener_survives_malformed_message(fake_ws, listener):
+    """[복원력] 복호화/파싱 실패 메시지는 건너뛰고 이후 체결통보를 계속 처리"""
+    tr_id = KisFillListener.TR_ID_VIRTUAL
+    listener.track("0005", 2)
+    fake_ws.script.put(f"1|{tr_id}|001|not-base64!")      # 복호화 실패
+    fake_ws.script.put(f"0|{tr_id}|abc|{make_notice('0005', '02', 'SHV', 2, 110.0)}")  # 건수 파싱 실패
+    fake_ws.script.put("{broken json")
+    fake_ws.push_notice(tr_id, make_notice("0005", "02", "SHV", 2, 110.0))
+
+    assert listener.wait_for_fills(["0005"], timeout=5) is True
+    assert listener.connected.is_set()
+    assert listener.logger.warning.call_count == 3
+
+def test_listener_answers_pingpong(fake_ws, listener):
+    """[연결 유지] PINGPONG 메시지는 그대로 돌려보냄"""
+    ping = json.dumps({"header": {"tr_id": "PINGPONG", "datetime": "20240101090000"}})
+    fake_ws.script.put(ping)
+
+    deadline = time.time() + 2
+    while not fake_ws.received and time.time() < deadline:
+        time.sleep(0.01)
+    assert fake_ws.received == [ping]
+
+def test_listener_timeout_when_unfilled(listener):
+    """[타임아웃] 체결이 오지 않으면 False"""
+    listener.track("0004", 1)
+    assert listener.wait_for_fills(["0004"], timeout=0.2) is False
+    assert listener.pending(["0004"]) == 1
+
+def test_listener_disconnect_wakes_waiters(fake_ws, listener):
+    """[연결 끊김] 대기 중 연결이 끊기면 타임아웃을 기다리지 않고 즉시 False"""
+    listener.track("0005", 1)
+    threading.Timer(0.1, fake_ws.close).start()
+
+    start = time.time()
+    assert listener.wait_for_fills(["0005"], timeout=5) is False
+    assert time.time() - start < 3
+    assert not listener.connected.is_set()
+
+def test_broker_wait_uses_listener_instead_of_polling(fake_ws, listener):
+    """[브로커] 체결통보 구독 중이면 미체결 조회 폴링 없이 즉시 완료"""
+    session = MagicMock()
+    session.request.return_value.json.return_value = {"access_token": "TOKEN"}
+    broker = KisBroker("app_key", "app_secret", "1234567801", MagicMock(), session=session, fill_listener=listener)
+    broker._get_pending_orders_count = MagicMock(return_value=0)
+
+    listener.track("0006", 2)
+    fake_ws.push_notice(KisFillListener.TR_ID_VIRTUAL, make_notice("0006", "01", "QLD", 2, 80.0))
+
+    assert broker._wait_for_completion(timeout=5, order_ids=["0006"]) is True
+    broker._get_pending_orders_count.assert_not_called()
+    # 체결 통보로 잔고 캐시 무효화
+    assert broker._portfolio_cache is None
+    assert broker._portfolio_valid_since > 0
@@ -1,7 +1,7 @@
 import pytest
 import json
 import os
-from src.infra.repo import JsonRepository
+from src.infra.repo import JsonRepository, SqliteRepository
 from src.core.models import MarketData, Portfolio, TradeSignal, MarketRegime, Order, TradeExecution
 
 @pytest.fixture
@@ -44,6 +44,15 @@ def test_save_summary_append(repo):
     repo.save_daily_summary(market, signal, pf)
     repo.save_daily_summary(market, signal, pf)
     
+    # 원본 기록: 한 줄에 한 건
+    with open(repo.summary_log, 'r') as f:
+        assert len(f.readlines()) == 2
+    # 전체 배열 JSON은 export_legacy_arrays() 단계에서만 생성
+    assert not os.path.exists(repo.summary_file)
+    repo.export_dashboard()
+    assert not os.path.exists(repo.summary_file)
+    repo.export_legacy_arrays()
+
     # 파일 확인
     with open(repo.summary_file, 'r') as f:
         data = json.load(f)
@@ -55,7 +64,7 @@ def test_save_history_only_when_orders_exist(repo, dummy_portfolio):
     # Case A: 체결 내역 없음 (빈 리스트)
     # [수정] signal 객체가 아니라 빈 리스트 [] 전달
     repo.save_trade_history([], dummy_portfolio, "No Trade")
-    assert not os.path.exists(repo.history_file)
+    assert not os.path.exists(repo.history_log)
     
     # Case B: 체결 내역 있음
     # [수정] TradeExecution 객체 리스트 생성
@@ -64,7 +73,8 @@ def test_save_history_only_when_orders_exist(repo, dummy_portfolio):
     ]
     
     repo.save_trade_history(executions, dummy_portfolio, "Trade Executed")
-    assert os.path.exists(repo.history_file)
+    assert os.path.exists(repo.history_log)
+    repo.export_legacy_arrays()
     with open(repo.history_file, 'r') as f:
         data = json.load(f)
         assert len(data) == 1
@@ -163,7 +173,8 @@ def test_save_summary_large_file_performance(repo, dummy_market_data, dummy_port
     end = time.time()
     
     # 3. 검증
-    # 에러 없이 저장되었는지
+    # 에러 없이 저장되었는지 (구버전 JSON은 JSONL로 1회 변환 후 이어쓰기)
+    repo.export_legacy_arrays()
     with open(repo.summary_file, 'r') as f:
         data = json.load(f)
         assert len(data) == 10001
@@ -186,7 +197,7 @@ def test_repo_encoding_support(repo, dummy_portfolio, dummy_market_data):
     repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
     
     # 3. 파일 읽기 (Raw Text 확인)
-    with open(repo.summary_file, 'r', encoding='utf-8') as f:
+    with open(repo.summary_log, 'r', encoding='utf-8') as f:
         content = f.read()
         
     # 4. 검증
@@ -210,6 +221,7 @@ def test_repo_schema_evolution(repo, dummy_market_data, dummy_portfolio):
     repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
     
     # 3. 로드 및 검증
+    repo.export_legacy_arrays()
     with open(repo.summary_file, 'r') as f:
         data = json.load(f)
         
@@ -295,7 +307,7 @@ def test_repo_read_only_file(repo, dummy_market_data, dummy_portfolio):
     repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
     
     # 2. 읽기 전용으로 권한 변경 (Write 권한 제거)
-    os.chmod(repo.summary_file, stat.S_IREAD)
+    os.chmod(repo.summary_log, stat.S_IREAD)
     
     try:
         # 3. 쓰기 시도 -> PermissionError 발생해야 함
@@ -304,7 +316,7 @@ def test_repo_read_only_file(repo, dummy_market_data, dummy_portfolio):
             
     finally:
         # 테스트 종료 후 권한 복구 (Cleanup) - 안 하면 임시 폴더 삭제 시 에러 날 수 있음
-        os.chmod(repo.summary_file, stat.S_IWRITE | stat.S_IREAD)
+        os.chmod(repo.summary_log, stat.S_IWRITE | stat.S_IREAD)
 
 # ... (기존 코드 생략) ...
 
@@ -366,6 +378,7 @@ def test_repo_simulation_week_trading(repo, dummy_portfolio, dummy_market_data):
         repo.save_daily_summary(market_data, signal, dummy_portfolio)
     
     # 2. 파일 검증
+    repo.export_legacy_arrays()
     with open(repo.summary_file, 'r') as f:
         data = json.load(f)
     
@@ -373,4 +386,304 @@ def test_repo_simulation_week_trading(repo, dummy_portfolio, dummy_market_data):
     assert len(data) == days # 7개 행이 있어야 함
     assert data[0]['date'] == "2024-01-01" # 첫째 날
     assert data[-1]['date'] == "2024-01-07" # 마지막 날
-    assert data[-1]['spy_price'] == 106.0 # 가격 변화 반영 확인
\ No newline at end of file
+    assert data[-1]['spy_price'] == 106.0 # 가격 변화 반영 확인
+
+def test_repo_append_does_not_rewrite_log(repo, dummy_market_data, dummy_portfolio):
+    """
+    [성능] 저장은 기존 기록을 다시 쓰지 않고 마지막에 한 줄만 추가
+    """
+    signal = TradeSignal(0.8, True, [], "Append")
+    repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
+    with open(repo.summary_log, 'rb') as f:
+        first = f.read()
+
+    repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
+    with open(repo.summary_log, 'rb') as f:
+        both = f.read()
+
+    assert both.startswith(first)
+    assert both.count(b"\n") == 2
+
+def test_repo_skips_truncated_line(repo, dummy_market_data, dummy_portfolio):
+    """
+    [복구] 기록 도중 끊긴 마지막 줄이 있어도 나머지 기록은 모두 읽힘
+    """
+    signal = TradeSignal(0.8, True, [], "Before crash")
+    repo.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
+    with open(repo.summary_log, 'a') as f:
+        f.write('{"date": "2024-01-02", "total_va')
+
+    assert [r['regime'] for r in repo.load_summary()] == ["Before crash"]
+    repo.export_legacy_arrays()
+    with open(repo.summary_file, 'r') as f:
+        assert len(json.load(f)) == 1
+
+def test_repo_export_keeps_legacy_history(repo, dummy_portfolio):
+    """
+    [호환성] 구버전 history.json만 있어도 export 시 내용이 보존됨
+    """
+    repo._save_json(repo.history_file, [{"id": "tx_old", "executions": []}])
+    assert repo.load_history() == [{"id": "tx_old", "executions": []}]
+
+    executions = [TradeExecution("SPY", "BUY", 1, 100.0, 0.1, "2024-01-01", "FILLED")]
+    repo.save_trade_history(executions, dummy_portfolio, "New")
+    repo.export_legacy_arrays()
+
+    with open(repo.history_file, 'r') as f:
+        data = json.load(f)
+    assert [d['id'] for d in data][0] == "tx_old"
+    assert data[1]['executions'][0]['ticker'] == "SPY"
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    repo = SqliteRepository(str(tmp_path / "db" / "trading.db"), root_path=str(tmp_path / "data"))
+    yield repo
+    repo.close()
+
+def test_sqlite_repo_wal_and_indexes(sqlite_repo):
+    """
+    [SQLite] WAL 모드 및 날짜/종목 인덱스 생성 확인
+    """
+    assert sqlite_repo.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in sqlite_repo.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_summary_date", "idx_executions_ticker_date"} <= indexes
+
+def test_sqlite_repo_summary_between(sqlite_repo, dummy_portfolio):
+    """
+    [SQLite] 기간 조회: 시작/끝 날짜 포함
+    """
+    for i in range(1, 8):
+        market = MarketData(f"2024-01-0{i}", 100 + i, 100, 0.1, 0.1, 0, 15)
+        sqlite_repo.save_daily_summary(market, TradeSignal(1.0, False, [], f"Day {i}"), dummy_portfolio)
+
+    rows = sqlite_repo.summary_between("2024-01-03", "2024-01-05")
+    assert [r['date'] for r in rows] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+    assert rows[0]['spy_price'] == 103
+    assert rows[0]['benchmark_return'] == pytest.approx(103 / 101 - 1, abs=1e-6)  # 누적 파생 지표도 저장
+    assert len(sqlite_repo.load_summary()) == 7
+
+def test_sqlite_repo_executions_for_ticker(sqlite_repo, dummy_portfolio):
+    """
+    [SQLite] 종목별 체결 조회 및 매매 내역 복원
+    """
+    sqlite_repo.save_trade_history([
+        TradeExecution("SPY", "BUY", 1, 100.0, 0.1, "2024-01-01 10:00:00", "FILLED"),
+        TradeExecution("QQQ", "BUY", 2, 50.0, 0.1, "2024-01-01 10:00:01", "FILLED"),
+    ], dummy_portfolio, "Rebalance 1")
+    sqlite_repo.save_trade_history([
+        TradeExecution("SPY", "SELL", 1, 110.0, 0.1, "2024-02-01 10:00:00", "FILLED", order_id="0002"),
+    ], dummy_portfolio, "Rebalance 2")
+    sqlite_repo.save_trade_history([], dummy_portfolio, "No Trade")
+
+    spy = sqlite_repo.executions_for("SPY")
+    assert [(e['action'], e['price']) for e in spy] == [("BUY", 100.0), ("SELL", 110.0)]
+    assert sqlite_repo.executions_for("SPY", end="2024-01-01") == spy[:1]
+
+    history = sqlite_repo.load_history()
+    assert [h['reason'] for h in history] == ["Rebalance 1", "Rebalance 2"]
+    assert history[0]['total_trade_amount'] == 200.0
+    assert history[1]['executions'][0]['order_id'] == "0002"
+
+def test_sqlite_repo_exports_dashboard_json(sqlite_repo, dummy_market_data, dummy_portfolio):
+    """
+    [SQLite] 대시보드 JSON(summary/history/status)은 기존 위치와 형식 그대로 생성
+    """
+    sqlite_repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Bull"), dummy_portfolio)
+    sqlite_repo.save_trade_history(
+        [TradeExecution("SPY", "BUY", 1, 100.0, 0.1, "2024-01-01", "FILLED")], dummy_portfolio, "Trade")
+    sqlite_repo.update_status(MarketRegime.BULL, 0.8, dummy_portfolio, dummy_market_data, "Status")
+    sqlite_repo.export_dashboard()
+    sqlite_repo.export_legacy_arrays()
+
+    with open(sqlite_repo.summary_file) as f:
+        assert json.load(f)[0]['regime'] == "Bull"
+    with open(sqlite_repo.history_file) as f:
+        assert json.load(f)[0]['executions'][0]['ticker'] == "SPY"
+    assert os.path.exists(sqlite_repo.status_file)
+
+def test_sqlite_repo_imports_existing_json(tmp_path, dummy_market_data, dummy_portfolio):
+    """
+    [SQLite] 처음 열 때 기존 JSON 기록을 가져오고, 다시 열어도 중복되지 않음
+    """
+    json_repo = JsonRepository(root_path=str(tmp_path))
+    json_repo._save_json(json_repo.summary_file, [{"date": "2020-01-01", "total_value": 100}])
+    json_repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "New"), dummy_portfolio)
+
+    db_path = str(tmp_path / "trading.db")
+    repo = SqliteRepository(db_path, root_path=str(tmp_path))
+    repo.close()
+    repo = SqliteRepository(db_path, root_path=str(tmp_path))
+    rows = repo.load_summary()
+    repo.close()
+
+    assert rows[0] == {"date": "2020-01-01", "total_value": 100}  # 구버전 필드 구성 유지
+    assert [r['date'] for r in rows] == ["2020-01-01", "2024-01-01"]
+
+
+def test_repo_compact_mode_smaller_with_gzip(tmp_path, dummy_market_data, dummy_portfolio):
+    """
+    [compact] 들여쓰기 없이 저장 + 소수점 반올림 + .gz 사본 생성
+    """
+    import gzip
+    pretty = JsonRepository(root_path=str(tmp_path / "pretty"))
+    compact = JsonRepository(root_path=str(tmp_path / "compact"), compact=True, gzip_outputs=True)
+    dummy_portfolio.total_cash = 123.456789123
+    for r in (pretty, compact):
+        for i in range(30):
+            signal = TradeSignal(0.123456789, True, [], f"Day {i}")
+            r.save_daily_summary(dummy_market_data, signal, dummy_portfolio)
+        r.export_dashboard()
+        r.export_legacy_arrays()
+
+    assert os.path.getsize(compact.summary_file) < os.path.getsize(pretty.summary_file) * 0.7
+    with open(compact.summary_file, 'rb') as f:
+        raw = f.read()
+    assert b"\n" not in raw
+    data = json.loads(raw)
+    assert data[0]['cash_balance'] == 123.46
+    assert data[0]['target_exposure'] == 0.1235
+    with gzip.open(compact.summary_file + ".gz", 'rb') as f:
+        assert f.read() == raw
+    assert os.path.exists(os.path.join(compact.root, "index.json.gz"))
+    assert not os.path.exists(pretty.summary_file + ".gz")
+
+def test_repo_batch_commits_in_one_journal(repo, dummy_market_data, dummy_portfolio):
+    """
+    [batch] 요약/매매 내역/상태를 journal 1개로 한 번에 커밋
+    """
+    executions = [TradeExecution("SPY", "BUY", 1, 100.0, 0.1, "2024-01-01", "FILLED")]
+    with repo.batch():
+        repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Batch"), dummy_portfolio)
+        repo.save_trade_history(executions, dummy_portfolio, "Batch")
+        repo.update_status(MarketRegime.BULL, 0.8, dummy_portfolio, dummy_market_data, "Batch")
+        # 블록 안에서는 아직 아무것도 쓰이지 않음
+        assert not os.path.exists(repo.summary_log)
+        assert not os.path.exists(repo.status_file)
+
+    assert len(repo.load_summary()) == 1
+    assert repo.load_history()[0]['reason'] == "Batch"
+    with open(repo.status_file) as f:
+        assert json.load(f)['strategy']['trigger_reason'] == "Batch"
+    assert not os.path.exists(repo.journal_file)
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="fd 경로 확인에 /proc 필요")
+def test_repo_batch_fsyncs_files_before_removing_journal(repo, dummy_market_data, dummy_portfolio):
+    """
+    [batch] journal 교체 후 디렉터리, 반영한 파일과 디렉터리를 모두 fsync한 뒤에만 journal 삭제
+    """
+    from unittest.mock import patch
+    events = []
+    real_fsync, real_remove = os.fsync, os.remove
+
+    def spy_fsync(fd):
+        events.append(("fsync", os.readlink(f"/proc/self/fd/{fd}")))
+        real_fsync(fd)
+
+    def spy_remove(path):
+        events.append(("remove", os.path.realpath(path)))
+        real_remove(path)
+
+    with patch('src.infra.repo.os.fsync', spy_fsync), patch('src.infra.repo.os.remove', spy_remove):
+        with repo.batch():
+            repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Batch"), dummy_portfolio)
+            repo.update_status(MarketRegime.BULL, 0.8, dummy_portfolio, dummy_market_data, "Batch")
+
+    root = os.path.realpath(repo.root)
+    journal = os.path.realpath(repo.journal_file)
+    removed = events.index(("remove", journal))
+    synced = [path for op, path in events[:removed] if op == "fsync"]
+    # journal 임시 파일 -> 디렉터리(커밋 지점) 순서
+    assert synced[:2] == [journal + ".tmp", root]
+    # 반영된 데이터 파일은 temp 파일로 fsync된 뒤 교체되거나(status), 직접 fsync(append)
+    assert os.path.realpath(repo.summary_log) in synced
+    assert os.path.realpath(repo.status_file) + ".tmp" in synced
+    assert synced.count(root) >= 2
+    # 삭제 후 디렉터리 fsync
+    assert events[removed + 1:] == [("fsync", root)]
+
+def test_repo_batch_error_writes_nothing(repo, dummy_market_data, dummy_portfolio):
+    """
+    [batch] 블록 안에서 예외가 나면 어떤 파일도 바뀌지 않음 (누적 지표 포함)
+    """
+    repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Before"), dummy_portfolio)
+    peak = repo.aggregator.state['peak']
+
+    with pytest.raises(RuntimeError):
+        with repo.batch():
+            dummy_portfolio.total_cash = 1_000_000
+            repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Lost"), dummy_portfolio)
+            raise RuntimeError("crash before status")
+
+    assert [r['regime'] for r in repo.load_summary()] == ["Before"]
+    assert repo.aggregator.state['peak'] == peak
+    assert not os.path.exists(repo.status_file)
+
+def test_repo_batch_recovers_interrupted_commit(tmp_path, dummy_market_data, dummy_portfolio):
+    """
+    [batch] journal 기록 후 반영 도중 중단 -> 다음 실행 시 마저 반영 (append 중복 없음)
+    """
+    from unittest.mock import patch
+    repo = JsonRepository(root_path=str(tmp_path))
+    repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Day 1"), dummy_portfolio)
+
+    original_apply = JsonRepository._apply
+    def crash_after_first(self, entries):
+        original_apply(self, entries[:1])  # summary.jsonl만 반영된 상태에서 중단
+        raise SystemExit("killed")
+
+    with patch.object(JsonRepository, '_apply', crash_after_first):
+        with pytest.raises(SystemExit):
+            with repo.batch():
+                repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Day 2"), dummy_portfolio)
+                repo.update_status(MarketRegime.BULL, 0.8, dummy_portfolio, dummy_market_data, "Day 2")
+    assert os.path.exists(repo.journal_file)
+    assert not os.path.exists(repo.status_file)
+
+    recovered = JsonRepository(root_path=str(tmp_path))
+    assert [r['regime'] for r in recovered.load_summary()] == ["Day 1", "Day 2"]
+    with open(recovered.status_file) as f:
+        assert json.load(f)['strategy']['trigger_reason'] == "Day 2"
+    assert not os.path.exists(recovered.journal_file)
+
+@pytest.mark.parametrize("crash_point, committed", [("_commit_external", False), ("_apply", True)])
+def test_sqlite_repo_batch_recovery_matches_db(tmp_path, dummy_market_data, dummy_portfolio, crash_point, committed):
+    """
+    [batch] SQLite: journal 기록 -> DB 커밋 -> 파일 반영 순서
+    - DB 커밋 전 중단: 다음 실행에서 journal을 버림 (DB/파일 모두 이전 상태)
+    - DB 커밋 후 중단: 다음 실행에서 파일을 마저 반영 (DB/파일 모두 새 상태)
+    """
+    from unittest.mock import patch
+    db_path, root = str(tmp_path / "trading.db"), str(tmp_path / "data")
+    repo = SqliteRepository(db_path, root_path=root)
+
+    with patch.object(SqliteRepository, crash_point, side_effect=SystemExit("killed")):
+        with pytest.raises(SystemExit):
+            with repo.batch():
+                repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Crash"), dummy_portfolio)
+                repo.update_status(MarketRegime.BULL, 0.8, dummy_portfolio, dummy_market_data, "Crash")
+    assert os.path.exists(repo.journal_file)
+    repo.conn.close()  # 프로세스 종료 (커밋되지 않은 트랜잭션은 버려짐)
+
+    recovered = SqliteRepository(db_path, root_path=root)
+    try:
+        assert not os.path.exists(recovered.journal_file)
+        assert len(recovered.load_summary()) == (1 if committed else 0)
+        assert os.path.exists(recovered.status_file) is committed
+        assert os.path.exists(recovered.aggregator.path) is committed
+    finally:
+        recovered.close()
+
+def test_sqlite_repo_batch_rolls_back(sqlite_repo, dummy_market_data, dummy_portfolio):
+    """
+    [batch] SQLite: 블록 안 예외 시 DB 기록도 롤백
+    """
+    with pytest.raises(RuntimeError):
+        with sqlite_repo.batch():
+            sqlite_repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Lost"), dummy_portfolio)
+            raise RuntimeError("boom")
+    assert sqlite_repo.load_summary() == []
+
+    with sqlite_repo.batch():
+        sqlite_repo.save_daily_summary(dummy_market_data, TradeSignal(0.8, True, [], "Kept"), dummy_portfolio)
+    assert [r['regime'] for r in sqlite_repo.load_summary()] == ["Kept"]
@@ -1,17 +1,22 @@
+import os
 import pytest
 from unittest.mock import MagicMock, patch
 from src.main import TradingBot
-from src.core.models import MarketData, MarketRegime, TradeSignal, Order, Portfolio
+from src.core.models import MarketData, MarketRegime, TradeSignal, Order, Portfolio, TradeExecution
+from src.infra.repo import JsonRepository
 
 # ==========================================
 # Mock 객체들을 미리 준비하는 Fixture
 # ==========================================
 @pytest.fixture
-def mock_dependencies():
+def mock_dependencies(tmp_path, monkeypatch):
+    # 알림 outbox는 테스트마다 임시 경로 사용 (저장소 .cache 오염 및 테스트 간 재전송 방지)
+    monkeypatch.setenv("NOTIFY_OUTBOX_PATH", str(tmp_path / "notify_outbox.jsonl"))
     with patch('src.main.YFinanceLoader') as MockLoader, \
          patch('src.main.JsonRepository') as MockRepo, \
          patch('src.main.SlackNotifier') as MockNotifier, \
          patch('src.main.MockBroker') as MockBrokerCls, \
+         patch('src.main.PortfolioLedger'), \
          patch('src.main.IndicatorCalculator') as MockCalc, \
          patch('src.main.RegimeAnalyzer') as MockAnalyzer, \
          patch('src.main.VolatilityTargeter') as MockTargeter, \
@@ -172,4 +177,66 @@ def test_bot_repo_save_permission_error(mock_dependencies):
         bot.run()
         
     mock_dependencies['notifier'].send_message.assert_called()
-    mock_dependencies['notifier'].send_alert.assert_called()
\ No newline at end of file
+    mock_dependencies['notifier'].send_alert.assert_called()
+
+
+def test_bot_fetches_quotes_only_for_unheld_tickers(mock_dependencies):
+    """[시세] 잔고 응답에 현재가가 있는 보유 종목은 시세 조회에서 제외"""
+    mock_dependencies['calc'].calculate.return_value = MarketData("2024-01-01", 100, 90, 0.1, 0.1, -0.05, 15.0)
+    mock_dependencies['analyzer'].analyze.return_value = MarketRegime.BULL
+    mock_dependencies['targeter'].calculate_exposure.return_value = 1.0
+    mock_dependencies['rebalancer'].generate_signal.return_value = TradeSignal(1.0, False, [], "Hold")
+    mock_dependencies['broker'].fetch_current_prices.return_value = {}
+
+    bot = TradingBot()
+    bot.run()
+
+    all_tickers = sum(bot.config.ASSET_GROUPS.values(), [])
+    args, _ = mock_dependencies['broker'].fetch_current_prices.call_args
+    assert args[0] == [t for t in all_tickers if t != 'SPY']
+
+
+@pytest.mark.parametrize("status, refetch", [("FILLED", False), ("ORDERED", True)])
+def test_bot_refetches_portfolio_only_for_unconfirmed_fills(mock_dependencies, status, refetch):
+    """[주문 후 잔고] 고정 대기 없이, 확정되지 않은 체결이 있을 때만 잔고 캐시를 버리고 재조회"""
+    mock_dependencies['calc'].calculate.return_value = MarketData("2024-01-01", 100, 90, 0.1, 0.1, -0.05, 15.0)
+    mock_dependencies['analyzer'].analyze.return_value = MarketRegime.BULL
+    mock_dependencies['targeter'].calculate_exposure.return_value = 1.0
+    mock_dependencies['rebalancer'].generate_signal.return_value = TradeSignal(
+        1.0, True, [Order("SPY", "BUY", 1, 100.0)], "Rebalance Needed"
+    )
+    mock_dependencies['broker'].execute_orders.return_value = [
+        TradeExecution("SPY", "BUY", 1, 100.0, 0.0, "2024-01-02 10:00:00", status)
+    ]
+    mock_dependencies['broker'].fetch_current_prices.return_value = {}
+
+    bot = TradingBot()
+    bot.run()
+
+    assert mock_dependencies['broker'].invalidate_portfolio.called is refetch
+    assert mock_dependencies['broker'].get_portfolio.call_count == 2  # 주문 전 + 주문 후
+
+
+def test_bot_archives_to_real_repository(mock_dependencies, tmp_path):
+    """[시나리오: 실제 저장소] Mock 없이 JsonRepository로 요약/매매 내역/상태가 한 번에 저장되는지 확인"""
+    mock_dependencies['calc'].calculate.return_value = MarketData("2024-01-02", 100, 90, 0.1, 0.1, -0.05, 15.0)
+    mock_dependencies['analyzer'].analyze.return_value = MarketRegime.BULL
+    mock_dependencies['targeter'].calculate_exposure.return_value = 1.0
+    mock_dependencies['rebalancer'].generate_signal.return_value = TradeSignal(
+        1.0, True, [Order('SPY', 'BUY', 1, 100.0)], "Rebalance Needed"
+    )
+    mock_dependencies['broker'].execute_orders.return_value = [
+        TradeExecution("SPY", "BUY", 1, 101.0, 0.1, "2024-01-02 10:00:00", "FILLED")
+    ]
+
+    bot = TradingBot()
+    bot.repo = JsonRepository(root_path=str(tmp_path))
+    bot.run()
+
+    repo = JsonRepository(root_path=str(tmp_path))
+    assert [r['date'] for r in repo.load_summary()] == ["2024-01-02"]
+    history = repo.load_history()
+    assert history[0]['reason'] == "Rebalance Needed"
+    assert history[0]['executions'][0]['ticker'] == "SPY"
+    assert os.path.exists(repo.status_file)
+    assert os.path.exists(tmp_path / "index.json")
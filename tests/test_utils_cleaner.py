@@ -0,0 +1,111 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.utils.cleaner import DataCleaner, CleaningReport
+
+@pytest.fixture
+def multi_ticker_df():
+    """(Price, Ticker) MultiIndex 구조의 10일치 데이터"""
+    dates = pd.date_range(start="2024-01-01", periods=10)
+    columns = pd.MultiIndex.from_product([['Close', 'Volume'], ['SPY', 'IEF']])
+    values = np.column_stack([
+        np.linspace(100, 109, 10),  # Close SPY
+        np.linspace(50, 59, 10),    # Close IEF
+        np.full(10, 1000.0),        # Volume SPY
+        np.full(10, 500.0),         # Volume IEF
+    ])
+    return pd.DataFrame(values, index=dates, columns=columns)
+
+def test_cleaner_clean_data_untouched(multi_ticker_df):
+    """[기본] 깨끗한 데이터는 그대로 유지되고 리포트도 비어있어야 함"""
+    df, report = DataCleaner().clean(multi_ticker_df)
+
+    pd.testing.assert_frame_equal(df, multi_ticker_df)
+    assert isinstance(report, CleaningReport)
+    assert report.rows_before == report.rows_after == 10
+    assert report.filled_cells == {}
+    assert report.outlier_jumps == {}
+
+def test_cleaner_calendar_alignment(multi_ticker_df):
+    """[정렬] 중복 날짜 제거, 정렬, 전 종목이 비어있는 날짜(휴장일) 제거"""
+    df = multi_ticker_df.copy()
+    df.iloc[3] = np.nan                          # 전 종목 휴장
+    df = pd.concat([df, df.iloc[[5]]])           # 중복 날짜
+    df = df.iloc[::-1]                           # 역순
+
+    cleaned, report = DataCleaner().clean(df)
+
+    assert cleaned.index.is_monotonic_increasing
+    assert not cleaned.index.duplicated().any()
+    assert len(cleaned) == 9
+    assert report.dropped_rows == 1
+
+def test_cleaner_ffill_limit_no_lookahead(multi_ticker_df):
+    """[보간] 직전 값으로만 채우고(bfill 금지), limit을 넘는 공백은 NaN으로 남김"""
+    df = multi_ticker_df.copy()
+    df.loc[df.index[0], ('Close', 'SPY')] = np.nan      # 첫 행: 채울 과거값 없음
+    df.loc[df.index[2:7], ('Close', 'IEF')] = np.nan    # 5일 공백
+
+    cleaned, report = DataCleaner(ffill_limit=3).clean(df)
+
+    # 미래 값이 첫 행으로 새어 들어오지 않아야 함
+    assert np.isnan(cleaned[('Close', 'SPY')].iloc[0])
+    # 3일까지만 채움
+    ief = cleaned[('Close', 'IEF')]
+    assert (ief.iloc[2:5] == 51.0).all()
+    assert ief.iloc[5:7].isna().all()
+    assert report.filled_cells == {'IEF': 3}
+
+def test_cleaner_zero_price_and_all_nan_column(multi_ticker_df):
+    """[품질] 0원 가격은 결측 처리 후 보간, 전체 NaN 컬럼은 제거"""
+    df = multi_ticker_df.copy()
+    df.loc[df.index[4], ('Close', 'SPY')] = 0.0
+    df[('Close', 'PDBC')] = np.nan
+
+    cleaned, report = DataCleaner().clean(df)
+
+    assert cleaned.loc[df.index[4], ('Close', 'SPY')] == 103.0
+    assert ('Close', 'PDBC') not in cleaned.columns
+    assert report.dropped_columns == ['Close/PDBC']
+    assert report.zero_prices == {'SPY': 1}
+    # Volume은 가격이 아니므로 건드리지 않음
+    assert (cleaned[('Volume', 'SPY')] == 1000.0).all()
+
+def test_cleaner_flags_stale_and_jumps():
+    """[품질] 가격 정체 구간과 급등락을 리포트에 표시 (데이터는 수정하지 않음)"""
+    dates = pd.date_range(start="2024-01-01", periods=10)
+    prices = [100, 100, 100, 100, 100, 100, 101, 150, 151, 152]
+    df = pd.DataFrame({'Close': prices}, index=dates, dtype=float)
+
+    cleaned, report = DataCleaner(stale_window=5, jump_threshold=0.25).clean(df)
+
+    assert report.stale_days == {'Close': 1}          # 6일째에 5일 연속 동일가 도달
+    assert report.outlier_jumps == {'Close': ['2024-01-08']}
+    assert cleaned['Close'].iloc[7] == 150.0
+
+def test_cleaner_filled_cells_not_counted_as_stale():
+    """[품질] ffill로 채운 칸은 가격 정체(stale)로 세지 않음"""
+    dates = pd.date_range(start="2024-01-01", periods=10)
+    columns = pd.MultiIndex.from_product([['Close'], ['SPY', 'IEF']])
+    values = np.column_stack([
+        [100, np.nan, np.nan, np.nan, np.nan, 101, 102, 103, 104, 105],  # SPY: 4일 결측
+        np.linspace(50, 59, 10),                                          # IEF
+    ])
+    df = pd.DataFrame(values, index=dates, columns=columns)
+
+    cleaned, report = DataCleaner(ffill_limit=5, stale_window=3).clean(df)
+
+    assert report.filled_cells == {'SPY': 4}
+    assert report.stale_days == {}
+    assert cleaned[('Close', 'SPY')].iloc[4] == 100.0
+
+def test_cleaner_align_vix_no_future_values():
+    """[정렬] VIX를 주가 캘린더에 맞출 때 직전 값만 사용"""
+    vix = pd.DataFrame({'Close': [20.0, 30.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-05"]))
+    index = pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-05"])
+
+    aligned = DataCleaner().align(vix, index)
+
+    assert np.isnan(aligned['Close'].iloc[0])
+    assert aligned['Close'].iloc[1] == 20.0
+    assert aligned['Close'].iloc[2] == 30.0
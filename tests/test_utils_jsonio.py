@@ -0,0 +1,52 @@
+import gzip
+import json
+import os
+import pytest
+from src.utils import jsonio
+
+def test_round_floats_per_field():
+    # 1. 필드별 자리수, 리스트 원소는 상위 키 기준, 정수/문자열은 그대로
+    data = {"total_value": 1234.5678, "spy_momentum": 0.123456789, "other": 0.1234567891,
+            "price": [1.234567, 2.0], "quantity": 3, "date": "2024-01-01"}
+    assert jsonio.round_floats(data) == {
+        "total_value": 1234.57, "spy_momentum": 0.1235, "other": 0.123457,
+        "price": [1.2346, 2.0], "quantity": 3, "date": "2024-01-01"}
+
+def test_dumps_default_keeps_pretty_format():
+    # 2. 기본 모드는 기존 형식(indent=4, 한글 유지) 그대로
+    data = [{"reason": "하락장 📉", "total_value": 1.23456}]
+    assert jsonio.dumps(data) == json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+
+def test_dumps_compact_same_with_or_without_orjson(monkeypatch):
+    # 3. orjson 유무와 관계없이 같은 내용 (한글 유지)
+    data = [{"reason": "하락장 📉", "total_value": 1.23456, "nested": {"spy_price": 400.129}}]
+    fast = jsonio.dumps(data, compact=True)
+    monkeypatch.setattr(jsonio, "orjson", None)
+    slow = jsonio.dumps(data, compact=True)
+
+    assert json.loads(fast) == json.loads(slow) == [
+        {"reason": "하락장 📉", "total_value": 1.23, "nested": {"spy_price": 400.13}}]
+    assert "하락장".encode("utf-8") in slow
+    assert b" " not in slow.replace("하락장 📉".encode("utf-8"), b"")
+
+def test_write_json_gzip_copy_is_deterministic(tmp_path):
+    # 4. .gz 사본은 내용이 같으면 바이트도 같음 (불필요한 git 변경 방지), 임시 파일 남지 않음
+    path = str(tmp_path / "data.json")
+    jsonio.write_json(path, {"a": 1.5}, compact=True, gzip_copy=True)
+    with open(path + ".gz", 'rb') as f:
+        first = f.read()
+    jsonio.write_json(path, {"a": 1.5}, compact=True, gzip_copy=True)
+    with open(path + ".gz", 'rb') as f:
+        assert f.read() == first
+
+    assert gzip.decompress(first) == b'{"a":1.5}'
+    assert sorted(os.listdir(tmp_path)) == ["data.json", "data.json.gz"]
+
+def test_write_json_unserializable_keeps_file(tmp_path):
+    # 5. 직렬화 실패 시 기존 파일은 그대로
+    path = str(tmp_path / "data.json")
+    jsonio.write_json(path, {"a": 1})
+    with pytest.raises(TypeError):
+        jsonio.write_json(path, {"a": object()})
+    with open(path) as f:
+        assert json.load(f) == {"a": 1}
@@ -2,6 +2,9 @@ import os
 import logging
 import re
 import pytest
+import json
+from logging.handlers import QueueHandler
+from src.utils import logger as logger_module
 from src.utils.logger import TradeLogger
 from datetime import datetime
 from unittest.mock import patch
@@ -27,6 +30,7 @@ def test_logger_file_creation(tmp_path, reset_logger):
     logger = TradeLogger(log_dir=str(log_dir))
 
     logger.info("Test Info Message")
+    logger.flush()  # 백그라운드 스레드 기록 완료 대기
 
     # 1. 파일 생성 확인
     files = os.listdir(log_dir)
@@ -46,6 +50,7 @@ def test_logger_levels(tmp_path, reset_logger):
 
     logger.warning("This is a warning")
     logger.error("This is an error")
+    logger.flush()
 
     with open(log_dir / os.listdir(log_dir)[0], 'r') as f:
         content = f.read()
@@ -64,6 +69,7 @@ def test_logger_console_output(tmp_path, capsys, reset_logger):
     logger = TradeLogger(log_dir=str(log_dir))
 
     logger.info("Console Test Message")
+    logger.flush()
 
     # capsys: pytest가 콘솔 출력을 캡처하는 픽스처
     # logging 모듈은 기본적으로 stderr에 출력함
@@ -85,10 +91,13 @@ def test_prevent_duplicate_handlers(tmp_path, capsys, reset_logger):
     
     # 3. 로그 남기기
     logger1.info("Duplicate Check")
+    logger2.flush()
     
-    # 4. 검증: 핸들러 개수가 늘어나지 않아야 함 (FileHandler 1개 + StreamHandler 1개 = 총 2개)
+    # 4. 검증: 핸들러 개수가 늘어나지 않아야 함 (QueueHandler 1개 -> 리스너의 FileHandler 1개 + StreamHandler 1개)
     raw_logger = logging.getLogger("SolidQuant")
-    assert len(raw_logger.handlers) == 2
+    queue_handlers = [h for h in raw_logger.handlers if isinstance(h, QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert len(logger_module._listener.handlers) == 2
     
     # 5. 검증: 파일에 로그가 한 번만 찍혀야 함
     with open(log_dir / os.listdir(log_dir)[0], 'r') as f:
@@ -114,6 +123,7 @@ def test_logger_encoding(tmp_path, reset_logger):
     
     special_msg = "테스트 메시지: 한글 및 이모지 🚀 확인"
     logger.info(special_msg)
+    logger.flush()
     
     # 생성된 로그 파일 찾기
     log_file = log_dir / os.listdir(log_dir)[0]
@@ -166,6 +176,7 @@ def test_logger_append_mode(tmp_path, reset_logger):
     # 2. 두 번째 실행 (오후 1시 가정)
     logger2 = TradeLogger(log_dir=str(log_dir))
     logger2.info("Second execution log")
+    logger2.flush()
     
     # 3. 파일 검증
     log_file = log_dir / os.listdir(log_dir)[0]
@@ -185,6 +196,7 @@ def test_logger_format_structure(tmp_path, reset_logger):
     log_dir = tmp_path / "logs"
     logger = TradeLogger(log_dir=str(log_dir))
     logger.info("Format Test")
+    logger.flush()
     
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -210,6 +222,7 @@ def test_logger_non_string_input(tmp_path, reset_logger):
         logger.info(data_dict) # type: ignore
     except Exception as e:
         pytest.fail(f"Logger crashed with non-string input: {e}")
+    logger.flush()
         
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -233,6 +246,7 @@ def test_logger_multiline_message(tmp_path, reset_logger):
     ZeroDivisionError: division by zero"""
     
     logger.error(multiline_msg)
+    logger.flush()
     
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -254,6 +268,7 @@ def test_logger_large_payload(tmp_path, reset_logger):
     large_msg = "A" * 1024 * 10 
     
     logger.info(large_msg)
+    logger.flush()
     
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -270,6 +285,7 @@ def test_logger_empty_message(tmp_path, reset_logger):
     logger = TradeLogger(log_dir=str(log_dir))
     
     logger.info("")
+    logger.flush()
     
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -295,6 +311,7 @@ def test_logger_nested_directory(tmp_path, reset_logger):
     
     logger = TradeLogger(log_dir=str(deep_dir))
     logger.info("Deep Log")
+    logger.flush()
     
     # 1. 디렉토리 생성 확인
     assert os.path.exists(deep_dir)
@@ -323,6 +340,7 @@ def test_logger_special_chars(tmp_path, reset_logger):
     logger.info(tricky_msg_1)
     logger.info(tricky_msg_2)
     logger.info(tricky_msg_3)
+    logger.flush()
     
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -342,6 +360,7 @@ def test_logger_stress_write(tmp_path, reset_logger):
     count = 1000
     for i in range(count):
         logger.info(f"Log line {i}")
+    logger.flush()
         
     log_file = log_dir / os.listdir(log_dir)[0]
     with open(log_file, 'r') as f:
@@ -353,4 +372,85 @@ def test_logger_stress_write(tmp_path, reset_logger):
     
     # 첫 줄과 마지막 줄 검증
     assert "Log line 0" in lines[0]
-    assert f"Log line {count-1}" in lines[-1]
\ No newline at end of file
+    assert f"Log line {count-1}" in lines[-1]
+
+def test_logger_writes_on_background_thread(tmp_path, reset_logger):
+    """
+    [비동기] 파일/콘솔 쓰기는 리스너 스레드에서 수행되는지 확인
+    """
+    logger = TradeLogger(log_dir=str(tmp_path))
+    writer_threads = []
+    file_handler = logger_module._listener.handlers[0]
+    original_emit = file_handler.emit
+
+    def spy_emit(record):
+        import threading
+        writer_threads.append(threading.current_thread().name)
+        original_emit(record)
+
+    file_handler.emit = spy_emit
+    logger.info("Async Write")
+    logger.flush()
+
+    import threading
+    assert writer_threads and threading.current_thread().name not in writer_threads
+
+def test_logger_lazy_formatting(tmp_path, reset_logger):
+    """
+    [지연 포맷팅] %-인자는 켜진 레벨에서만 문자열로 변환되는지 확인
+    """
+    class Expensive:
+        calls = 0
+        def __str__(self):
+            Expensive.calls += 1
+            return "expensive"
+
+    logger = TradeLogger(log_dir=str(tmp_path))
+    logger.debug("Debug %s", Expensive())  # 기본 레벨 INFO -> 포맷팅 안 함
+    assert Expensive.calls == 0
+    assert not logger.is_enabled(logging.DEBUG)
+
+    # 켜진 레벨은 리스너 스레드에서 1번만 포맷 (pytest가 붙인 캡처 핸들러는 제외하고 확인)
+    logger.logger.handlers = [h for h in logger.logger.handlers if getattr(h, "_trade_logger", False)]
+    logger.info("Price=%s, Obj=%s", 101.5, Expensive())
+    logger.flush()
+    assert Expensive.calls == 1
+    with open(logger.log_file, 'r') as f:
+        assert "Price=101.5, Obj=expensive" in f.read()
+
+def test_logger_structured_json_lines(tmp_path, reset_logger):
+    """
+    [구조화] structured=True면 .jsonl 파일에 step/ticker/latency/order_id 필드가 기록되는지 확인
+    """
+    logger = TradeLogger(log_dir=str(tmp_path), structured=True)
+    logger.info("Order Sent", extra={"ticker": "SPY", "order_id": "0001"})  # logging 호환 형식
+    with logger.timed("rebalance"):
+        pass
+    logger.flush()
+
+    assert logger.log_file.endswith(".jsonl")
+    with open(logger.log_file, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+
+    assert lines[0]["msg"] == "Order Sent"
+    assert lines[0]["level"] == "INFO"
+    assert (lines[0]["ticker"], lines[0]["order_id"]) == ("SPY", "0001")
+    assert "step" not in lines[0]
+    assert lines[1]["step"] == "rebalance"
+    assert lines[1]["latency"] >= 0
+
+def test_logger_close_drains_and_falls_back_to_sync(tmp_path, reset_logger):
+    """
+    [종료] close() 시 남은 로그를 모두 쓰고, 이후 기록은 동기 방식으로 계속 남는지 확인
+    """
+    logger = TradeLogger(log_dir=str(tmp_path))
+    for i in range(100):
+        logger.info("Before close %d", i)
+    logger.close()
+    logger.info("After close")
+
+    assert logger_module._listener is None
+    with open(logger.log_file, 'r') as f:
+        content = f.read()
+    assert content.count("Before close") == 100
+    assert "After close" in content
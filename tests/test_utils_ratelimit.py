@@ -0,0 +1,83 @@
+import threading
+import pytest
+from src.utils.ratelimit import TokenBucket
+
+class FakeClock:
+    """sleep 호출 시 시간이 흐르는 가짜 시계"""
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_bucket_burst_without_wait(clock):
+    """[기본] 버킷 용량 이내의 호출은 대기 없이 통과"""
+    bucket = TokenBucket(rate=5, clock=clock.time, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits == [0.0] * 5
+    assert clock.slept == []
+
+def test_bucket_waits_only_when_over_limit(clock):
+    """[제한] 한도를 넘는 순간부터 1/rate 간격으로 대기"""
+    bucket = TokenBucket(rate=2, clock=clock.time, sleep=clock.sleep)
+
+    for _ in range(2):
+        bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert clock.slept == pytest.approx([0.5, 0.5])
+
+def test_bucket_refills_over_time(clock):
+    """[회복] 시간이 지나면 토큰이 다시 채워짐"""
+    bucket = TokenBucket(rate=2, clock=clock.time, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.now += 1.0
+    assert bucket.acquire() == 0.0
+
+def test_bucket_penalize_and_recover(clock):
+    """[적응] 제한 초과 시 속도 절반, 성공이 이어지면 최대 속도로 회복"""
+    bucket = TokenBucket(rate=20, clock=clock.time, sleep=clock.sleep)
+
+    bucket.penalize()
+    assert bucket.rate == 10
+    bucket.penalize()
+    bucket.penalize()
+    assert bucket.rate == 5  # min_rate = 20 / 4
+
+    for _ in range(20):
+        bucket.reward()
+    assert bucket.rate == 20
+
+def test_bucket_thread_safety():
+    """[동시성] 여러 스레드가 동시에 호출해도 토큰이 초과 발급되지 않음"""
+    slept = []
+    lock = threading.Lock()
+
+    def fake_sleep(seconds):
+        with lock:
+            slept.append(seconds)
+
+    bucket = TokenBucket(rate=10, clock=lambda: 0.0, sleep=fake_sleep)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 10개는 즉시 통과, 나머지 20개는 서로 다른 대기 시간(0.1 ~ 2.0초)을 예약
+    assert len(slept) == 20
+    assert sorted(slept) == pytest.approx([0.1 * i for i in range(1, 21)])